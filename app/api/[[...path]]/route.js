@@ -1,10 +1,110 @@
+import { createHash, randomUUID } from 'crypto'
+import { monitorEventLoopDelay } from 'perf_hooks'
 import { NextResponse } from 'next/server'
 import { createClient } from '@supabase/supabase-js'
+import { LRUCache } from '@/lib/lru-cache'
+import { SingleFlight } from '@/lib/single-flight'
+import { sharedQueue } from '@/lib/write-behind'
+import { decodeClaims, userFromClaims, verifySupabaseJwt } from '@/lib/jwt'
 
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL
 const supabaseKey = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY
 
-const supabase = createClient(supabaseUrl, supabaseKey)
+// Every request the client makes to Supabase is counted for GET /debug/metrics
+let backendCalls = 0
+function countedFetch(...args) {
+  backendCalls++
+  return fetch(...args)
+}
+const supabase = createClient(supabaseUrl, supabaseKey, {
+  global: { fetch: countedFetch }
+})
+
+// A client that calls Supabase with the caller's own access token, for RPCs that check
+// auth.uid(); sessions are neither stored nor refreshed, the token is only passed through
+function supabaseAs(request) {
+  return createClient(supabaseUrl, supabaseKey, {
+    auth: { persistSession: false, autoRefreshToken: false },
+    global: { fetch: countedFetch, headers: { Authorization: request.headers.get('authorization') } }
+  })
+}
+
+// Tokens are verified locally (see lib/jwt.js) unless AUTH_LOCAL_VERIFY=false
+const localAuth = process.env.AUTH_LOCAL_VERIFY !== 'false'
+
+// Verified users keyed by access token; an entry never outlives its token's exp
+const verifiedTokens = new LRUCache({ max: 10000, ttlMs: 5 * 60 * 1000 })
+
+// Sessions ended through /auth/logout, on any instance: logout records them in the
+// revoked_sessions table and every instance pulls new rows at most every
+// REVOCATION_SYNC_MS, so a logout elsewhere is honoured within that interval (at once
+// on the instance that handled it). The first pull after a start loads every unexpired
+// revocation. Entries leave only when their tokens expire, never to make room: past
+// REVOKED_SESSIONS_MAX, or while the table cannot be read, tokens are checked with the
+// auth server instead of locally.
+const REVOCATION_SYNC_MS = 5 * 1000
+const REVOKED_SESSIONS_MAX = 100000
+const revocations = {
+  sessions: new Map(), // session_id -> expiry (ms)
+  since: null, // revoked_at of the newest row pulled
+  syncedAt: 0,
+  syncing: null,
+  current: false
+}
+
+function msUntilExpiry(claims) {
+  return claims?.exp ? claims.exp * 1000 - Date.now() : 0
+}
+
+function isRevoked(sessionId) {
+  return revocations.sessions.has(sessionId)
+}
+
+// Remembers a revocation unless the list is full; a full list stops being current, so the
+// next pull starts over from the table once expired entries have made room
+function rememberRevocation(sessionId, expiresAt) {
+  if (!revocations.sessions.has(sessionId) && revocations.sessions.size >= REVOKED_SESSIONS_MAX) {
+    revocations.current = false
+    revocations.since = null
+    return
+  }
+  revocations.sessions.set(sessionId, expiresAt)
+}
+
+async function syncRevocations() {
+  const now = Date.now()
+  for (const [sessionId, expiresAt] of revocations.sessions) {
+    if (expiresAt <= now) revocations.sessions.delete(sessionId)
+  }
+  
+  // Rows are stamped when their transaction starts, so one can commit after a newer one
+  // was pulled; asking again from a little before the newest keeps such rows in reach
+  const since = revocations.since &&
+    new Date(Date.parse(revocations.since) - REVOCATION_SYNC_MS).toISOString()
+  const { data, error } = await supabase.rpc('revoked_sessions_since', { p_since: since })
+  revocations.syncedAt = Date.now()
+  if (error) {
+    console.error(`revoked_sessions: ${error.message}`)
+    revocations.current = false
+    return
+  }
+  
+  revocations.current = true
+  for (const row of data) {
+    rememberRevocation(row.session_id, Date.parse(row.expires_at))
+    if (!revocations.current) return
+    revocations.since = row.revoked_at
+  }
+}
+
+// Whether the revocation list can be trusted for this request, pulling it first when due
+async function revocationsCurrent() {
+  if (Date.now() - revocations.syncedAt >= REVOCATION_SYNC_MS) {
+    revocations.syncing ??= syncRevocations().finally(() => { revocations.syncing = null })
+    await revocations.syncing
+  }
+  return revocations.current
+}
 
 // Helper function to get user from request
 async function getUser(request) {
@@ -12,8 +112,33 @@ async function getUser(request) {
   if (!authHeader) return null
   
   const token = authHeader.replace('Bearer ', '')
-  const { data: { user }, error } = await supabase.auth.getUser(token)
-  return error ? null : user
+  
+  // Cached and locally verified tokens are only as good as the revocation list; without
+  // a current one, every token goes to the auth server, which checks the session itself
+  const trusted = await revocationsCurrent()
+  const cached = trusted && verifiedTokens.get(token)
+  if (cached) {
+    return isRevoked(cached.session_id) ? null : cached
+  }
+  
+  let claims = localAuth && trusted ? await verifySupabaseJwt(token) : null
+  if (claims === false) return null
+  
+  let user
+  if (claims) {
+    user = userFromClaims(claims)
+  } else {
+    // Not verifiable locally (no secret/JWKS for this token): ask the auth server
+    const { data, error } = await supabase.auth.getUser(token)
+    if (error || !data.user) return null
+    claims = decodeClaims(token)
+    user = { ...data.user, session_id: claims?.session_id }
+  }
+  
+  if (user.session_id && isRevoked(user.session_id)) return null
+  
+  verifiedTokens.set(token, user, Math.min(verifiedTokens.ttlMs, msUntilExpiry(claims)))
+  return user
 }
 
 // Auth routes
@@ -34,8 +159,9 @@ async function handleSignup(request) {
     if (error) throw error
     
     // Create default workspace for new user
+    let workspace = null
     if (data.user) {
-      const { data: workspace, error: wsError } = await supabase
+      const { data: created, error: wsError } = await supabase
         .from('workspaces')
         .insert([{
           name: `${name}'s Workspace`,
@@ -44,7 +170,8 @@ async function handleSignup(request) {
         .select()
         .single()
       
-      if (!wsError && workspace) {
+      if (!wsError && created) {
+        workspace = created
         // Add user to workspace members
         await supabase.from('workspace_members').insert([{
           workspace_id: workspace.id,
@@ -54,7 +181,7 @@ async function handleSignup(request) {
       }
     }
     
-    return NextResponse.json({ user: data.user, session: data.session })
+    return NextResponse.json({ user: data.user, session: data.session, workspace })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 400 })
   }
@@ -79,8 +206,29 @@ async function handleLogin(request) {
 
 async function handleLogout(request) {
   try {
-    const { error } = await supabase.auth.signOut()
-    if (error) throw error
+    const user = await getUser(request)
+    
+    if (user) {
+      const token = request.headers.get('authorization').replace('Bearer ', '')
+      
+      // Locally verified tokens stay valid until exp, so refuse the session from now on:
+      // here at once, and on every other instance from their next revocation pull
+      verifiedTokens.delete(token)
+      if (user.session_id) {
+        const { error } = await supabaseAs(request).rpc('revoke_session')
+        if (error) throw error
+        rememberRevocation(user.session_id, Date.now() + msUntilExpiry(decodeClaims(token)))
+      }
+      
+      // End the session on the auth server too, so its refresh token stops working
+      const response = await fetch(`${supabaseUrl}/auth/v1/logout?scope=local`, {
+        method: 'POST',
+        headers: { apikey: supabaseKey, Authorization: `Bearer ${token}` }
+      })
+      if (!response.ok && response.status !== 401 && response.status !== 404) {
+        throw new Error(`Logout failed: ${response.status}`)
+      }
+    }
     
     return NextResponse.json({ message: 'Logged out successfully' })
   } catch (error) {
@@ -88,32 +236,258 @@ async function handleLogout(request) {
   }
 }
 
+// Conditional list GETs. Every workspace has a version that writes made through this
+// API bump; list ETags hash the caller's workspace versions, so an unchanged list
+// answers 304 and, with the response cache on, is served without querying Supabase.
+// Versions are per process and expire after LIST_VERSION_TTL_MS, which bounds how long
+// a write that bypasses the API (or lands on another instance) can go unnoticed.
+const LIST_VERSION_TTL_MS = 30 * 1000
+const LIST_CACHE_MAX = parseInt(process.env.LIST_CACHE_MAX || '1000', 10)
+
+const instanceId = randomUUID().slice(0, 8)
+let versionCounter = 0
+const workspaceVersions = new LRUCache({ max: 10000, ttlMs: LIST_VERSION_TTL_MS })
+const memberWorkspaces = new LRUCache({ max: 10000, ttlMs: 60 * 1000 })
+const listCache = new LRUCache({ max: LIST_CACHE_MAX, ttlMs: LIST_VERSION_TTL_MS })
+
+async function getMemberWorkspaces(userId) {
+  const cached = memberWorkspaces.get(userId)
+  if (cached) return cached
+  
+  const { data, error } = await supabase
+    .from('workspace_members')
+    .select('workspace_id')
+    .eq('user_id', userId)
+  
+  if (error) throw error
+  
+  const workspaceIds = data.map(row => row.workspace_id).sort()
+  memberWorkspaces.set(userId, workspaceIds)
+  return workspaceIds
+}
+
+function workspaceVersion(scope) {
+  let version = workspaceVersions.get(scope)
+  if (!version) {
+    version = `${instanceId}.${++versionCounter}`
+    workspaceVersions.set(scope, version)
+  }
+  return version
+}
+
+// A user's lists depend on their workspaces plus a per-user scope, which covers their
+// own time entries and users who are not in any workspace yet
+async function versionScopes(user) {
+  return [`user:${user.id}`, ...await getMemberWorkspaces(user.id)]
+}
+
+// Called after a successful write: lists in the writer's workspaces (and in extra ones,
+// e.g. the workspace a project was created in) get new ETags
+async function bumpWorkspaces(user, ...extraWorkspaceIds) {
+  const scopes = [...await versionScopes(user), ...extraWorkspaceIds.filter(Boolean)]
+  for (const scope of new Set(scopes)) {
+    workspaceVersions.set(scope, `${instanceId}.${++versionCounter}`)
+  }
+}
+
+function matchesETag(request, etag) {
+  const header = request.headers.get('if-none-match')
+  if (!header) return false
+  return header.split(',').some(tag => tag.trim().replace(/^W\//, '') === etag)
+}
+
+// Single-flight reads: concurrent identical GETs share one in-flight backend query instead
+// of each fanning out to Supabase (COALESCE_READS=false turns this off). Keys carry the
+// route, the query string and the caller's access scope, so callers only ever share a
+// result they could each have read on their own.
+const coalesceReads = process.env.COALESCE_READS !== 'false'
+const readFlights = new SingleFlight()
+
+function coalesce(key, load) {
+  return coalesceReads ? readFlights.run(key, load) : load()
+}
+
+// Serves a list GET: 304 when the client's ETag is current, the cached body when this
+// process already built it for the current versions, otherwise load() and cache it.
+// workspaceScoped lists (visible through workspace membership alone) are coalesced across
+// everyone with the same workspaces; other lists only across the same user's requests.
+async function listResponse(request, user, load, { workspaceScoped = false } = {}) {
+  const url = new URL(request.url)
+  const scopes = await versionScopes(user)
+  // Computed before loading, so a write that lands mid-query leaves a stale ETag, never a stale body
+  const etag = '"' + createHash('sha1')
+    .update([user.id, url.pathname, url.search, ...scopes.map(workspaceVersion)].join('|'))
+    .digest('base64url') + '"'
+  const headers = { ETag: etag, 'Cache-Control': 'private, no-cache' }
+  
+  if (matchesETag(request, etag)) {
+    return new NextResponse(null, { status: 304, headers })
+  }
+  
+  const key = `${user.id} ${url.pathname}${url.search}`
+  const cached = listCache.get(key)
+  if (cached?.etag === etag) {
+    return NextResponse.json(cached.body, { headers })
+  }
+  
+  // Versions are part of the key, so a read that starts after a write never joins one from before it
+  const flightScope = workspaceScoped
+    ? scopes.slice(1).map(scope => `${scope}@${workspaceVersion(scope)}`).join(',')
+    : etag
+  const body = await coalesce(`${url.pathname}${url.search} ${flightScope}`, load)
+  if (LIST_CACHE_MAX > 0) listCache.set(key, { etag, body })
+  return NextResponse.json(body, { headers })
+}
+
+// Activity log and notifications. Rows are queued and written in batches off the request
+// path (see lib/write-behind.js), so auditing a write costs no extra round trip before the
+// response. AUDIT_LOG=sync writes them before responding instead, AUDIT_LOG=off skips them.
+const auditMode = process.env.AUDIT_LOG || 'batched'
+const AUDIT_BATCH_MAX = 500
+const AUDIT_FLUSH_MS = 1000
+const AUDIT_QUEUE_MAX = 50000
+
+function tableWriter(table) {
+  return async rows => {
+    const { error } = await supabase.from(table).insert(rows)
+    if (error) throw error
+  }
+}
+
+// Shared across module reloads; drained when the process exits or gets SIGTERM/SIGINT
+const activityLog = sharedQueue({
+  write: tableWriter('activity_logs'),
+  maxBatch: AUDIT_BATCH_MAX,
+  maxDelayMs: AUDIT_FLUSH_MS,
+  maxQueue: AUDIT_QUEUE_MAX,
+  name: 'activity_logs'
+})
+const notificationLog = sharedQueue({
+  write: tableWriter('notifications'),
+  maxBatch: AUDIT_BATCH_MAX,
+  maxDelayMs: AUDIT_FLUSH_MS,
+  maxQueue: AUDIT_QUEUE_MAX,
+  name: 'notifications'
+})
+
+async function audit(user, action, entityType, entityId, notifications = []) {
+  if (auditMode === 'off') return
+  
+  const activity = {
+    user_id: user.id,
+    action,
+    entity_type: entityType,
+    entity_id: entityId,
+    timestamp: new Date().toISOString()
+  }
+  const created = notifications.map(({ userId, type, message }) => ({
+    user_id: userId,
+    type,
+    message,
+    created_at: activity.timestamp
+  }))
+  
+  if (auditMode === 'sync') {
+    await Promise.all([
+      activityLog.writeThrough([activity]),
+      created.length && notificationLog.writeThrough(created)
+    ])
+    return
+  }
+  activityLog.push(activity)
+  created.forEach(row => notificationLog.push(row))
+}
+
+// Notifications for a task write: the assignee when someone else assigned them, the
+// creator when someone else completed their task
+function taskNotifications(user, task, changes) {
+  const notifications = []
+  if (changes.assignee_id && changes.assignee_id !== user.id) {
+    notifications.push({ userId: changes.assignee_id, type: 'task_assigned', message: `You were assigned "${task.title}"` })
+  }
+  if (changes.status === 'completed' && task.created_by && task.created_by !== user.id) {
+    notifications.push({ userId: task.created_by, type: 'task_completed', message: `"${task.title}" was completed` })
+  }
+  return notifications
+}
+
 // Tasks routes
+const TASK_PAGE_SIZE = 50
+const TASK_PAGE_SIZE_MAX = 200
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i
+
+// Opaque keyset cursor over (a timestamp column, id); created_at for tasks
+function encodeCursor(row, column = 'created_at') {
+  return Buffer.from(JSON.stringify([row[column], row.id])).toString('base64url')
+}
+
+function decodeCursor(cursor) {
+  try {
+    const [at, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString())
+    // Both values are interpolated into a PostgREST filter, so accept only well-formed ones
+    if (typeof at !== 'string' || Number.isNaN(Date.parse(at))) return null
+    if (typeof id !== 'string' || !UUID_PATTERN.test(id)) return null
+    return { at, id }
+  } catch {
+    return null
+  }
+}
+
 async function getTasks(request) {
   try {
     const user = await getUser(request)
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    const { data: tasks, error } = await supabase
-      .from('tasks')
-      .select(`
-        *,
-        project:projects(id, name),
-        assignee:users!tasks_assignee_id_fkey(id, name, email),
-        subtasks(*),
-        time_entries(*)
-      `)
-      .order('created_at', { ascending: false })
-    
-    if (error) throw error
+    const url = new URL(request.url)
+    const limit = parseInt(url.searchParams.get('limit') || TASK_PAGE_SIZE, 10)
+    if (!Number.isInteger(limit) || limit < 1 || limit > TASK_PAGE_SIZE_MAX) {
+      return NextResponse.json({ error: `limit must be between 1 and ${TASK_PAGE_SIZE_MAX}` }, { status: 400 })
+    }
     
-    // Calculate total time for each task
-    const tasksWithTime = tasks.map(task => ({
-      ...task,
-      total_time: task.time_entries?.reduce((sum, entry) => sum + (entry.duration || 0), 0) || 0
-    }))
+    let cursor = null
+    const cursorParam = url.searchParams.get('cursor')
+    if (cursorParam) {
+      cursor = decodeCursor(cursorParam)
+      if (!cursor) return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 })
+    }
     
-    return NextResponse.json({ tasks: tasksWithTime })
+    return await listResponse(request, user, async () => {
+      // total_time is computed by the task_list view, so time entries are no longer embedded
+      let query = supabase
+        .from('task_list')
+        .select(`
+          *,
+          project:projects(id, name),
+          assignee:users!tasks_assignee_id_fkey(id, name, email),
+          subtasks(*)
+        `)
+        .order('created_at', { ascending: false })
+        .order('id', { ascending: false })
+        .limit(limit + 1)
+      
+      for (const filter of ['status', 'project_id', 'assignee_id']) {
+        const value = url.searchParams.get(filter)
+        if (value) query = query.eq(filter, value)
+      }
+      
+      // The lte is implied by the or, but only a plain bound lets the index scan start at
+      // the cursor instead of filtering its way down from the newest row
+      if (cursor) {
+        query = query.lte('created_at', cursor.at).or(
+          `created_at.lt."${cursor.at}",and(created_at.eq."${cursor.at}",id.lt.${cursor.id})`
+        )
+      }
+      
+      const { data: rows, error } = await query
+      
+      if (error) throw error
+      
+      // One extra row tells us whether another page exists
+      const tasks = rows.slice(0, limit)
+      const next_cursor = rows.length > limit ? encodeCursor(tasks[tasks.length - 1]) : null
+      
+      return { tasks, next_cursor }
+    })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
   }
@@ -141,6 +515,10 @@ async function createTask(request) {
     
     if (error) throw error
     
+    await Promise.all([
+      bumpWorkspaces(user),
+      audit(user, 'task.created', 'task', task.id, taskNotifications(user, task, taskData))
+    ])
     return NextResponse.json({ task })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
@@ -167,70 +545,231 @@ async function updateTask(request, taskId) {
     
     if (error) throw error
     
+    await Promise.all([
+      bumpWorkspaces(user),
+      audit(user, 'task.updated', 'task', task.id, taskNotifications(user, task, updates))
+    ])
     return NextResponse.json({ task })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
   }
 }
 
-// Time tracking routes
-async function getTimeEntries(request) {
+// Bulk writes: each batch is validated here, then written by one RPC call that
+// reports database errors per item (see bulk_* functions in supabase-schema.sql)
+const BULK_MAX_ITEMS = 1000
+const TASK_FIELDS = ['project_id', 'title', 'description', 'assignee_id', 'status', 'priority', 'due_date']
+const TASK_STATUSES = ['todo', 'in_progress', 'completed', 'archived']
+const TASK_PRIORITIES = ['low', 'medium', 'high']
+const TIME_ENTRY_FIELDS = ['task_id', 'start_time', 'end_time', 'description', 'billable']
+
+function isTimestamp(value) {
+  return typeof value === 'string' && !Number.isNaN(Date.parse(value))
+}
+
+function validateTask(item, { partial = false } = {}) {
+  if (!item || typeof item !== 'object' || Array.isArray(item)) return 'Item must be an object'
+  const allowed = partial ? ['id', ...TASK_FIELDS] : TASK_FIELDS
+  const unknown = Object.keys(item).find(key => !allowed.includes(key))
+  if (unknown) return `Unknown field: ${unknown}`
+  if ((!partial || 'title' in item) && (typeof item.title !== 'string' || !item.title.trim())) {
+    return 'title is required'
+  }
+  if (item.status !== undefined && !TASK_STATUSES.includes(item.status)) {
+    return `status must be one of ${TASK_STATUSES.join(', ')}`
+  }
+  if (item.priority !== undefined && !TASK_PRIORITIES.includes(item.priority)) {
+    return `priority must be one of ${TASK_PRIORITIES.join(', ')}`
+  }
+  for (const key of ['project_id', 'assignee_id']) {
+    if (item[key] === '') item[key] = null
+    if (item[key] != null && !UUID_PATTERN.test(item[key])) return `${key} must be a UUID`
+  }
+  if (item.due_date != null && !isTimestamp(item.due_date)) return 'due_date must be a timestamp'
+  return null
+}
+
+function validateTaskUpdate(item) {
+  const error = validateTask(item, { partial: true })
+  if (error) return error
+  if (typeof item.id !== 'string' || !UUID_PATTERN.test(item.id)) return 'id must be a UUID'
+  if (Object.keys(item).length < 2) return 'No fields to update'
+  return null
+}
+
+function validateTimeEntry(item) {
+  if (!item || typeof item !== 'object' || Array.isArray(item)) return 'Item must be an object'
+  const unknown = Object.keys(item).find(key => !TIME_ENTRY_FIELDS.includes(key))
+  if (unknown) return `Unknown field: ${unknown}`
+  if (typeof item.task_id !== 'string' || !UUID_PATTERN.test(item.task_id)) return 'task_id must be a UUID'
+  if (!isTimestamp(item.start_time) || !isTimestamp(item.end_time)) {
+    return 'start_time and end_time must be timestamps'
+  }
+  if (Date.parse(item.end_time) < Date.parse(item.start_time)) return 'end_time is before start_time'
+  if (item.billable !== undefined && typeof item.billable !== 'boolean') return 'billable must be a boolean'
+  return null
+}
+
+async function readBulkItems(request, key) {
+  const body = await request.json()
+  const items = body?.[key]
+  if (!Array.isArray(items) || items.length === 0) {
+    return { error: `Body must be { "${key}": [...] } with at least one item` }
+  }
+  if (items.length > BULK_MAX_ITEMS) {
+    return { error: `At most ${BULK_MAX_ITEMS} ${key} per request` }
+  }
+  return { items }
+}
+
+// Sends the items that pass validation to the RPC and maps its results back
+// to positions in the original request
+async function bulkWrite(items, validate, callRpc, resultKey) {
+  const errors = []
+  const valid = []
+  const positions = []
+  items.forEach((item, index) => {
+    const error = validate(item)
+    if (error) {
+      errors.push({ index, error })
+    } else {
+      valid.push(item)
+      positions.push(index)
+    }
+  })
+  
+  let results = []
+  if (valid.length > 0) {
+    const { data, error } = await callRpc(valid)
+    if (error) throw error
+    results = data[resultKey].map(result => ({ ...result, index: positions[result.index] }))
+    errors.push(...data.errors.map(result => ({ ...result, index: positions[result.index] })))
+  }
+  
+  errors.sort((a, b) => a.index - b.index)
+  return { [resultKey]: results, errors }
+}
+
+async function bulkCreateTasks(request) {
   try {
     const user = await getUser(request)
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    const url = new URL(request.url)
-    const taskId = url.searchParams.get('task_id')
+    const { items, error } = await readBulkItems(request, 'tasks')
+    if (error) return NextResponse.json({ error }, { status: 400 })
     
-    let query = supabase
-      .from('time_entries')
-      .select(`
-        *,
-        task:tasks(id, title),
-        user:users(id, name, email)
-      `)
-      .order('start_time', { ascending: false })
+    const result = await bulkWrite(items, validateTask, tasks =>
+      supabase.rpc('bulk_insert_tasks', { p_tasks: tasks, p_created_by: user.id }), 'created')
     
-    if (taskId) {
-      query = query.eq('task_id', taskId)
-    }
+    await bumpWorkspaces(user)
+    return NextResponse.json(result)
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+async function bulkUpdateTasks(request) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    const { data: entries, error } = await query
+    const { items, error } = await readBulkItems(request, 'tasks')
+    if (error) return NextResponse.json({ error }, { status: 400 })
     
-    if (error) throw error
+    const result = await bulkWrite(items, validateTaskUpdate, updates =>
+      supabase.rpc('bulk_update_tasks', { p_updates: updates }), 'updated')
     
-    return NextResponse.json({ entries })
+    await bumpWorkspaces(user)
+    return NextResponse.json(result)
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
   }
 }
 
-async function startTimer(request) {
+async function bulkCreateTimeEntries(request) {
   try {
     const user = await getUser(request)
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    const { task_id, description } = await request.json()
+    const { items, error } = await readBulkItems(request, 'entries')
+    if (error) return NextResponse.json({ error }, { status: 400 })
     
-    // Check if there's already an active timer for this user
-    const { data: activeTimer } = await supabase
-      .from('time_entries')
-      .select('*')
-      .eq('user_id', user.id)
-      .is('end_time', null)
-      .single()
+    const result = await bulkWrite(items, validateTimeEntry, entries =>
+      supabase.rpc('bulk_insert_time_entries', { p_entries: entries, p_user_id: user.id }), 'created')
     
-    if (activeTimer) {
-      return NextResponse.json({ error: 'You already have an active timer running' }, { status: 400 })
-    }
+    await bumpWorkspaces(user)
+    return NextResponse.json(result)
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+// Time tracking routes
+const UNIQUE_VIOLATION = '23505'
+
+// Test clock: with FLOWOPS_TEST_CLOCK=1 a request can pin "now" for timer starts and stops,
+// so tests can stop a timer minutes after it started without waiting for it
+const CLOCK_HEADER = 'x-flowops-now'
+
+function requestClock(request) {
+  const value = process.env.FLOWOPS_TEST_CLOCK === '1' ? request.headers.get(CLOCK_HEADER) : null
+  if (!value) return { now: null }
+  const parsed = Date.parse(value)
+  if (Number.isNaN(parsed)) return { error: 'Invalid X-FlowOps-Now header' }
+  return { now: new Date(parsed).toISOString() }
+}
+
+async function getTimeEntries(request) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
+    const url = new URL(request.url)
+    const taskId = url.searchParams.get('task_id')
+    
+    return await listResponse(request, user, async () => {
+      let query = supabase
+        .from('time_entries')
+        .select(`
+          *,
+          task:tasks(id, title),
+          user:users(id, name, email)
+        `)
+        .order('start_time', { ascending: false })
+      
+      if (taskId) {
+        query = query.eq('task_id', taskId)
+      }
+      
+      const { data: entries, error } = await query
+      
+      if (error) throw error
+      
+      return { entries }
+    })
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+async function startTimer(request) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+    
+    const { task_id, description } = await request.json()
+    const clock = requestClock(request)
+    if (clock.error) return NextResponse.json({ error: clock.error }, { status: 400 })
+    
+    // One INSERT: the partial unique index on running entries rejects a second timer,
+    // even when two starts race; start_time defaults to the database clock
     const { data: entry, error } = await supabase
       .from('time_entries')
       .insert([{
         task_id,
         user_id: user.id,
-        start_time: new Date().toISOString(),
-        description: description || ''
+        description: description || '',
+        ...(clock.now && { start_time: clock.now })
       }])
       .select(`
         *,
@@ -239,8 +778,12 @@ async function startTimer(request) {
       `)
       .single()
     
+    if (error?.code === UNIQUE_VIOLATION) {
+      return NextResponse.json({ error: 'You already have an active timer running' }, { status: 400 })
+    }
     if (error) throw error
     
+    await bumpWorkspaces(user)
     return NextResponse.json({ entry })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
@@ -253,39 +796,28 @@ async function stopTimer(request) {
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
     const { entry_id } = await request.json()
-    
-    const endTime = new Date()
-    
-    // Get the entry to calculate duration
-    const { data: existingEntry } = await supabase
-      .from('time_entries')
-      .select('*')
-      .eq('id', entry_id)
-      .single()
-    
-    if (!existingEntry) {
+    if (typeof entry_id !== 'string' || !UUID_PATTERN.test(entry_id)) {
       return NextResponse.json({ error: 'Entry not found' }, { status: 404 })
     }
+    const clock = requestClock(request)
+    if (clock.error) return NextResponse.json({ error: clock.error }, { status: 400 })
     
-    const startTime = new Date(existingEntry.start_time)
-    const duration = Math.floor((endTime - startTime) / 1000 / 60) // duration in minutes
-    
-    const { data: entry, error } = await supabase
-      .from('time_entries')
-      .update({
-        end_time: endTime.toISOString(),
-        duration: duration
-      })
-      .eq('id', entry_id)
-      .select(`
-        *,
-        task:tasks(id, title),
-        user:users(id, name, email)
-      `)
-      .single()
+    // Stamps end_time and computes the duration in one statement (see stop_timer in supabase-schema.sql)
+    const { data: entry, error } = await supabase.rpc('stop_timer', {
+      p_entry_id: entry_id,
+      p_user_id: user.id,
+      p_now: clock.now
+    })
     
     if (error) throw error
+    if (!entry) {
+      return NextResponse.json({ error: 'Entry not found' }, { status: 404 })
+    }
     
+    await Promise.all([
+      bumpWorkspaces(user),
+      audit(user, 'timer.stopped', 'time_entry', entry.id)
+    ])
     return NextResponse.json({ entry })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
@@ -316,20 +848,153 @@ async function getActiveTimer(request) {
   }
 }
 
-// Projects routes
-async function getProjects(request) {
+// Time entry export: NDJSON or CSV, read EXPORT_CHUNK_SIZE rows at a time in
+// (start_time, id) order and streamed as each chunk is consumed, so memory stays
+// flat however long the range is
+const EXPORT_CHUNK_SIZE = 1000
+const EXPORT_CONTENT_TYPES = {
+  ndjson: 'application/x-ndjson',
+  csv: 'text/csv; charset=utf-8'
+}
+const EXPORT_COLUMNS = ['id', 'start_time', 'end_time', 'duration', 'billable', 'description',
+  'task_id', 'task_title', 'project_id', 'project_name']
+
+function csvField(value) {
+  if (value === null || value === undefined) return ''
+  const text = String(value)
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text
+}
+
+function exportLine(entry, format) {
+  const row = {
+    id: entry.id,
+    start_time: entry.start_time,
+    end_time: entry.end_time,
+    duration: entry.duration,
+    billable: entry.billable,
+    description: entry.description,
+    task_id: entry.task_id,
+    task_title: entry.task?.title ?? null,
+    project_id: entry.task?.project?.id ?? null,
+    project_name: entry.task?.project?.name ?? null
+  }
+  if (format === 'csv') return EXPORT_COLUMNS.map(column => csvField(row[column])).join(',') + '\r\n'
+  return JSON.stringify(row) + '\n'
+}
+
+function nextDay(day) {
+  const date = new Date(`${day}T00:00:00Z`)
+  date.setUTCDate(date.getUTCDate() + 1)
+  return date.toISOString()
+}
+
+async function exportTimeEntries(request) {
   try {
     const user = await getUser(request)
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    const { data: projects, error } = await supabase
-      .from('projects')
-      .select('*')
-      .order('name')
+    // from/to are inclusive UTC days (YYYY-MM-DD), like dashboard/stats
+    const url = new URL(request.url)
+    const format = url.searchParams.get('format') || 'ndjson'
+    const from = url.searchParams.get('from')
+    const to = url.searchParams.get('to')
+    const projectId = url.searchParams.get('project_id')
+    const billable = url.searchParams.get('billable')
     
-    if (error) throw error
+    if (!EXPORT_CONTENT_TYPES[format]) {
+      return NextResponse.json({ error: 'format must be ndjson or csv' }, { status: 400 })
+    }
+    if ((from && !DAY_PATTERN.test(from)) || (to && !DAY_PATTERN.test(to))) {
+      return NextResponse.json({ error: 'from/to must be dates in YYYY-MM-DD format' }, { status: 400 })
+    }
+    if (projectId && !UUID_PATTERN.test(projectId)) {
+      return NextResponse.json({ error: 'project_id must be a UUID' }, { status: 400 })
+    }
+    if (billable && billable !== 'true' && billable !== 'false') {
+      return NextResponse.json({ error: 'billable must be true or false' }, { status: 400 })
+    }
+    
+    // Finished entries only; the project filter needs an inner join on the task
+    const fetchChunk = async (after) => {
+      let query = supabase
+        .from('time_entries')
+        .select(`
+          id, task_id, start_time, end_time, duration, description, billable,
+          task:tasks${projectId ? '!inner' : ''}(id, title, project_id, project:projects(id, name))
+        `)
+        .eq('user_id', user.id)
+        .not('end_time', 'is', null)
+        .order('start_time', { ascending: true })
+        .order('id', { ascending: true })
+        .limit(EXPORT_CHUNK_SIZE)
+      
+      if (from) query = query.gte('start_time', `${from}T00:00:00Z`)
+      if (to) query = query.lt('start_time', nextDay(to))
+      if (projectId) query = query.eq('task.project_id', projectId)
+      if (billable) query = query.eq('billable', billable === 'true')
+      if (after) {
+        query = query.or(
+          `start_time.gt."${after.start_time}",and(start_time.eq."${after.start_time}",id.gt.${after.id})`
+        )
+      }
+      
+      const { data, error } = await query
+      if (error) throw error
+      return data
+    }
+    
+    // The first chunk is read up front so a failing query still gets a JSON 500;
+    // each pull() sends the chunk in hand and reads the next one
+    let chunk = await fetchChunk(null)
+    const encoder = new TextEncoder()
+    const stream = new ReadableStream({
+      start(controller) {
+        if (format === 'csv') controller.enqueue(encoder.encode(EXPORT_COLUMNS.join(',') + '\r\n'))
+      },
+      async pull(controller) {
+        try {
+          if (chunk.length > 0) {
+            controller.enqueue(encoder.encode(chunk.map(entry => exportLine(entry, format)).join('')))
+          }
+          if (chunk.length < EXPORT_CHUNK_SIZE) {
+            controller.close()
+            return
+          }
+          chunk = await fetchChunk(chunk[chunk.length - 1])
+        } catch (error) {
+          controller.error(error)
+        }
+      }
+    })
+    
+    return new NextResponse(stream, {
+      headers: {
+        'Content-Type': EXPORT_CONTENT_TYPES[format],
+        'Content-Disposition': `attachment; filename="time-entries.${format}"`,
+        'Cache-Control': 'no-store'
+      }
+    })
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+// Projects routes
+async function getProjects(request) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    return NextResponse.json({ projects })
+    return await listResponse(request, user, async () => {
+      const { data: projects, error } = await supabase
+        .from('projects')
+        .select('*')
+        .order('name')
+      
+      if (error) throw error
+      
+      return { projects }
+    }, { workspaceScoped: true })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
   }
@@ -341,6 +1006,11 @@ async function createProject(request) {
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
     const projectData = await request.json()
+    if (!projectData.workspace_id) {
+      // The app always sends the caller's workspace; default to it for API clients that don't
+      const [workspaceId = null] = await getMemberWorkspaces(user.id)
+      projectData.workspace_id = workspaceId
+    }
     
     const { data: project, error } = await supabase
       .from('projects')
@@ -350,6 +1020,7 @@ async function createProject(request) {
     
     if (error) throw error
     
+    await bumpWorkspaces(user, project.workspace_id)
     return NextResponse.json({ project })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
@@ -357,63 +1028,388 @@ async function createProject(request) {
 }
 
 // Dashboard stats
+const DAY_PATTERN = /^\d{4}-\d{2}-\d{2}$/
+
 async function getDashboardStats(request) {
   try {
     const user = await getUser(request)
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    // Get task counts
-    const { data: tasks } = await supabase
-      .from('tasks')
-      .select('status')
+    // Optional custom day range (YYYY-MM-DD, inclusive) reported as timeStats.range
+    const url = new URL(request.url)
+    const from = url.searchParams.get('from')
+    const to = url.searchParams.get('to')
+    if ((from && !DAY_PATTERN.test(from)) || (to && !DAY_PATTERN.test(to))) {
+      return NextResponse.json({ error: 'from/to must be dates in YYYY-MM-DD format' }, { status: 400 })
+    }
+    
+    // One round trip: task counts are aggregated in the database and time totals
+    // come from the per-day time_rollups_daily table, so cost doesn't grow with entries.
+    // Both depend on who is asking, so identical requests are coalesced per user.
+    const today = new Date().toISOString().slice(0, 10)
+    const body = await coalesce(`dashboard/stats ${user.id} ${today} ${from} ${to}`, async () => {
+      const { data: stats, error } = await supabase.rpc('dashboard_stats', {
+        p_user_id: user.id,
+        p_today: today,
+        p_from: from,
+        p_to: to
+      })
+      
+      if (error) throw error
+      
+      const { taskStats, timeStats } = stats
+      if (!from) delete timeStats.range
+      return { taskStats, timeStats }
+    })
+    
+    return NextResponse.json(body)
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+// Time reports: finished entries totalled per project, user, task, day or week by the
+// time_report() RPC, so managers get one row per group instead of exporting raw entries
+const REPORT_GROUPS = ['project', 'user', 'task', 'day', 'week']
+
+async function getTimeReport(request) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    const taskStats = {
-      total: tasks?.length || 0,
-      todo: tasks?.filter(t => t.status === 'todo').length || 0,
-      in_progress: tasks?.filter(t => t.status === 'in_progress').length || 0,
-      completed: tasks?.filter(t => t.status === 'completed').length || 0
+    // from/to are inclusive UTC days; workspace_id reports on every member (owners and admins)
+    const url = new URL(request.url)
+    const groupBy = url.searchParams.get('group_by')
+    const from = url.searchParams.get('from')
+    const to = url.searchParams.get('to')
+    const billable = url.searchParams.get('billable')
+    const workspaceId = url.searchParams.get('workspace_id')
+    
+    if (!REPORT_GROUPS.includes(groupBy)) {
+      return NextResponse.json({ error: `group_by must be one of ${REPORT_GROUPS.join(', ')}` }, { status: 400 })
+    }
+    if ((from && !DAY_PATTERN.test(from)) || (to && !DAY_PATTERN.test(to))) {
+      return NextResponse.json({ error: 'from/to must be dates in YYYY-MM-DD format' }, { status: 400 })
+    }
+    if (from && to && from > to) {
+      return NextResponse.json({ error: 'from must not be after to' }, { status: 400 })
+    }
+    if (billable && billable !== 'true' && billable !== 'false') {
+      return NextResponse.json({ error: 'billable must be true or false' }, { status: 400 })
+    }
+    if (workspaceId && !UUID_PATTERN.test(workspaceId)) {
+      return NextResponse.json({ error: 'workspace_id must be a UUID' }, { status: 400 })
     }
     
-    // Get time stats for today, this week, this month
-    const today = new Date()
-    today.setHours(0, 0, 0, 0)
+    // time_report only answers when p_user_id is the signed-in caller (auth.uid())
+    const { data: report, error } = await supabaseAs(request).rpc('time_report', {
+      p_user_id: user.id,
+      p_group_by: groupBy,
+      p_from: from,
+      p_to: to,
+      p_billable: billable ? billable === 'true' : null,
+      p_workspace_id: workspaceId
+    })
     
-    const { data: todayEntries } = await supabase
-      .from('time_entries')
-      .select('duration')
-      .gte('start_time', today.toISOString())
-      .not('duration', 'is', null)
+    if (error) throw error
+    if (!report) return NextResponse.json({ error: 'Workspace not found' }, { status: 404 })
     
-    const weekAgo = new Date()
-    weekAgo.setDate(weekAgo.getDate() - 7)
+    return NextResponse.json({ group_by: groupBy, rows: report.rows, total: report.total })
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+// Delta sync: what changed in tasks, projects, time entries, messages and docs since a
+// cursor, read from the sync_changes log in one RPC (see sync_since in supabase-schema.sql)
+const SYNC_PAGE_SIZE = 1000
+const SYNC_PAGE_SIZE_MAX = 5000
+const SYNC_CURSOR_PATTERN = /^\d{1,18}$/
+
+// sync_changes keeps 30 days (prune_sync_changes in supabase-schema.sql). Instances prune
+// it from here, at most once per SYNC_PRUNE_INTERVAL_MS, off the request's path.
+const SYNC_PRUNE_INTERVAL_MS = 60 * 60 * 1000
+let syncPrunedAt = 0
+
+function pruneSyncLog() {
+  if (Date.now() - syncPrunedAt < SYNC_PRUNE_INTERVAL_MS) return
+  syncPrunedAt = Date.now()
+  supabase.rpc('prune_sync_changes').then(({ error }) => {
+    if (error) console.error(`prune_sync_changes: ${error.message}`)
+  })
+}
+
+async function getSync(request) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
     
-    const { data: weekEntries } = await supabase
-      .from('time_entries')
-      .select('duration')
-      .gte('start_time', weekAgo.toISOString())
-      .not('duration', 'is', null)
+    // No since means "from the beginning": page through with the returned cursor. A cursor
+    // from before the pruned part of the log comes back with reset: true and no rows; the
+    // client reloads everything and syncs on from the returned cursor.
+    const url = new URL(request.url)
+    const since = url.searchParams.get('since') || '0'
+    if (!SYNC_CURSOR_PATTERN.test(since)) {
+      return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 })
+    }
+    const limit = parseInt(url.searchParams.get('limit') || SYNC_PAGE_SIZE, 10)
+    if (!Number.isInteger(limit) || limit < 1 || limit > SYNC_PAGE_SIZE_MAX) {
+      return NextResponse.json({ error: `limit must be between 1 and ${SYNC_PAGE_SIZE_MAX}` }, { status: 400 })
+    }
     
-    const monthAgo = new Date()
-    monthAgo.setDate(monthAgo.getDate() - 30)
+    const { data: changes, error } = await supabase.rpc('sync_since', {
+      p_user_id: user.id,
+      p_since: since,
+      p_limit: limit
+    })
     
-    const { data: monthEntries } = await supabase
-      .from('time_entries')
-      .select('duration')
-      .gte('start_time', monthAgo.toISOString())
-      .not('duration', 'is', null)
+    if (error) throw error
+    
+    pruneSyncLog()
+    return NextResponse.json({ ...changes, cursor: String(changes.cursor) })
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+// Full-text search over tasks, docs and messages in the caller's workspaces, ranked in
+// the database (see search_workspace in supabase-schema.sql)
+const SEARCH_TYPES = ['tasks', 'docs', 'messages']
+const SEARCH_PAGE_SIZE = 20
+const SEARCH_PAGE_SIZE_MAX = 50
+const SEARCH_QUERY_MAX = 200
+
+// Opaque keyset cursor over (rank, type, id)
+function encodeSearchCursor(result) {
+  return Buffer.from(JSON.stringify([result.rank, result.type, result.id])).toString('base64url')
+}
+
+function decodeSearchCursor(cursor) {
+  try {
+    const [rank, type, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString())
+    if (typeof rank !== 'number' || !Number.isFinite(rank)) return null
+    if (!SEARCH_TYPES.includes(type)) return null
+    if (typeof id !== 'string' || !UUID_PATTERN.test(id)) return null
+    return { rank, type, id }
+  } catch {
+    return null
+  }
+}
+
+async function searchWorkspace(request) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+    
+    const url = new URL(request.url)
+    const q = (url.searchParams.get('q') || '').trim()
+    if (!q) return NextResponse.json({ error: 'q is required' }, { status: 400 })
+    if (q.length > SEARCH_QUERY_MAX) {
+      return NextResponse.json({ error: `q must be at most ${SEARCH_QUERY_MAX} characters` }, { status: 400 })
+    }
+    
+    const typesParam = url.searchParams.get('types')
+    const types = typesParam ? typesParam.split(',').map(type => type.trim()) : SEARCH_TYPES
+    if (!types.length || types.some(type => !SEARCH_TYPES.includes(type))) {
+      return NextResponse.json({ error: `types must be a comma-separated subset of ${SEARCH_TYPES.join(', ')}` }, { status: 400 })
+    }
+    
+    const workspaceId = url.searchParams.get('workspace_id')
+    if (workspaceId && !UUID_PATTERN.test(workspaceId)) {
+      return NextResponse.json({ error: 'workspace_id must be a UUID' }, { status: 400 })
+    }
     
-    const timeStats = {
-      today: todayEntries?.reduce((sum, e) => sum + (e.duration || 0), 0) || 0,
-      week: weekEntries?.reduce((sum, e) => sum + (e.duration || 0), 0) || 0,
-      month: monthEntries?.reduce((sum, e) => sum + (e.duration || 0), 0) || 0
+    const limit = parseInt(url.searchParams.get('limit') || SEARCH_PAGE_SIZE, 10)
+    if (!Number.isInteger(limit) || limit < 1 || limit > SEARCH_PAGE_SIZE_MAX) {
+      return NextResponse.json({ error: `limit must be between 1 and ${SEARCH_PAGE_SIZE_MAX}` }, { status: 400 })
     }
     
-    return NextResponse.json({ taskStats, timeStats })
+    let cursor = null
+    const cursorParam = url.searchParams.get('cursor')
+    if (cursorParam) {
+      cursor = decodeSearchCursor(cursorParam)
+      if (!cursor) return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 })
+    }
+    
+    const { data: page, error } = await supabase.rpc('search_workspace', {
+      p_user_id: user.id,
+      p_query: q,
+      p_types: types,
+      p_workspace_id: workspaceId,
+      p_limit: limit,
+      p_after_rank: cursor?.rank ?? null,
+      p_after_type: cursor?.type ?? null,
+      p_after_id: cursor?.id ?? null
+    })
+    
+    if (error) throw error
+    
+    const { results, has_more } = page
+    const next_cursor = has_more ? encodeSearchCursor(results[results.length - 1]) : null
+    
+    return NextResponse.json({ results, next_cursor })
   } catch (error) {
     return NextResponse.json({ error: error.message }, { status: 500 })
   }
 }
 
+// Chat history, newest first. Pages are keyset ranges on (timestamp, id), so each one is
+// a single range scan on idx_messages_channel_timestamp_id however far back it starts
+const MESSAGE_PAGE_SIZE = 50
+const MESSAGE_PAGE_SIZE_MAX = 200
+const MESSAGE_CONTENT_MAX = 4000
+const CHANNEL_MESSAGES_PATH = /^channels\/([^/]+)\/messages$/
+const MESSAGE_FIELDS = '*, sender:users!messages_sender_id_fkey(id, name)'
+
+async function getChannelMessages(request, channelId) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+    if (!UUID_PATTERN.test(channelId)) return NextResponse.json({ error: 'Channel not found' }, { status: 404 })
+    
+    const url = new URL(request.url)
+    const limit = parseInt(url.searchParams.get('limit') || MESSAGE_PAGE_SIZE, 10)
+    if (!Number.isInteger(limit) || limit < 1 || limit > MESSAGE_PAGE_SIZE_MAX) {
+      return NextResponse.json({ error: `limit must be between 1 and ${MESSAGE_PAGE_SIZE_MAX}` }, { status: 400 })
+    }
+    
+    let cursor = null
+    const before = url.searchParams.get('before')
+    if (before) {
+      cursor = decodeCursor(before)
+      if (!cursor) return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 })
+    }
+    
+    // The channel and its page of messages come back from one query, in parallel with the
+    // (usually cached) membership lookup
+    let query = supabase
+      .from('channels')
+      .select(`id, workspace_id, messages(${MESSAGE_FIELDS})`)
+      .eq('id', channelId)
+      .order('timestamp', { referencedTable: 'messages', ascending: false })
+      .order('id', { referencedTable: 'messages', ascending: false })
+      .limit(limit + 1, { referencedTable: 'messages' })
+    
+    // As in getTasks, the redundant lte gives the index scan its starting point
+    if (cursor) {
+      query = query.lte('messages.timestamp', cursor.at).or(
+        `timestamp.lt."${cursor.at}",and(timestamp.eq."${cursor.at}",id.lt.${cursor.id})`,
+        { referencedTable: 'messages' }
+      )
+    }
+    
+    const [{ data: channel, error }, workspaceIds] = await Promise.all([
+      query.maybeSingle(),
+      getMemberWorkspaces(user.id)
+    ])
+    
+    if (error) throw error
+    if (!channel || !workspaceIds.includes(channel.workspace_id)) {
+      return NextResponse.json({ error: 'Channel not found' }, { status: 404 })
+    }
+    
+    // One extra row tells us whether older messages exist
+    const messages = channel.messages.slice(0, limit)
+    const next_cursor = channel.messages.length > limit ? encodeCursor(messages[messages.length - 1], 'timestamp') : null
+    
+    return NextResponse.json({ messages, next_cursor })
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+async function sendMessage(request, channelId) {
+  try {
+    const user = await getUser(request)
+    if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 })
+    if (!UUID_PATTERN.test(channelId)) return NextResponse.json({ error: 'Channel not found' }, { status: 404 })
+    
+    const body = await request.json()
+    const content = typeof body.content === 'string' ? body.content.trim() : ''
+    if (!content) return NextResponse.json({ error: 'content is required' }, { status: 400 })
+    if (content.length > MESSAGE_CONTENT_MAX) {
+      return NextResponse.json({ error: `content must be at most ${MESSAGE_CONTENT_MAX} characters` }, { status: 400 })
+    }
+    
+    const [{ data: channel, error: channelError }, workspaceIds] = await Promise.all([
+      supabase.from('channels').select('id, workspace_id').eq('id', channelId).maybeSingle(),
+      getMemberWorkspaces(user.id)
+    ])
+    
+    if (channelError) throw channelError
+    if (!channel || !workspaceIds.includes(channel.workspace_id)) {
+      return NextResponse.json({ error: 'Channel not found' }, { status: 404 })
+    }
+    
+    // timestamp comes from the database clock, so history order matches insert order
+    const { data: message, error } = await supabase
+      .from('messages')
+      .insert([{ channel_id: channelId, sender_id: user.id, content }])
+      .select(MESSAGE_FIELDS)
+      .single()
+    
+    if (error) throw error
+    
+    return NextResponse.json({ message })
+  } catch (error) {
+    return NextResponse.json({ error: error.message }, { status: 500 })
+  }
+}
+
+// Process metrics for soak runs (backend_test.py --mode soak), served only when the server
+// runs with FLOWOPS_METRICS=1. Counts that should stay flat for the life of the process sit
+// next to RSS and loop lag: sockets and handles, realtime channels on the shared Supabase
+// client, and the module-level caches (bounded, so they level off at their max)
+const loopDelay = process.env.FLOWOPS_METRICS === '1' ? monitorEventLoopDelay({ resolution: 10 }) : null
+loopDelay?.enable()
+
+function getServerMetrics() {
+  if (!loopDelay) return NextResponse.json({ error: 'Not found' }, { status: 404 })
+  
+  const memory = process.memoryUsage()
+  const resources = process.getActiveResourcesInfo()
+  const metrics = {
+    rss_bytes: memory.rss,
+    heap_used_bytes: memory.heapUsed,
+    // Delay since the previous sample, in ms
+    event_loop_lag_ms: {
+      mean: loopDelay.mean / 1e6,
+      p99: loopDelay.percentile(99) / 1e6,
+      max: loopDelay.max / 1e6
+    },
+    // Inbound and outbound (including TLS to Supabase) connections
+    open_sockets: resources.filter(type => type === 'TCPSocketWrap').length,
+    active_handles: resources.length,
+    supabase_channels: supabase.getChannels().length,
+    backend_calls: backendCalls,
+    // Reads that ran (calls) and reads that joined one already in flight (coalesced)
+    coalescing: {
+      enabled: coalesceReads,
+      calls: readFlights.calls,
+      coalesced: readFlights.coalesced,
+      in_flight: readFlights.size
+    },
+    // Queued activity/notification rows: depth is what is waiting now; dropped rows hit
+    // the queue bound, failed rows were in a batch the database rejected
+    audit: {
+      mode: auditMode,
+      activity_logs: activityLog.stats(),
+      notifications: notificationLog.stats()
+    },
+    caches: {
+      verified_tokens: verifiedTokens.size,
+      revoked_sessions: revocations.sessions.size,
+      workspace_versions: workspaceVersions.size,
+      member_workspaces: memberWorkspaces.size,
+      list_cache: listCache.size
+    },
+    uptime_s: process.uptime()
+  }
+  loopDelay.reset()
+  
+  return NextResponse.json(metrics, { headers: { 'Cache-Control': 'no-store' } })
+}
+
 // Main route handler
 export async function GET(request, { params }) {
   const path = params?.path?.join('/') || ''
@@ -422,6 +1418,10 @@ export async function GET(request, { params }) {
     return NextResponse.json({ message: 'FlowOps API' })
   }
   
+  if (path === 'debug/metrics') {
+    return getServerMetrics()
+  }
+  
   if (path === 'tasks') {
     return getTasks(request)
   }
@@ -438,10 +1438,31 @@ export async function GET(request, { params }) {
     return getActiveTimer(request)
   }
   
+  if (path === 'time-entries/export') {
+    return exportTimeEntries(request)
+  }
+  
   if (path === 'dashboard/stats') {
     return getDashboardStats(request)
   }
   
+  if (path === 'reports/time') {
+    return getTimeReport(request)
+  }
+  
+  if (path === 'sync') {
+    return getSync(request)
+  }
+  
+  if (path === 'search') {
+    return searchWorkspace(request)
+  }
+  
+  const channelMessages = path.match(CHANNEL_MESSAGES_PATH)
+  if (channelMessages) {
+    return getChannelMessages(request, channelMessages[1])
+  }
+  
   return NextResponse.json({ error: 'Not found' }, { status: 404 })
 }
 
@@ -464,6 +1485,10 @@ export async function POST(request, { params }) {
     return createTask(request)
   }
   
+  if (path === 'tasks/bulk') {
+    return bulkCreateTasks(request)
+  }
+  
   if (path === 'projects') {
     return createProject(request)
   }
@@ -476,12 +1501,25 @@ export async function POST(request, { params }) {
     return stopTimer(request)
   }
   
+  const channelMessages = path.match(CHANNEL_MESSAGES_PATH)
+  if (channelMessages) {
+    return sendMessage(request, channelMessages[1])
+  }
+  
+  if (path === 'time-entries/bulk') {
+    return bulkCreateTimeEntries(request)
+  }
+  
   return NextResponse.json({ error: 'Not found' }, { status: 404 })
 }
 
 export async function PUT(request, { params }) {
   const path = params?.path?.join('/') || ''
   
+  if (path === 'tasks/bulk') {
+    return bulkUpdateTasks(request)
+  }
+  
   if (path.startsWith('tasks/')) {
     const taskId = path.split('/')[1]
     return updateTask(request, taskId)
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { supabase } from '@/lib/supabase'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
@@ -16,6 +16,16 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Play, Pause, Clock, CheckCircle2, Circle, AlertCircle, Plus, LogOut, LayoutDashboard, ListTodo, Timer, Folder, Menu, X, MessageSquare, Calendar, FileText, Settings, Send, Bell } from 'lucide-react'
 import { toast } from 'sonner'
 
+// Replaces changed rows by id, drops deleted ones and puts new ones first
+function mergeRows(rows, changed, type, deleted) {
+  const changedById = new Map(changed.map(row => [row.id, row]))
+  const existing = new Set(rows.map(row => row.id))
+  const kept = rows
+    .filter(row => !deleted.has(`${type}:${row.id}`))
+    .map(row => changedById.get(row.id) || row)
+  return [...changed.filter(row => !existing.has(row.id)), ...kept]
+}
+
 const App = () => {
   const [user, setUser] = useState(null)
   const [loading, setLoading] = useState(true)
@@ -41,6 +51,8 @@ const App = () => {
   const [docs, setDocs] = useState([])
   const [notifications, setNotifications] = useState([])
   const [workspace, setWorkspace] = useState(null)
+  // Position in the sync_changes log that the loaded data reflects
+  const syncCursor = useRef(null)
   
   // Form states
   const [newTaskOpen, setNewTaskOpen] = useState(false)
@@ -84,6 +96,13 @@ const App = () => {
     }
   }, [user])
   
+  // The app stays open all day: pick up changes made elsewhere whenever it regains focus
+  useEffect(() => {
+    if (!user) return
+    window.addEventListener('focus', syncChanges)
+    return () => window.removeEventListener('focus', syncChanges)
+  }, [user])
+  
   // Timer effect
   useEffect(() => {
     if (activeTimer) {
@@ -184,6 +203,9 @@ const App = () => {
       const { data: { session } } = await supabase.auth.getSession()
       if (!session) return
 
+      // Read the log position first, so changes made during the load are replayed by the next sync
+      const { data: head } = await supabase.rpc('sync_head')
+
       // Load workspace
       const { data: membership } = await supabase
         .from('workspace_members')
@@ -228,45 +250,61 @@ const App = () => {
         .order('start_time', { ascending: false })
         .limit(50)
       setTimeEntries(entriesData || [])
-      
-      // Load dashboard stats
-      loadDashboardStats()
+      syncCursor.current = head ?? null
+      await loadDashboardStats()
     } catch (error) {
       console.error('Error loading data:', error)
     }
   }
   
-  const loadDashboardStats = async () => {
+  // Applies only what changed since the last load or sync instead of refetching everything
+  const syncChanges = async () => {
+    if (syncCursor.current === null) return loadData()
+    
     try {
-      // Task stats
-      const taskStats = {
-        total: tasks.length,
-        todo: tasks.filter(t => t.status === 'todo').length,
-        in_progress: tasks.filter(t => t.status === 'in_progress').length,
-        completed: tasks.filter(t => t.status === 'completed').length
-      }
-      
-      // Time stats
-      const today = new Date()
-      today.setHours(0, 0, 0, 0)
-      
-      const weekAgo = new Date()
-      weekAgo.setDate(weekAgo.getDate() - 7)
-      
-      const monthAgo = new Date()
-      monthAgo.setDate(monthAgo.getDate() - 30)
+      const { data: { session } } = await supabase.auth.getSession()
+      if (!session) return
       
-      const todayEntries = timeEntries.filter(e => new Date(e.start_time) >= today && e.duration)
-      const weekEntries = timeEntries.filter(e => new Date(e.start_time) >= weekAgo && e.duration)
-      const monthEntries = timeEntries.filter(e => new Date(e.start_time) >= monthAgo && e.duration)
+      let changes
+      do {
+        const { data, error } = await supabase.rpc('sync_since', {
+          p_user_id: session.user.id,
+          p_since: syncCursor.current
+        })
+        if (error) throw error
+        changes = data
+        // The cursor is older than the pruned part of the log: start over with a full load
+        if (changes.reset) return loadData()
+        
+        const deleted = new Set(changes.deleted.map(change => `${change.type}:${change.id}`))
+        setProjects(current => mergeRows(current, changes.projects, 'projects', deleted)
+          .sort((a, b) => a.name.localeCompare(b.name)))
+        setTasks(current => mergeRows(current, changes.tasks, 'tasks', deleted))
+        setTimeEntries(current => mergeRows(current, changes.time_entries, 'time_entries', deleted)
+          .sort((a, b) => new Date(b.start_time) - new Date(a.start_time))
+          .slice(0, 50))
+        syncCursor.current = changes.cursor
+      } while (changes.has_more)
+      await loadDashboardStats()
+    } catch (error) {
+      console.error('Error syncing changes:', error)
+    }
+  }
+  
+  // Stats are totalled in the database (dashboard_stats, as GET /api/dashboard/stats does):
+  // timeEntries only holds the latest 50 entries, too few for week and month totals
+  const loadDashboardStats = async () => {
+    try {
+      const { data: { session } } = await supabase.auth.getSession()
+      if (!session) return
       
-      const timeStats = {
-        today: todayEntries.reduce((sum, e) => sum + (e.duration || 0), 0),
-        week: weekEntries.reduce((sum, e) => sum + (e.duration || 0), 0),
-        month: monthEntries.reduce((sum, e) => sum + (e.duration || 0), 0)
-      }
+      const { data: stats, error } = await supabase.rpc('dashboard_stats', {
+        p_user_id: session.user.id,
+        p_today: new Date().toISOString().slice(0, 10)
+      })
+      if (error) throw error
       
-      setDashboardStats({ taskStats, timeStats })
+      setDashboardStats({ taskStats: stats.taskStats, timeStats: stats.timeStats })
     } catch (error) {
       console.error('Error loading stats:', error)
     }
@@ -407,8 +445,7 @@ const App = () => {
         .from('time_entries')
         .insert([{
           task_id: taskId,
-          user_id: session.user.id,
-          start_time: new Date().toISOString()
+          user_id: session.user.id
         }])
         .select(`
           *,
@@ -416,6 +453,12 @@ const App = () => {
         `)
         .single()
       
+      // Only one running timer per user is allowed (unique index on running entries)
+      if (error?.code === '23505') {
+        toast.error('Please stop the current timer first')
+        checkActiveTimer()
+        return
+      }
       if (error) throw error
       
       setActiveTimer(data)
@@ -429,24 +472,18 @@ const App = () => {
     try {
       if (!activeTimer) return
       
-      const endTime = new Date()
-      const startTime = new Date(activeTimer.start_time)
-      const duration = Math.floor((endTime - startTime) / 1000 / 60)
+      const { data: { session } } = await supabase.auth.getSession()
+      if (!session) return
       
-      const { data, error } = await supabase
-        .from('time_entries')
-        .update({
-          end_time: endTime.toISOString(),
-          duration: duration
-        })
-        .eq('id', activeTimer.id)
-        .select(`
-          *,
-          task:tasks(id, title)
-        `)
-        .single()
+      // end_time and duration come from the database clock
+      const { data, error } = await supabase.rpc('stop_timer', {
+        p_entry_id: activeTimer.id,
+        p_user_id: session.user.id
+      })
       
       if (error) throw error
+      if (!data) throw new Error('Timer is no longer running')
+      const duration = data.duration
       
       setActiveTimer(null)
       setTimeEntries([data, ...timeEntries])
@@ -501,36 +538,34 @@ const App = () => {
 
       toast.info('Generating demo data...')
 
-      // Create demo projects
-      const { data: proj1 } = await supabase
+      // Create demo projects (one insert for all three)
+      const { data: demoProjects, error: projectsError } = await supabase
         .from('projects')
-        .insert([{
-          workspace_id: membership.workspace_id,
-          name: 'Website Redesign',
-          description: 'Redesigning the company website with modern UI/UX'
-        }])
+        .insert([
+          {
+            workspace_id: membership.workspace_id,
+            name: 'Website Redesign',
+            description: 'Redesigning the company website with modern UI/UX'
+          },
+          {
+            workspace_id: membership.workspace_id,
+            name: 'Mobile App Development',
+            description: 'Building a cross-platform mobile application'
+          },
+          {
+            workspace_id: membership.workspace_id,
+            name: 'Marketing Campaign',
+            description: 'Q4 marketing initiatives and campaigns'
+          }
+        ])
         .select()
-        .single()
 
-      const { data: proj2 } = await supabase
-        .from('projects')
-        .insert([{
-          workspace_id: membership.workspace_id,
-          name: 'Mobile App Development',
-          description: 'Building a cross-platform mobile application'
-        }])
-        .select()
-        .single()
+      if (projectsError) throw projectsError
 
-      const { data: proj3 } = await supabase
-        .from('projects')
-        .insert([{
-          workspace_id: membership.workspace_id,
-          name: 'Marketing Campaign',
-          description: 'Q4 marketing initiatives and campaigns'
-        }])
-        .select()
-        .single()
+      const projectByName = Object.fromEntries(demoProjects.map(p => [p.name, p]))
+      const proj1 = projectByName['Website Redesign']
+      const proj2 = projectByName['Mobile App Development']
+      const proj3 = projectByName['Marketing Campaign']
 
       // Create demo tasks
       const demoTasks = [
@@ -544,20 +579,6 @@ const App = () => {
         { project_id: proj3.id, title: 'Create email templates', description: 'Design email campaign templates', status: 'todo', priority: 'medium' },
       ]
 
-      for (const task of demoTasks) {
-        await supabase.from('tasks').insert([{
-          ...task,
-          created_by: session.user.id,
-          assignee_id: session.user.id
-        }])
-      }
-
-      // Create a demo channel
-      await supabase.from('channels').insert([{
-        workspace_id: membership.workspace_id,
-        name: 'general'
-      }])
-
       // Create a demo meeting
       const tomorrow = new Date()
       tomorrow.setDate(tomorrow.getDate() + 1)
@@ -565,24 +586,34 @@ const App = () => {
       const meetingEnd = new Date(tomorrow)
       meetingEnd.setHours(11, 0, 0, 0)
 
-      await supabase.from('meetings').insert([{
-        workspace_id: membership.workspace_id,
-        title: 'Weekly Team Standup',
-        start_time: tomorrow.toISOString(),
-        end_time: meetingEnd.toISOString(),
-        notes: 'Discuss weekly progress and blockers'
-      }])
-
-      // Create a demo document
-      await supabase.from('docs').insert([{
-        workspace_id: membership.workspace_id,
-        title: 'Project Guidelines',
-        content: 'This document outlines our project development guidelines and best practices.',
-        created_by: session.user.id
-      }])
+      // Tasks go in as one insert; the independent channel, meeting and doc inserts run in parallel
+      await Promise.all([
+        supabase.from('tasks').insert(demoTasks.map(task => ({
+          ...task,
+          created_by: session.user.id,
+          assignee_id: session.user.id
+        }))),
+        supabase.from('channels').insert([{
+          workspace_id: membership.workspace_id,
+          name: 'general'
+        }]),
+        supabase.from('meetings').insert([{
+          workspace_id: membership.workspace_id,
+          title: 'Weekly Team Standup',
+          start_time: tomorrow.toISOString(),
+          end_time: meetingEnd.toISOString(),
+          notes: 'Discuss weekly progress and blockers'
+        }]),
+        supabase.from('docs').insert([{
+          workspace_id: membership.workspace_id,
+          title: 'Project Guidelines',
+          content: 'This document outlines our project development guidelines and best practices.',
+          created_by: session.user.id
+        }])
+      ])
 
       toast.success('Demo data generated successfully!')
-      loadData()
+      syncChanges()
     } catch (error) {
       console.error('Error generating seed data:', error)
       toast.error('Error generating demo data')
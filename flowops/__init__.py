@@ -0,0 +1,27 @@
+"""
+FlowOps API client.
+
+    from flowops import FlowOpsClient
+
+    with FlowOpsClient("http://localhost:3000/api") as api:
+        api.login("me@example.com", "secret")
+        for task in api.iter_tasks(status="todo"):
+            print(task["title"])
+
+AsyncFlowOpsClient has the same methods as coroutines (iter_* as async generators) on an
+httpx.AsyncClient pool. httpx is only imported when AsyncFlowOpsClient is first used, so the
+synchronous client needs nothing beyond requests.
+"""
+
+from flowops.client import FlowOpsClient
+from flowops.errors import FlowOpsError, TransientError
+
+
+def __getattr__(name):
+    if name == "AsyncFlowOpsClient":
+        from flowops.aio import AsyncFlowOpsClient
+        return AsyncFlowOpsClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["AsyncFlowOpsClient", "FlowOpsClient", "FlowOpsError", "TransientError"]
@@ -0,0 +1,276 @@
+"""
+asyncio FlowOps API client on httpx.
+
+One httpx.AsyncClient per client holds a pool of keep-alive connections shared by every
+coroutine on the event loop, so concurrent calls need neither threads nor a session shared
+across them. Routes, return values, retries and backoff are those of FlowOpsClient.
+Needs httpx (pip install httpx); the synchronous client does not.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from flowops.client import (BACKOFF_BASE, DEFAULT_RETRIES, DEFAULT_TIMEOUT, IDEMPOTENT_METHODS, PAGE_SIZE,
+                            POOL_SIZE, RETRY_STATUSES, retry_delay)
+from flowops.errors import FlowOpsError, TransientError
+
+# Transport errors worth another attempt, and the ones raised before anything was sent
+RETRYABLE_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+NEVER_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def new_http_client(timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+    """An AsyncClient with pool_size keep-alive connections; calls beyond that wait for a free one"""
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(read, connect=connect, pool=None),
+        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+
+
+def error_message(response):
+    try:
+        return response.json().get("error") or response.reason_phrase
+    except ValueError:
+        return response.reason_phrase or response.text[:200]
+
+
+class AsyncFlowOpsClient:
+    """
+    Awaitable twin of FlowOpsClient: the same methods as coroutines, iter_* as async
+    generators. on_response is called as on FlowOpsClient, with ttfb up to the headers.
+    """
+
+    def __init__(self, base_url, token=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=BACKOFF_BASE, pool_size=POOL_SIZE, http=None, on_response=None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.retries = retries
+        self.backoff = backoff
+        self.http = http or new_http_client(timeout, pool_size)
+        self.on_response = on_response
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # -- transport -----------------------------------------------------------
+
+    async def request(self, method, endpoint, json=None, params=None, headers=None, auth=True, stream=False):
+        """
+        One API call with retries; returns the last httpx.Response whatever its status.
+        With stream=True the body is left unread for aiter_lines() and the caller must
+        aclose() the response. Raises TransientError when every attempt failed to connect.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        if auth and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                # send(stream=True) returns at the headers, which is the time to first byte
+                response = await self.http.send(
+                    self.http.build_request(method, url, json=json, params=params, headers=headers), stream=True)
+            except httpx.TransportError as error:
+                if self.on_response:
+                    wall = time.perf_counter() - started
+                    self.on_response(method, endpoint, wall, wall, 0, 0)
+                retryable = isinstance(error, RETRYABLE_ERRORS) and \
+                    (method in IDEMPOTENT_METHODS or isinstance(error, NEVER_SENT_ERRORS))
+                if not retryable or attempt >= self.retries:
+                    raise TransientError(0, str(error) or type(error).__name__) from error
+                await asyncio.sleep(retry_delay(self.backoff, attempt))
+                attempt += 1
+                continue
+
+            ttfb = time.perf_counter() - started
+            if not stream:
+                try:
+                    await response.aread()
+                finally:
+                    await response.aclose()
+            if self.on_response:
+                self.on_response(method, endpoint, time.perf_counter() - started, ttfb,
+                                 0 if stream else len(response.content), response.status_code)
+            retryable = response.status_code in RETRY_STATUSES and \
+                (method in IDEMPOTENT_METHODS or response.status_code == 429)
+            if not retryable or attempt >= self.retries:
+                return response
+            await response.aclose()
+            await asyncio.sleep(retry_delay(self.backoff, attempt, response))
+            attempt += 1
+
+    async def call(self, method, endpoint, json=None, params=None, auth=True):
+        """request() that returns the JSON body and raises FlowOpsError on an error status"""
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        response = await self.request(method, endpoint, json=json, params=params or None, auth=auth)
+        if response.status_code >= 400:
+            error = TransientError if response.status_code in RETRY_STATUSES else FlowOpsError
+            raise error(response.status_code, error_message(response), response)
+        return response.json()
+
+    async def pages(self, endpoint, params, cursor_param, items_key):
+        """Yield items across pages, sending each page's next_cursor back as cursor_param"""
+        params = dict(params)
+        while True:
+            page = await self.call("GET", endpoint, params=params)
+            for item in page[items_key]:
+                yield item
+            if not page.get("next_cursor"):
+                return
+            params[cursor_param] = page["next_cursor"]
+
+    # -- auth ----------------------------------------------------------------
+
+    async def signup(self, email, password, name=None):
+        """Create an account; the client keeps the new session's token. Returns {user, session}"""
+        result = await self.call("POST", "auth/signup", {"email": email, "password": password, "name": name},
+                                 auth=False)
+        self.token = result["session"]["access_token"] if result.get("session") else None
+        return result
+
+    async def login(self, email, password):
+        result = await self.call("POST", "auth/login", {"email": email, "password": password}, auth=False)
+        self.token = result["session"]["access_token"]
+        return result
+
+    async def logout(self):
+        result = await self.call("POST", "auth/logout")
+        self.token = None
+        return result
+
+    # -- projects ------------------------------------------------------------
+
+    async def projects(self):
+        return (await self.call("GET", "projects"))["projects"]
+
+    async def create_project(self, name, description=None, workspace_id=None):
+        body = {"name": name, "description": description, "workspace_id": workspace_id}
+        return (await self.call("POST", "projects", {k: v for k, v in body.items() if v is not None}))["project"]
+
+    # -- tasks ---------------------------------------------------------------
+
+    async def tasks(self, status=None, project_id=None, assignee_id=None, limit=None, cursor=None):
+        """One page: {tasks, next_cursor}, newest first"""
+        return await self.call("GET", "tasks", params={"status": status, "project_id": project_id,
+                                                       "assignee_id": assignee_id, "limit": limit, "cursor": cursor})
+
+    def iter_tasks(self, status=None, project_id=None, assignee_id=None, page_size=PAGE_SIZE):
+        """Every matching task, newest first, fetched page_size at a time"""
+        params = {"status": status, "project_id": project_id, "assignee_id": assignee_id, "limit": page_size}
+        return self.pages("tasks", params, "cursor", "tasks")
+
+    async def create_task(self, title, project_id=None, **fields):
+        """fields: description, assignee_id, status, priority, due_date"""
+        return (await self.call("POST", "tasks", {"title": title, "project_id": project_id, **fields}))["task"]
+
+    async def update_task(self, task_id, **fields):
+        return (await self.call("PUT", f"tasks/{task_id}", fields))["task"]
+
+    async def bulk_create_tasks(self, tasks):
+        """Up to 1000 tasks; returns {created: [{index, id}], errors: [{index, error}]}"""
+        return await self.call("POST", "tasks/bulk", {"tasks": list(tasks)})
+
+    async def bulk_update_tasks(self, updates):
+        """Up to 1000 {id, ...fields}; returns {updated, errors}"""
+        return await self.call("PUT", "tasks/bulk", {"tasks": list(updates)})
+
+    # -- time tracking -------------------------------------------------------
+
+    async def time_entries(self, task_id=None):
+        return (await self.call("GET", "time-entries", params={"task_id": task_id}))["entries"]
+
+    async def start_timer(self, task_id, description=None, billable=None):
+        body = {"task_id": task_id, "description": description, "billable": billable}
+        return (await self.call("POST", "time-entries/start",
+                                {k: v for k, v in body.items() if v is not None}))["entry"]
+
+    async def stop_timer(self, entry_id):
+        return (await self.call("POST", "time-entries/stop", {"entry_id": entry_id}))["entry"]
+
+    async def active_timer(self):
+        """The running entry, or None"""
+        return (await self.call("GET", "time-entries/active"))["entry"]
+
+    async def bulk_create_time_entries(self, entries):
+        """Up to 1000 finished entries; returns {created, errors}"""
+        return await self.call("POST", "time-entries/bulk", {"entries": list(entries)})
+
+    async def export_time_entries(self, day_from=None, day_to=None, project_id=None, billable=None):
+        """
+        Every finished entry in (start_time, id) order, parsed from the NDJSON stream as it
+        arrives. The response is closed in a finally, so stopping early frees the connection.
+        """
+        params = {"format": "ndjson", "from": day_from, "to": day_to, "project_id": project_id,
+                  "billable": None if billable is None else str(bool(billable)).lower()}
+        response = await self.request("GET", "time-entries/export", stream=True,
+                                      params={k: v for k, v in params.items() if v is not None})
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                raise FlowOpsError(response.status_code, error_message(response), response)
+            async for line in response.aiter_lines():
+                if line:
+                    yield json.loads(line)
+        finally:
+            await response.aclose()
+
+    # -- dashboard and reports -----------------------------------------------
+
+    async def dashboard_stats(self, day_from=None, day_to=None):
+        """{taskStats, timeStats}; a from/to day range adds timeStats.range"""
+        return await self.call("GET", "dashboard/stats", params={"from": day_from, "to": day_to})
+
+    async def time_report(self, group_by, day_from=None, day_to=None, billable=None, workspace_id=None):
+        """{group_by, rows, total}; group_by is project, user, task, day or week"""
+        return await self.call("GET", "reports/time", params={
+            "group_by": group_by, "from": day_from, "to": day_to, "workspace_id": workspace_id,
+            "billable": None if billable is None else str(bool(billable)).lower()
+        })
+
+    # -- sync, search and chat -----------------------------------------------
+
+    async def sync(self, since="0", limit=None):
+        """One batch of changes after the since cursor; see FlowOpsClient.sync for reset"""
+        return await self.call("GET", "sync", params={"since": since, "limit": limit})
+
+    async def iter_sync(self, since="0", limit=None):
+        """Sync batches until caught up; the last batch's cursor is the one to keep"""
+        while True:
+            batch = await self.sync(since, limit)
+            yield batch
+            if not batch["has_more"]:
+                return
+            since = batch["cursor"]
+
+    async def search(self, q, types=None, workspace_id=None, limit=None, cursor=None):
+        """One page of ranked matches: {results, next_cursor}"""
+        return await self.call("GET", "search", params={"q": q, "types": ",".join(types) if types else None,
+                                                        "workspace_id": workspace_id, "limit": limit,
+                                                        "cursor": cursor})
+
+    def iter_search(self, q, types=None, workspace_id=None, page_size=None):
+        params = {"q": q, "types": ",".join(types) if types else None, "workspace_id": workspace_id,
+                  "limit": page_size}
+        return self.pages("search", params, "cursor", "results")
+
+    async def channel_messages(self, channel_id, limit=None, before=None):
+        """One page of history, newest first: {messages, next_cursor}"""
+        return await self.call("GET", f"channels/{channel_id}/messages", params={"limit": limit, "before": before})
+
+    def iter_channel_messages(self, channel_id, page_size=PAGE_SIZE):
+        """The whole history, newest first"""
+        return self.pages(f"channels/{channel_id}/messages", {"limit": page_size}, "before", "messages")
+
+    async def send_message(self, channel_id, content):
+        return (await self.call("POST", f"channels/{channel_id}/messages", {"content": content}))["message"]
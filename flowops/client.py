@@ -0,0 +1,296 @@
+"""
+Synchronous FlowOps API client.
+
+One requests.Session per client keeps connections alive between calls (no TCP/TLS
+handshake per request) in a pool sized for concurrent use from several threads.
+Transient failures are retried a bounded number of times with exponential backoff:
+connection errors and 429/502/503/504 for GET/PUT/DELETE, and for POST only failures
+that cannot have reached the server (refused connections, connect timeouts, 429).
+"""
+
+import json
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from flowops.errors import FlowOpsError, TransientError
+
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+DEFAULT_RETRIES = 3  # extra attempts after the first
+BACKOFF_BASE = 0.2  # seconds before the first retry; doubles every retry
+BACKOFF_MAX = 5.0  # cap on a single wait, including Retry-After
+POOL_SIZE = 32  # keep-alive connections per host
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+PAGE_SIZE = 200  # default page size for the iterators (the API's maximum for tasks and messages)
+
+
+def new_session(pool_size=POOL_SIZE):
+    """A Session whose pool holds pool_size keep-alive connections; retries are done by the client"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def never_sent(error):
+    """True when a failed request cannot have reached the server, so even a POST may be resent"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def retry_delay(backoff, attempt, response=None):
+    """Seconds to wait before retry number attempt + 1: Retry-After if given, else jittered backoff"""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(BACKOFF_MAX, float(retry_after))
+    return min(BACKOFF_MAX, backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def error_message(response):
+    try:
+        return response.json().get("error") or response.reason
+    except ValueError:
+        return response.reason or response.text[:200]
+
+
+class FlowOpsClient:
+    """
+    Pooled client with one method per route. Methods return the parsed JSON (unwrapped where
+    the API wraps a single object, e.g. create_task returns the task) and raise FlowOpsError
+    for error statuses. iter_* methods follow the API's cursors page by page.
+
+    on_response(method, endpoint, wall_s, ttfb_s, size, status) is called after every
+    attempt, with status 0 for a connection failure; backend_test.py records timings with it.
+    """
+
+    def __init__(self, base_url, token=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=BACKOFF_BASE, pool_size=POOL_SIZE, session=None, on_response=None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or new_session(pool_size)
+        self.on_response = on_response
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -- transport -----------------------------------------------------------
+
+    def retry_delay(self, attempt, response=None):
+        return retry_delay(self.backoff, attempt, response)
+
+    def request(self, method, endpoint, json=None, params=None, headers=None, auth=True, stream=False):
+        """
+        One API call with retries; returns the last requests.Response whatever its status.
+        With stream=True the body is left unread for iter_lines(). Raises TransientError
+        when every attempt failed to connect.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        if auth and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                # stream=True so response.elapsed stops at the headers (time to first byte)
+                response = self.session.request(method, url, json=json, params=params, headers=headers,
+                                                timeout=self.timeout, stream=True)
+            except requests.RequestException as error:
+                if self.on_response:
+                    wall = time.perf_counter() - started
+                    self.on_response(method, endpoint, wall, wall, 0, 0)
+                retryable = isinstance(error, (requests.ConnectionError, requests.Timeout)) and \
+                    (method in IDEMPOTENT_METHODS or never_sent(error))
+                if not retryable or attempt >= self.retries:
+                    raise TransientError(0, str(error)) from error
+                time.sleep(self.retry_delay(attempt))
+                attempt += 1
+                continue
+
+            size = 0 if stream else len(response.content)
+            if self.on_response:
+                self.on_response(method, endpoint, time.perf_counter() - started,
+                                 response.elapsed.total_seconds(), size, response.status_code)
+            retryable = response.status_code in RETRY_STATUSES and \
+                (method in IDEMPOTENT_METHODS or response.status_code == 429)
+            if not retryable or attempt >= self.retries:
+                return response
+            response.close()
+            time.sleep(self.retry_delay(attempt, response))
+            attempt += 1
+
+    def call(self, method, endpoint, json=None, params=None, auth=True):
+        """request() that returns the JSON body and raises FlowOpsError on an error status"""
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        response = self.request(method, endpoint, json=json, params=params or None, auth=auth)
+        if response.status_code >= 400:
+            error = TransientError if response.status_code in RETRY_STATUSES else FlowOpsError
+            raise error(response.status_code, error_message(response), response)
+        return response.json()
+
+    def pages(self, endpoint, params, cursor_param, items_key):
+        """Yield items across pages, sending each page's next_cursor back as cursor_param"""
+        params = dict(params)
+        while True:
+            page = self.call("GET", endpoint, params=params)
+            yield from page[items_key]
+            if not page.get("next_cursor"):
+                return
+            params[cursor_param] = page["next_cursor"]
+
+    # -- auth ----------------------------------------------------------------
+
+    def signup(self, email, password, name=None):
+        """Create an account; the client keeps the new session's token. Returns {user, session}"""
+        result = self.call("POST", "auth/signup", {"email": email, "password": password, "name": name}, auth=False)
+        self.token = result["session"]["access_token"] if result.get("session") else None
+        return result
+
+    def login(self, email, password):
+        result = self.call("POST", "auth/login", {"email": email, "password": password}, auth=False)
+        self.token = result["session"]["access_token"]
+        return result
+
+    def logout(self):
+        result = self.call("POST", "auth/logout")
+        self.token = None
+        return result
+
+    # -- projects ------------------------------------------------------------
+
+    def projects(self):
+        return self.call("GET", "projects")["projects"]
+
+    def create_project(self, name, description=None, workspace_id=None):
+        body = {"name": name, "description": description, "workspace_id": workspace_id}
+        return self.call("POST", "projects", {k: v for k, v in body.items() if v is not None})["project"]
+
+    # -- tasks ---------------------------------------------------------------
+
+    def tasks(self, status=None, project_id=None, assignee_id=None, limit=None, cursor=None):
+        """One page: {tasks, next_cursor}, newest first"""
+        return self.call("GET", "tasks", params={"status": status, "project_id": project_id,
+                                                 "assignee_id": assignee_id, "limit": limit, "cursor": cursor})
+
+    def iter_tasks(self, status=None, project_id=None, assignee_id=None, page_size=PAGE_SIZE):
+        """Every matching task, newest first, fetched page_size at a time"""
+        params = {"status": status, "project_id": project_id, "assignee_id": assignee_id, "limit": page_size}
+        return self.pages("tasks", params, "cursor", "tasks")
+
+    def create_task(self, title, project_id=None, **fields):
+        """fields: description, assignee_id, status, priority, due_date"""
+        return self.call("POST", "tasks", {"title": title, "project_id": project_id, **fields})["task"]
+
+    def update_task(self, task_id, **fields):
+        return self.call("PUT", f"tasks/{task_id}", fields)["task"]
+
+    def bulk_create_tasks(self, tasks):
+        """Up to 1000 tasks; returns {created: [{index, id}], errors: [{index, error}]}"""
+        return self.call("POST", "tasks/bulk", {"tasks": list(tasks)})
+
+    def bulk_update_tasks(self, updates):
+        """Up to 1000 {id, ...fields}; returns {updated, errors}"""
+        return self.call("PUT", "tasks/bulk", {"tasks": list(updates)})
+
+    # -- time tracking -------------------------------------------------------
+
+    def time_entries(self, task_id=None):
+        return self.call("GET", "time-entries", params={"task_id": task_id})["entries"]
+
+    def start_timer(self, task_id, description=None, billable=None):
+        body = {"task_id": task_id, "description": description, "billable": billable}
+        return self.call("POST", "time-entries/start", {k: v for k, v in body.items() if v is not None})["entry"]
+
+    def stop_timer(self, entry_id):
+        return self.call("POST", "time-entries/stop", {"entry_id": entry_id})["entry"]
+
+    def active_timer(self):
+        """The running entry, or None"""
+        return self.call("GET", "time-entries/active")["entry"]
+
+    def bulk_create_time_entries(self, entries):
+        """Up to 1000 finished entries; returns {created, errors}"""
+        return self.call("POST", "time-entries/bulk", {"entries": list(entries)})
+
+    def export_time_entries(self, day_from=None, day_to=None, project_id=None, billable=None):
+        """Every finished entry in (start_time, id) order, parsed from the NDJSON stream as it arrives"""
+        params = {"format": "ndjson", "from": day_from, "to": day_to, "project_id": project_id,
+                  "billable": None if billable is None else str(bool(billable)).lower()}
+        response = self.request("GET", "time-entries/export", stream=True,
+                                params={k: v for k, v in params.items() if v is not None})
+        with response:
+            if response.status_code >= 400:
+                raise FlowOpsError(response.status_code, error_message(response), response)
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    # -- dashboard and reports -----------------------------------------------
+
+    def dashboard_stats(self, day_from=None, day_to=None):
+        """{taskStats, timeStats}; a from/to day range adds timeStats.range"""
+        return self.call("GET", "dashboard/stats", params={"from": day_from, "to": day_to})
+
+    def time_report(self, group_by, day_from=None, day_to=None, billable=None, workspace_id=None):
+        """{group_by, rows, total}; group_by is project, user, task, day or week"""
+        return self.call("GET", "reports/time", params={
+            "group_by": group_by, "from": day_from, "to": day_to, "workspace_id": workspace_id,
+            "billable": None if billable is None else str(bool(billable)).lower()
+        })
+
+    # -- sync, search and chat -----------------------------------------------
+
+    def sync(self, since="0", limit=None):
+        """
+        One batch of changes after the since cursor: rows per entity, deleted, cursor, has_more.
+        reset: true means since is older than the pruned part of the log: reload everything
+        and sync on from the returned cursor
+        """
+        return self.call("GET", "sync", params={"since": since, "limit": limit})
+
+    def iter_sync(self, since="0", limit=None):
+        """Sync batches until caught up; the last batch's cursor is the one to keep"""
+        while True:
+            batch = self.sync(since, limit)
+            yield batch
+            if not batch["has_more"]:
+                return
+            since = batch["cursor"]
+
+    def search(self, q, types=None, workspace_id=None, limit=None, cursor=None):
+        """One page of ranked matches: {results, next_cursor}"""
+        return self.call("GET", "search", params={"q": q, "types": ",".join(types) if types else None,
+                                                  "workspace_id": workspace_id, "limit": limit, "cursor": cursor})
+
+    def iter_search(self, q, types=None, workspace_id=None, page_size=None):
+        params = {"q": q, "types": ",".join(types) if types else None, "workspace_id": workspace_id,
+                  "limit": page_size}
+        return self.pages("search", params, "cursor", "results")
+
+    def channel_messages(self, channel_id, limit=None, before=None):
+        """One page of history, newest first: {messages, next_cursor}"""
+        return self.call("GET", f"channels/{channel_id}/messages", params={"limit": limit, "before": before})
+
+    def iter_channel_messages(self, channel_id, page_size=PAGE_SIZE):
+        """The whole history, newest first"""
+        return self.pages(f"channels/{channel_id}/messages", {"limit": page_size}, "before", "messages")
+
+    def send_message(self, channel_id, content):
+        return self.call("POST", f"channels/{channel_id}/messages", {"content": content})["message"]
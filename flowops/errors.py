@@ -0,0 +1,15 @@
+"""Exceptions raised by the FlowOps client"""
+
+
+class FlowOpsError(Exception):
+    """The API answered with an error status; message is its {"error": ...} text"""
+
+    def __init__(self, status, message, response=None):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+        self.response = response
+
+
+class TransientError(FlowOpsError):
+    """A retryable failure (connection error, 429 or 502/503/504) that outlasted the retries"""
@@ -0,0 +1,114 @@
+import { createHmac, createPublicKey, timingSafeEqual, verify } from 'crypto'
+
+// Local verification of Supabase access tokens, so authenticated routes don't need
+// a round trip to the auth server. HS256 tokens are checked against the project's JWT
+// secret; asymmetric tokens (RS256/ES256) against the project's JWKS, fetched once
+// and refreshed every JWKS_TTL_MS or when an unknown key id shows up (key rotation), but
+// at most once per JWKS_REFRESH_MIN_MS: tokens with made-up key ids are rejected in between
+// instead of each costing a JWKS fetch.
+
+const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL
+const jwtSecret = process.env.SUPABASE_JWT_SECRET
+const JWKS_TTL_MS = 10 * 60 * 1000
+const JWKS_REFRESH_MIN_MS = 30 * 1000
+const CLOCK_SKEW_S = 30
+
+let jwks = { keys: new Map(), fetchedAt: 0 }
+let jwksAttemptedAt = 0
+let jwksLoading = null
+
+function decodeSegment(segment) {
+  return JSON.parse(Buffer.from(segment, 'base64url').toString())
+}
+
+function loadJwks(force = false) {
+  const now = Date.now()
+  if (now - jwks.fetchedAt < JWKS_TTL_MS && !(force && now - jwksAttemptedAt >= JWKS_REFRESH_MIN_MS)) {
+    return jwks.keys
+  }
+  // Concurrent reloads share one fetch
+  jwksLoading ??= fetchJwks().finally(() => { jwksLoading = null })
+  return jwksLoading
+}
+
+async function fetchJwks() {
+  jwksAttemptedAt = Date.now()
+  const response = await fetch(`${supabaseUrl}/auth/v1/.well-known/jwks.json`)
+  if (!response.ok) throw new Error(`JWKS fetch failed: ${response.status}`)
+  const { keys = [] } = await response.json()
+  jwks = {
+    keys: new Map(keys.map(jwk => [jwk.kid, createPublicKey({ key: jwk, format: 'jwk' })])),
+    fetchedAt: Date.now()
+  }
+  return jwks.keys
+}
+
+async function verifySignature(header, signingInput, signature) {
+  if (header.alg === 'HS256') {
+    if (!jwtSecret) return null
+    const expected = createHmac('sha256', jwtSecret).update(signingInput).digest()
+    return expected.length === signature.length && timingSafeEqual(expected, signature)
+  }
+
+  if (header.alg === 'RS256' || header.alg === 'ES256') {
+    let keys = await loadJwks()
+    if (!keys.has(header.kid)) keys = await loadJwks(true)
+    const key = keys.get(header.kid)
+    if (!key) return false
+    return verify('sha256', Buffer.from(signingInput), {
+      key,
+      dsaEncoding: header.alg === 'ES256' ? 'ieee-p1363' : undefined
+    }, signature)
+  }
+
+  return null
+}
+
+// Returns the token's claims when valid, false when it is definitely invalid (bad
+// signature, expired, wrong audience) and null when it can't be checked locally
+// (no secret configured, unsupported algorithm) so the caller can fall back.
+export async function verifySupabaseJwt(token) {
+  const parts = token.split('.')
+  if (parts.length !== 3) return false
+
+  let header, claims
+  try {
+    header = decodeSegment(parts[0])
+    claims = decodeSegment(parts[1])
+  } catch {
+    return false
+  }
+
+  const valid = await verifySignature(header, `${parts[0]}.${parts[1]}`, Buffer.from(parts[2], 'base64url'))
+  if (valid === null) return null
+  if (!valid) return false
+
+  const now = Math.floor(Date.now() / 1000)
+  if (typeof claims.exp !== 'number' || claims.exp + CLOCK_SKEW_S <= now) return false
+  if (typeof claims.nbf === 'number' && claims.nbf - CLOCK_SKEW_S > now) return false
+  if (claims.aud !== 'authenticated' || !claims.sub) return false
+
+  return claims
+}
+
+// Shape a verified token like the user object supabase.auth.getUser() returns
+export function userFromClaims(claims) {
+  return {
+    id: claims.sub,
+    aud: claims.aud,
+    role: claims.role,
+    email: claims.email,
+    phone: claims.phone,
+    app_metadata: claims.app_metadata || {},
+    user_metadata: claims.user_metadata || {},
+    session_id: claims.session_id
+  }
+}
+
+export function decodeClaims(token) {
+  try {
+    return decodeSegment(token.split('.')[1])
+  } catch {
+    return null
+  }
+}
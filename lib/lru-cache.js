@@ -0,0 +1,47 @@
+// Small bounded LRU cache with per-entry expiry, for server-side hot paths.
+// Map keeps insertion order, so the first key is always the least recently used.
+export class LRUCache {
+  constructor({ max = 1000, ttlMs = 60000 } = {}) {
+    this.max = max
+    this.ttlMs = ttlMs
+    this.entries = new Map()
+  }
+
+  get(key) {
+    const entry = this.entries.get(key)
+    if (!entry) return undefined
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key)
+      return undefined
+    }
+    // Re-insert to mark as most recently used
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    return entry.value
+  }
+
+  has(key) {
+    return this.get(key) !== undefined
+  }
+
+  set(key, value, ttlMs = this.ttlMs) {
+    if (ttlMs <= 0) return
+    this.entries.delete(key)
+    this.entries.set(key, { value, expiresAt: Date.now() + ttlMs })
+    while (this.entries.size > this.max) {
+      this.entries.delete(this.entries.keys().next().value)
+    }
+  }
+
+  delete(key) {
+    return this.entries.delete(key)
+  }
+
+  clear() {
+    this.entries.clear()
+  }
+
+  get size() {
+    return this.entries.size
+  }
+}
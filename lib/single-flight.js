@@ -0,0 +1,29 @@
+// Request coalescing: concurrent calls with the same key share one in-flight promise.
+// Nothing is kept once it settles, so this only merges requests that overlap in time;
+// callers put everything the result depends on (route, query, access scope) in the key.
+export class SingleFlight {
+  constructor() {
+    this.inFlight = new Map()
+    this.calls = 0
+    this.coalesced = 0
+  }
+
+  run(key, load) {
+    const pending = this.inFlight.get(key)
+    if (pending) {
+      this.coalesced++
+      return pending
+    }
+
+    this.calls++
+    const promise = Promise.resolve()
+      .then(load)
+      .finally(() => this.inFlight.delete(key))
+    this.inFlight.set(key, promise)
+    return promise
+  }
+
+  get size() {
+    return this.inFlight.size
+  }
+}
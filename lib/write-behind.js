@@ -0,0 +1,136 @@
+// Write-behind queue: callers push rows and return at once; rows are written in batches
+// when maxBatch of them are waiting or maxDelayMs after the first one arrived, whichever
+// comes first. One batch is in flight at a time. The queue holds at most maxQueue rows:
+// beyond that (the database is down or slower than the write rate) new rows are dropped
+// and counted rather than buffered without bound, so only use it for best-effort rows.
+export class WriteBehindQueue {
+  constructor({ write, maxBatch = 500, maxDelayMs = 1000, maxQueue = 10000, name = 'write-behind' }) {
+    this.write = write
+    this.maxBatch = maxBatch
+    this.maxDelayMs = maxDelayMs
+    this.maxQueue = maxQueue
+    this.name = name
+    this.queue = []
+    this.timer = null
+    this.flushing = Promise.resolve()
+    this.closed = false
+    this.enqueued = 0
+    this.written = 0
+    this.dropped = 0
+    this.failed = 0
+    this.batches = 0
+  }
+
+  push(row) {
+    if (this.closed || this.queue.length >= this.maxQueue) {
+      this.dropped++
+      return false
+    }
+
+    this.queue.push(row)
+    this.enqueued++
+    if (this.queue.length === this.maxBatch) {
+      this.flush()
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => this.flush(), this.maxDelayMs)
+      // A pending flush must not keep the process alive; beforeExit drains the queue instead
+      this.timer.unref?.()
+    }
+    return true
+  }
+
+  // Writes rows now, with the same counters; for callers that want the write on their own path
+  async writeThrough(rows) {
+    this.enqueued += rows.length
+    await this.writeBatch(rows)
+  }
+
+  // Resolves once everything queued before the call has been written (or has failed)
+  flush() {
+    clearTimeout(this.timer)
+    this.timer = null
+    this.flushing = this.flushing.then(() => this.drain())
+    return this.flushing
+  }
+
+  // Stops accepting rows and writes what is left
+  close() {
+    this.closed = true
+    return this.flush()
+  }
+
+  async drain() {
+    while (this.queue.length) {
+      await this.writeBatch(this.queue.splice(0, this.maxBatch))
+    }
+  }
+
+  async writeBatch(rows) {
+    try {
+      await this.write(rows)
+      this.written += rows.length
+      this.batches++
+    } catch (error) {
+      this.failed += rows.length
+      console.error(`${this.name}: failed to write ${rows.length} rows: ${error.message}`)
+    }
+  }
+
+  get depth() {
+    return this.queue.length
+  }
+
+  stats() {
+    return {
+      depth: this.depth,
+      enqueued: this.enqueued,
+      written: this.written,
+      dropped: this.dropped,
+      failed: this.failed,
+      batches: this.batches
+    }
+  }
+}
+
+// One registry per process, not per module instance: dev reloads and separate route bundles
+// evaluate this module again, and must share the queues and shutdown hooks set up before
+const registry = (globalThis.__flowopsWriteBehind ??= { queues: new Map(), hooked: false })
+
+// The queue called options.name, created with options the first time it is asked for.
+// Its rows are written on flushWriteBehind(), which runs when the process winds down.
+export function sharedQueue(options) {
+  let queue = registry.queues.get(options.name)
+  if (!queue) {
+    queue = new WriteBehindQueue(options)
+    registry.queues.set(options.name, queue)
+  }
+  hookShutdown()
+  return queue
+}
+
+// Writes out every shared queue and stops them taking rows; resolves once they are drained
+// or after timeoutMs. For a custom server's shutdown path; the hooks below call it too.
+export function flushWriteBehind({ timeoutMs = 5000 } = {}) {
+  registry.draining ??= Promise.race([
+    Promise.allSettled([...registry.queues.values()].map(queue => queue.close())),
+    new Promise(resolve => setTimeout(resolve, timeoutMs).unref())
+  ])
+  return registry.draining
+}
+
+// Drains on beforeExit (the event loop ran dry) and on SIGTERM/SIGINT. A signal listener
+// replaces Node's default of dying from the signal, so once drained the signal is raised
+// again; if something else (such as the Next.js server) also listens, it already got the
+// signal and decides how to exit
+function hookShutdown() {
+  if (registry.hooked) return
+  registry.hooked = true
+  
+  process.once('beforeExit', () => flushWriteBehind())
+  for (const signal of ['SIGTERM', 'SIGINT']) {
+    process.once(signal, async () => {
+      await flushWriteBehind()
+      if (process.listenerCount(signal) === 0) process.kill(process.pid, signal)
+    })
+  }
+}
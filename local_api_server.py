@@ -0,0 +1,2292 @@
+#!/usr/bin/env python3
+"""
+FlowOps Local API Stand-in
+Serves the same routes and response shapes as app/api/[[...path]]/route.js, backed by
+SQLite instead of Supabase, so backend_test.py can run in an isolated perf lab.
+
+Every call that route.js makes to Supabase is modelled as one simulated round trip that
+sleeps for a configurable latency (base + jitter + per-row transfer cost). Round trips
+sleep outside the database lock, so concurrent requests overlap like they would over
+the network.
+
+Usage:
+    python local_api_server.py --port 8001 --latency-ms 20 --jitter-ms 5
+    python backend_test.py --target local
+"""
+
+import argparse
+import base64
+import csv
+import hashlib
+import hmac
+import inspect
+import io
+import itertools
+import json
+import os
+import random
+import re
+import secrets
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+DEFAULT_LATENCY_MS = 20.0
+DEFAULT_JITTER_MS = 5.0
+DEFAULT_PER_ROW_MS = 0.01
+
+# "remote": every authenticated call pays supabase.auth.getUser (one round trip);
+# "local": tokens are verified in-process with a verified-token cache, like lib/jwt.js
+AUTH_MODES = ("remote", "local")
+DEFAULT_JWT_SECRET = "flowops-local-jwt-secret"
+ACCESS_TOKEN_TTL_S = 3600
+VERIFIED_TOKEN_CACHE_SIZE = 10000
+VERIFIED_TOKEN_TTL_S = 300
+# Logout revocations are shared through the revoked_sessions table (see route.js)
+REVOCATION_SYNC_S = 5.0
+REVOKED_SESSIONS_MAX = 100000
+# Conditional list GETs (see listResponse in route.js)
+LIST_VERSION_TTL_S = 30
+LIST_CACHE_MAX = 1000
+MEMBER_WORKSPACES_TTL_S = 60
+# With clock_override on, this request header pins "now" for that request (tests only)
+CLOCK_HEADER = "X-FlowOps-Now"
+LAG_RESOLUTION_S = 0.01
+# Activity log and notifications (see audit() in route.js): "batched" queues rows and writes
+# them in the background, "sync" writes them before responding, "off" skips them
+AUDIT_MODES = ("batched", "sync", "off")
+AUDIT_BATCH_MAX = 500
+AUDIT_FLUSH_S = 1.0
+AUDIT_QUEUE_MAX = 50000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+  id TEXT PRIMARY KEY,
+  email TEXT NOT NULL UNIQUE,
+  name TEXT,
+  password_hash TEXT NOT NULL,
+  created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  created_at TEXT NOT NULL
+);
+
+-- Times are epoch seconds
+CREATE TABLE IF NOT EXISTS revoked_sessions (
+  session_id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  revoked_at REAL NOT NULL,
+  expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_revoked_sessions_revoked_at ON revoked_sessions(revoked_at);
+
+CREATE TABLE IF NOT EXISTS workspaces (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  owner_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS workspace_members (
+  id TEXT PRIMARY KEY,
+  workspace_id TEXT REFERENCES workspaces(id) ON DELETE CASCADE,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  role TEXT DEFAULT 'member' CHECK (role IN ('owner', 'admin', 'member')),
+  created_at TEXT NOT NULL,
+  UNIQUE(workspace_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS projects (
+  id TEXT PRIMARY KEY,
+  workspace_id TEXT REFERENCES workspaces(id) ON DELETE CASCADE,
+  name TEXT NOT NULL,
+  description TEXT,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+  id TEXT PRIMARY KEY,
+  project_id TEXT REFERENCES projects(id) ON DELETE SET NULL,
+  title TEXT NOT NULL,
+  description TEXT,
+  assignee_id TEXT REFERENCES users(id) ON DELETE SET NULL,
+  created_by TEXT REFERENCES users(id) ON DELETE SET NULL,
+  status TEXT DEFAULT 'todo' CHECK (status IN ('todo', 'in_progress', 'completed', 'archived')),
+  priority TEXT DEFAULT 'medium' CHECK (priority IN ('low', 'medium', 'high')),
+  due_date TEXT,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL,
+  workspace_id TEXT REFERENCES workspaces(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS subtasks (
+  id TEXT PRIMARY KEY,
+  task_id TEXT REFERENCES tasks(id) ON DELETE CASCADE,
+  title TEXT NOT NULL,
+  done INTEGER DEFAULT 0,
+  created_at TEXT NOT NULL,
+  workspace_id TEXT REFERENCES workspaces(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS time_entries (
+  id TEXT PRIMARY KEY,
+  task_id TEXT REFERENCES tasks(id) ON DELETE CASCADE,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  start_time TEXT NOT NULL,
+  end_time TEXT,
+  duration INTEGER,
+  description TEXT,
+  billable INTEGER DEFAULT 0,
+  created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS channels (
+  id TEXT PRIMARY KEY,
+  workspace_id TEXT REFERENCES workspaces(id) ON DELETE CASCADE,
+  name TEXT NOT NULL,
+  created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+  id TEXT PRIMARY KEY,
+  channel_id TEXT REFERENCES channels(id) ON DELETE CASCADE,
+  sender_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  content TEXT NOT NULL,
+  timestamp TEXT NOT NULL,
+  workspace_id TEXT REFERENCES workspaces(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS docs (
+  id TEXT PRIMARY KEY,
+  workspace_id TEXT REFERENCES workspaces(id) ON DELETE CASCADE,
+  title TEXT NOT NULL,
+  content TEXT,
+  created_by TEXT REFERENCES users(id) ON DELETE SET NULL,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+  id TEXT PRIMARY KEY,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  type TEXT NOT NULL,
+  message TEXT NOT NULL,
+  read INTEGER DEFAULT 0,
+  created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS activity_logs (
+  id TEXT PRIMARY KEY,
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  action TEXT NOT NULL,
+  entity_type TEXT,
+  entity_id TEXT,
+  timestamp TEXT NOT NULL
+);
+
+-- Mirrors sync_changes and sync_log_state in supabase-schema.sql; filled by the triggers in
+-- SYNC_TRIGGERS. changed_at is a Julian day number
+CREATE TABLE IF NOT EXISTS sync_changes (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  entity TEXT NOT NULL,
+  entity_id TEXT NOT NULL,
+  workspace_id TEXT,
+  user_id TEXT,
+  changed_at REAL NOT NULL DEFAULT (julianday('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_changes_workspace_seq ON sync_changes(workspace_id, seq);
+CREATE INDEX IF NOT EXISTS idx_sync_changes_user_seq ON sync_changes(user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_sync_changes_changed_at ON sync_changes(changed_at);
+
+CREATE TABLE IF NOT EXISTS sync_log_state (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  pruned_through INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO sync_log_state (id) VALUES (1);
+
+-- Mirrors the time_rollups_daily table and apply_time_rollup() trigger in supabase-schema.sql
+CREATE TABLE IF NOT EXISTS time_rollups_daily (
+  user_id TEXT REFERENCES users(id) ON DELETE CASCADE,
+  day TEXT NOT NULL,
+  minutes INTEGER NOT NULL DEFAULT 0,
+  billable_minutes INTEGER NOT NULL DEFAULT 0,
+  entries INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, day)
+);
+
+CREATE TRIGGER IF NOT EXISTS time_entries_rollup_insert
+AFTER INSERT ON time_entries
+BEGIN
+  INSERT INTO time_rollups_daily (user_id, day, minutes, billable_minutes, entries)
+  SELECT NEW.user_id, substr(NEW.start_time, 1, 10), NEW.duration,
+         CASE WHEN NEW.billable THEN NEW.duration ELSE 0 END, 1
+  WHERE NEW.duration IS NOT NULL
+  ON CONFLICT (user_id, day) DO UPDATE
+  SET minutes = minutes + excluded.minutes,
+      billable_minutes = billable_minutes + excluded.billable_minutes,
+      entries = entries + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS time_entries_rollup_update
+AFTER UPDATE OF duration, start_time, user_id, billable ON time_entries
+BEGIN
+  UPDATE time_rollups_daily
+  SET minutes = minutes - OLD.duration,
+      billable_minutes = billable_minutes - CASE WHEN OLD.billable THEN OLD.duration ELSE 0 END,
+      entries = entries - 1
+  WHERE OLD.duration IS NOT NULL AND user_id = OLD.user_id AND day = substr(OLD.start_time, 1, 10);
+
+  INSERT INTO time_rollups_daily (user_id, day, minutes, billable_minutes, entries)
+  SELECT NEW.user_id, substr(NEW.start_time, 1, 10), NEW.duration,
+         CASE WHEN NEW.billable THEN NEW.duration ELSE 0 END, 1
+  WHERE NEW.duration IS NOT NULL
+  ON CONFLICT (user_id, day) DO UPDATE
+  SET minutes = minutes + excluded.minutes,
+      billable_minutes = billable_minutes + excluded.billable_minutes,
+      entries = entries + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS time_entries_rollup_delete
+AFTER DELETE ON time_entries
+BEGIN
+  UPDATE time_rollups_daily
+  SET minutes = minutes - OLD.duration,
+      billable_minutes = billable_minutes - CASE WHEN OLD.billable THEN OLD.duration ELSE 0 END,
+      entries = entries - 1
+  WHERE OLD.duration IS NOT NULL AND user_id = OLD.user_id AND day = substr(OLD.start_time, 1, 10);
+END;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_project_id ON tasks(project_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_id ON tasks(assignee_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at_id ON tasks(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_created_at_id ON tasks(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_created_at_id ON tasks(project_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_created_at_id ON tasks(assignee_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_time_entries_task_id ON time_entries(task_id);
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_id ON time_entries(user_id);
+CREATE INDEX IF NOT EXISTS idx_time_entries_start_time ON time_entries(start_time);
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_start_id ON time_entries(user_id, start_time, id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_time_entries_running_per_user ON time_entries(user_id) WHERE end_time IS NULL;
+CREATE INDEX IF NOT EXISTS idx_workspace_members_user_id ON workspace_members(user_id);
+CREATE INDEX IF NOT EXISTS idx_workspace_members_workspace_id ON workspace_members(workspace_id);
+CREATE INDEX IF NOT EXISTS idx_workspace_members_user_workspace ON workspace_members(user_id, workspace_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_created_at_id ON tasks(workspace_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_subtasks_workspace_task ON subtasks(workspace_id, task_id);
+CREATE INDEX IF NOT EXISTS idx_messages_workspace_timestamp ON messages(workspace_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_messages_channel_timestamp_id ON messages(channel_id, timestamp DESC, id DESC);
+"""
+
+# Tables whose workspace_id is copied from a parent row: table -> (foreign key, parent)
+DENORMALIZED_WORKSPACE = {
+    "tasks": ("project_id", "projects"),
+    "subtasks": ("task_id", "tasks"),
+    "messages": ("channel_id", "channels")
+}
+
+# set_*_workspace() and propagate_workspace(). SQLite triggers cannot assign to NEW, so
+# the copy is an UPDATE right after the write; a parent that changes workspace passes it on
+WORKSPACE_TRIGGERS = "".join(f"""
+CREATE TRIGGER IF NOT EXISTS {table}_set_workspace AFTER INSERT ON {table}
+BEGIN
+  UPDATE {table} SET workspace_id = (SELECT workspace_id FROM {parent} WHERE id = NEW.{key}) WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_move_workspace AFTER UPDATE OF {key} ON {table}
+BEGIN
+  UPDATE {table} SET workspace_id = (SELECT workspace_id FROM {parent} WHERE id = NEW.{key}) WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS {parent}_propagate_workspace_{table} AFTER UPDATE OF workspace_id ON {parent}
+WHEN NEW.workspace_id IS NOT OLD.workspace_id
+BEGIN
+  UPDATE {table} SET workspace_id = NEW.workspace_id WHERE {key} = NEW.id;
+END;
+""" for table, (key, parent) in DENORMALIZED_WORKSPACE.items())
+
+# search_vector() columns per table: (title, body); messages index their content as the title
+SEARCH_COLUMNS = {
+    "tasks": ("title", "description"),
+    "docs": ("title", "content"),
+    "messages": ("content", "''")
+}
+
+# Stand-ins for the GIN indexes over search_vector(): an FTS5 table per searchable table,
+# keyed by its rowid and kept current by triggers
+SEARCH_SCHEMA = "".join(f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {table}_search USING fts5(title, body, tokenize='porter');
+
+CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table}
+BEGIN
+  INSERT INTO {table}_search (rowid, title, body) VALUES (NEW.rowid, COALESCE(NEW.{title}, ''), COALESCE(NEW.{body}, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {", ".join(c for c in (title, body) if c != "''")} ON {table}
+BEGIN
+  DELETE FROM {table}_search WHERE rowid = OLD.rowid;
+  INSERT INTO {table}_search (rowid, title, body) VALUES (NEW.rowid, COALESCE(NEW.{title}, ''), COALESCE(NEW.{body}, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table}
+BEGIN
+  DELETE FROM {table}_search WHERE rowid = OLD.rowid;
+END;
+""".replace("NEW.''", "''") for table, (title, body) in SEARCH_COLUMNS.items())
+
+# (workspace_id, user_id) that can see a row, as in sync_scope(); {row} is NEW or OLD
+SYNC_SCOPES = {
+    "tasks": ("(SELECT workspace_id FROM projects WHERE id = {row}.project_id)", "{row}.created_by"),
+    "projects": ("{row}.workspace_id", "NULL"),
+    "time_entries": ("NULL", "{row}.user_id"),
+    "messages": ("(SELECT workspace_id FROM channels WHERE id = {row}.channel_id)", "NULL"),
+    "docs": ("{row}.workspace_id", "{row}.created_by")
+}
+
+
+def sync_log_sql(table, row):
+    workspace, user = (expression.format(row=row) for expression in SYNC_SCOPES[table])
+    return (f"INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id) "
+            f"SELECT '{table}', {row}.id, {workspace}, {user}")
+
+
+def sync_update_guard(table):
+    """Skip the follow-up UPDATE that copies a denormalized workspace_id into a row that
+    was just written; the write itself was logged already"""
+    if table not in DENORMALIZED_WORKSPACE:
+        return ""
+    key = DENORMALIZED_WORKSPACE[table][0]
+    return f"WHEN NEW.workspace_id IS OLD.workspace_id OR NEW.{key} IS NOT OLD.{key}\n"
+
+
+# log_sync_change(): every write logs the row's scope; an update that moves the row also
+# logs its old scope so readers who lost sight of it see a deletion
+SYNC_TRIGGERS = "".join(f"""
+CREATE TRIGGER IF NOT EXISTS {table}_sync_insert AFTER INSERT ON {table}
+BEGIN
+  {sync_log_sql(table, "NEW")};
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_sync_update AFTER UPDATE ON {table}
+{sync_update_guard(table)}BEGIN
+  {sync_log_sql(table, "NEW")};
+  {sync_log_sql(table, "OLD")}
+  WHERE ({", ".join(e.format(row="OLD") for e in SYNC_SCOPES[table])}) IS NOT
+        ({", ".join(e.format(row="NEW") for e in SYNC_SCOPES[table])});
+END;
+
+CREATE TRIGGER IF NOT EXISTS {table}_sync_delete AFTER DELETE ON {table}
+BEGIN
+  {sync_log_sql(table, "OLD")};
+END;
+""" for table in SYNC_SCOPES)
+
+TASK_COLUMNS = {"project_id", "title", "description", "assignee_id", "created_by", "status",
+                "priority", "due_date"}
+PROJECT_COLUMNS = {"workspace_id", "name", "description"}
+DAY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+TASK_PAGE_SIZE = 50
+BULK_MAX_ITEMS = 1000
+TASK_FIELDS = ("project_id", "title", "description", "assignee_id", "status", "priority", "due_date")
+TASK_STATUSES = ("todo", "in_progress", "completed", "archived")
+TASK_PRIORITIES = ("low", "medium", "high")
+TIME_ENTRY_FIELDS = ("task_id", "start_time", "end_time", "description", "billable")
+TASK_PAGE_SIZE_MAX = 200
+SYNC_PAGE_SIZE = 1000
+SYNC_RETENTION_DAYS = 30
+SYNC_PRUNE_INTERVAL_S = 3600
+SYNC_PAGE_SIZE_MAX = 5000
+SYNC_CURSOR_PATTERN = re.compile(r"^\d{1,18}$")
+SEARCH_TYPES = ("tasks", "docs", "messages")
+SEARCH_PAGE_SIZE = 20
+SEARCH_PAGE_SIZE_MAX = 50
+SEARCH_QUERY_MAX = 200
+SEARCH_TERM = re.compile(r'"[^"]*"|\S+')
+MESSAGE_PAGE_SIZE = 50
+MESSAGE_PAGE_SIZE_MAX = 200
+MESSAGE_CONTENT_MAX = 4000
+CHANNEL_MESSAGES_PATH = re.compile(r"^channels/([^/]+)/messages$")
+EXPORT_CHUNK_SIZE = 1000
+REPORT_GROUPS = ("project", "user", "task", "day", "week")
+# SQLite equivalents of the grouping keys in time_report(); weeks start on Monday
+REPORT_KEYS = {
+    "project": "t.project_id",
+    "user": "te.user_id",
+    "task": "te.task_id",
+    "day": "substr(te.start_time, 1, 10)",
+    "week": "date(substr(te.start_time, 1, 10), 'weekday 0', '-6 days')"
+}
+REPORT_LABELS = {
+    "project": "SELECT id AS key, name AS label FROM projects WHERE id IN ({})",
+    "user": "SELECT id AS key, COALESCE(name, email) AS label FROM users WHERE id IN ({})",
+    "task": "SELECT id AS key, title AS label FROM tasks WHERE id IN ({})"
+}
+EXPORT_CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+EXPORT_COLUMNS = ("id", "start_time", "end_time", "duration", "billable", "description",
+                  "task_id", "task_title", "project_id", "project_name")
+
+
+class APIError(Exception):
+    """Raised by handlers; becomes {"error": message} with the given status"""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class TTLCache:
+    """Bounded LRU with per-entry expiry (Python twin of lib/lru-cache.js)"""
+
+    def __init__(self, max_size=1000, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one result (Python twin of lib/single-flight.js)"""
+
+    class Flight:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.in_flight = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.lock = threading.Lock()
+
+    def run(self, key, load):
+        with self.lock:
+            flight = self.in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.in_flight[key] = self.Flight()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = load()
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            flight.done.set()
+        return flight.result
+
+    def __len__(self):
+        return len(self.in_flight)
+
+
+class WriteBehindQueue:
+    """
+    Rows pushed here are written in batches by a background thread, when max_batch are
+    waiting or max_delay seconds after the first one arrived; beyond max_queue waiting
+    rows new ones are dropped and counted (Python twin of lib/write-behind.js)
+    """
+
+    def __init__(self, write, max_batch=AUDIT_BATCH_MAX, max_delay=AUDIT_FLUSH_S, max_queue=AUDIT_QUEUE_MAX):
+        self.write = write
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.queue = []
+        self.first_queued_at = None
+        self.closed = False
+        self.in_flight = 0
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.changed = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def push(self, row):
+        with self.changed:
+            if self.closed or len(self.queue) >= self.max_queue:
+                self.dropped += 1
+                return False
+            if not self.queue:
+                self.first_queued_at = time.monotonic()
+            self.queue.append(row)
+            self.enqueued += 1
+            # Wake the writer when the first row starts the clock and when a batch fills up
+            if len(self.queue) in (1, self.max_batch):
+                self.changed.notify_all()
+            return True
+
+    def write_through(self, rows):
+        """Write rows on the caller's thread, with the same counters"""
+        with self.changed:
+            self.enqueued += len(rows)
+        self.write_batch(rows)
+
+    def next_batch(self):
+        """Wait until a batch is due (or the queue is closed); None once closed and empty"""
+        with self.changed:
+            while True:
+                if self.queue and (self.closed or len(self.queue) >= self.max_batch
+                                   or time.monotonic() - self.first_queued_at >= self.max_delay):
+                    batch, self.queue = self.queue[:self.max_batch], self.queue[self.max_batch:]
+                    self.first_queued_at = time.monotonic() if self.queue else None
+                    self.in_flight = len(batch)
+                    return batch
+                if self.closed:
+                    return None
+                timeout = self.first_queued_at + self.max_delay - time.monotonic() if self.queue else None
+                self.changed.wait(timeout)
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            if batch is None:
+                return
+            self.write_batch(batch)
+            with self.changed:
+                self.in_flight = 0
+                self.changed.notify_all()
+
+    def write_batch(self, rows):
+        # Any error fails this batch only, like writeBatch() in lib/write-behind.js; letting it
+        # escape would end the writer thread and leave the queue stuck
+        try:
+            self.write(rows)
+        except Exception:
+            with self.changed:
+                self.failed += len(rows)
+            return
+        with self.changed:
+            self.written += len(rows)
+            self.batches += 1
+
+    def flush(self):
+        """Block until everything queued so far has been written (or has failed)"""
+        with self.changed:
+            self.first_queued_at = self.first_queued_at and self.first_queued_at - self.max_delay
+            self.changed.notify_all()
+            while self.queue or self.in_flight:
+                self.changed.wait()
+
+    def close(self):
+        """Stop accepting rows and write what is left"""
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+        self.thread.join()
+
+    def stats(self):
+        with self.changed:
+            return {
+                "depth": len(self.queue),
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches
+            }
+
+
+class LatencyModel:
+    """Simulated Supabase round trip: base + uniform jitter + per-row transfer cost"""
+
+    def __init__(self, latency_ms=DEFAULT_LATENCY_MS, jitter_ms=DEFAULT_JITTER_MS,
+                 per_row_ms=DEFAULT_PER_ROW_MS, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_row_ms = per_row_ms
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.round_trips = 0
+
+    def round_trip(self, rows=0):
+        with self.lock:
+            self.round_trips += 1
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        delay_ms = max(0.0, self.latency_ms + jitter) + rows * self.per_row_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+
+class LagMonitor:
+    """
+    The stand-in's counterpart of monitorEventLoopDelay in route.js: a thread that sleeps
+    LAG_RESOLUTION_S at a time and records how late it wakes up. Requests run on threads,
+    not an event loop, so the delay measures GIL and CPU contention instead.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.delays = []
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self):
+        while True:
+            started = time.perf_counter()
+            time.sleep(LAG_RESOLUTION_S)
+            delay = time.perf_counter() - started - LAG_RESOLUTION_S
+            with self.lock:
+                self.delays.append(max(0.0, delay))
+
+    def snapshot(self):
+        """mean/p99/max delay in ms since the previous snapshot"""
+        with self.lock:
+            delays, self.delays = sorted(self.delays), []
+        if not delays:
+            return {"mean": 0.0, "p99": 0.0, "max": 0.0}
+        p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))]
+        return {"mean": sum(delays) / len(delays) * 1000, "p99": p99 * 1000, "max": delays[-1] * 1000}
+
+
+def process_rss_bytes():
+    """Current resident set size (Linux /proc); None elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def open_socket_count():
+    try:
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return None
+    count = 0
+    for fd in fds:
+        try:
+            count += os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass
+    return count
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+def iso(moment):
+    return moment.isoformat()
+
+
+def parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def encode_cursor(row, column="created_at"):
+    """Opaque keyset cursor over (a timestamp column, id), same encoding as route.js"""
+    return b64url(json.dumps([row[column], row["id"]], separators=(",", ":")).encode())
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, row_id = json.loads(b64url_decode(cursor))
+        parse_time(created_at)
+        uuid.UUID(row_id)
+        return created_at, row_id
+    except (ValueError, TypeError, AttributeError):
+        raise APIError("Invalid cursor", 400)
+
+
+def encode_search_cursor(result):
+    """Opaque keyset cursor over (rank, type, id), same encoding as route.js"""
+    return b64url(json.dumps([result["rank"], result["type"], result["id"]], separators=(",", ":")).encode())
+
+
+def decode_search_cursor(cursor):
+    try:
+        rank, result_type, row_id = json.loads(b64url_decode(cursor))
+        uuid.UUID(row_id)
+        if isinstance(rank, bool) or not isinstance(rank, (int, float)) or result_type not in SEARCH_TYPES:
+            raise ValueError(cursor)
+        return float(rank), result_type, row_id
+    except (ValueError, TypeError, AttributeError):
+        raise APIError("Invalid cursor", 400)
+
+
+def fts_query(text):
+    """websearch_to_tsquery() syntax as an FTS5 query: words and "phrases" are ANDed, OR
+    between terms makes alternatives, -term excludes. None when nothing can match."""
+    groups, excluded, alternative = [], [], False
+    for term in SEARCH_TERM.findall(text):
+        if term.upper() == "OR":
+            alternative = bool(groups)
+            continue
+        negate = term.startswith("-")
+        words = re.findall(r"\w+", term)
+        if not words:
+            continue
+        phrase = '"' + " ".join(words) + '"'
+        if negate:
+            excluded.append(phrase)
+        elif alternative:
+            groups[-1].append(phrase)
+        else:
+            groups.append([phrase])
+        alternative = False
+    if not groups:
+        return None
+    query = " AND ".join("(" + " OR ".join(group) + ")" for group in groups)
+    return f"{query} NOT ({' OR '.join(excluded)})" if excluded else query
+
+
+def sign_jwt(claims, secret):
+    signing_input = f"{b64url(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())}." \
+                    f"{b64url(json.dumps(claims).encode())}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{b64url(signature)}"
+
+
+def verify_jwt(token, secret):
+    """Claims of a valid, unexpired HS256 access token, else None"""
+    try:
+        header, payload, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, b64url_decode(signature)):
+            return None
+        claims = json.loads(b64url_decode(payload))
+    except (ValueError, TypeError):
+        return None
+    if claims.get("aud") != "authenticated" or claims.get("exp", 0) <= time.time():
+        return None
+    return claims
+
+
+def parse_utc(value):
+    parsed = parse_time(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def is_uuid(value):
+    try:
+        uuid.UUID(value)
+        return True
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+
+def is_timestamp(value):
+    try:
+        parse_time(value)
+        return True
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+
+# Bulk item validation, same rules and messages as route.js
+def validate_task(item, partial=False):
+    if not isinstance(item, dict):
+        return "Item must be an object"
+    allowed = ("id",) + TASK_FIELDS if partial else TASK_FIELDS
+    unknown = next((key for key in item if key not in allowed), None)
+    if unknown:
+        return f"Unknown field: {unknown}"
+    if (not partial or "title" in item) and not (isinstance(item.get("title"), str) and item["title"].strip()):
+        return "title is required"
+    if "status" in item and item["status"] not in TASK_STATUSES:
+        return f"status must be one of {', '.join(TASK_STATUSES)}"
+    if "priority" in item and item["priority"] not in TASK_PRIORITIES:
+        return f"priority must be one of {', '.join(TASK_PRIORITIES)}"
+    for key in ("project_id", "assignee_id"):
+        if item.get(key) == "":
+            item[key] = None
+        if item.get(key) is not None and not is_uuid(item[key]):
+            return f"{key} must be a UUID"
+    if item.get("due_date") is not None and not is_timestamp(item["due_date"]):
+        return "due_date must be a timestamp"
+    return None
+
+
+def validate_task_update(item):
+    error = validate_task(item, partial=True)
+    if error:
+        return error
+    if not is_uuid(item.get("id")):
+        return "id must be a UUID"
+    if len(item) < 2:
+        return "No fields to update"
+    return None
+
+
+def validate_time_entry(item):
+    if not isinstance(item, dict):
+        return "Item must be an object"
+    unknown = next((key for key in item if key not in TIME_ENTRY_FIELDS), None)
+    if unknown:
+        return f"Unknown field: {unknown}"
+    if not is_uuid(item.get("task_id")):
+        return "task_id must be a UUID"
+    if not (is_timestamp(item.get("start_time")) and is_timestamp(item.get("end_time"))):
+        return "start_time and end_time must be timestamps"
+    if parse_utc(item["end_time"]) < parse_utc(item["start_time"]):
+        return "end_time is before start_time"
+    if "billable" in item and not isinstance(item["billable"], bool):
+        return "billable must be a boolean"
+    return None
+
+
+def csv_line(values):
+    """One CSV record as route.js writes it: booleans lower case, None empty, CRLF"""
+    out = io.StringIO()
+    csv.writer(out).writerow(
+        ("true" if v else "false") if isinstance(v, bool) else ("" if v is None else v) for v in values)
+    return out.getvalue()
+
+
+def hash_password(password, salt):
+    return f"{salt}${hashlib.sha256(f'{salt}:{password}'.encode()).hexdigest()}"
+
+
+class LocalFlowOpsAPI:
+    """
+    Route logic mirroring route.js. Each public handler takes (user, body, query) or similar
+    and returns a JSON-serialisable dict, raising APIError for error responses.
+    Visibility follows the RLS policies in supabase-schema.sql.
+    """
+
+    def __init__(self, db_path=":memory:", latency=None, auth_mode="remote", jwt_secret=DEFAULT_JWT_SECRET,
+                 list_cache_max=LIST_CACHE_MAX, clock_override=False, coalesce=True, audit="batched"):
+        self.latency = latency or LatencyModel()
+        self.coalesce_reads = coalesce
+        self.read_flights = SingleFlight()
+        self.audit_mode = audit
+        self.activity_log = WriteBehindQueue(self.table_writer("activity_logs"))
+        self.notification_log = WriteBehindQueue(self.table_writer("notifications"))
+        self.clock_override = clock_override
+        self.request_clock = threading.local()
+        self.auth_mode = auth_mode
+        self.jwt_secret = jwt_secret
+        self.verified_tokens = TTLCache(VERIFIED_TOKEN_CACHE_SIZE, VERIFIED_TOKEN_TTL_S)
+        # session_id -> expiry (epoch seconds), pulled from revoked_sessions like route.js
+        self.revoked_sessions = {}
+        self.revocations_since = None
+        self.revocations_synced_at = None
+        self.revocations_current = False
+        self.revocation_sync = REVOCATION_SYNC_S
+        self.revoked_sessions_max = REVOKED_SESSIONS_MAX
+        self.revocation_lock = threading.Lock()
+        self.sync_pruned_at = None
+        self.instance_id = uuid.uuid4().hex[:8]
+        self.version_counter = itertools.count(1)
+        self.scope_versions = TTLCache(10000, LIST_VERSION_TTL_S)
+        self.member_workspaces = TTLCache(10000, MEMBER_WORKSPACES_TTL_S)
+        self.list_cache_max = list_cache_max
+        self.list_cache = TTLCache(list_cache_max, LIST_VERSION_TTL_S)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA + WORKSPACE_TRIGGERS + SEARCH_SCHEMA + SYNC_TRIGGERS)
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.lag_monitor = None
+
+    # -- helpers -------------------------------------------------------------
+
+    def now(self):
+        return getattr(self.request_clock, "now", None) or utc_now()
+
+    def pin_clock(self, value):
+        """Set this thread's "now" from a CLOCK_HEADER value, or clear it"""
+        self.request_clock.now = None
+        if value and self.clock_override:
+            try:
+                moment = parse_time(value)
+            except ValueError:
+                raise APIError(f"Invalid {CLOCK_HEADER} header", 400)
+            self.request_clock.now = moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            try:
+                return [dict(row) for row in self.db.execute(sql, params).fetchall()]
+            except sqlite3.Error as e:
+                raise APIError(str(e), 500)
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            try:
+                with self.db:
+                    self.db.execute(sql, params)
+            except sqlite3.Error as e:
+                raise APIError(str(e), 500)
+
+    def insert(self, table, values):
+        columns = ", ".join(values)
+        placeholders = ", ".join("?" for _ in values)
+        self.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", tuple(values.values()))
+
+    def write_batch(self, statements):
+        """
+        Run (sql, params) statements in one transaction, like the set-based path of the
+        bulk_* functions; if it fails, retry one by one. Returns (ok_positions, [(position, error)]).
+        """
+        with self.lock:
+            try:
+                with self.db:
+                    for sql, params in statements:
+                        self.db.execute(sql, params)
+                return list(range(len(statements))), []
+            except sqlite3.Error:
+                pass
+            ok, failed = [], []
+            for position, (sql, params) in enumerate(statements):
+                try:
+                    with self.db:
+                        self.db.execute(sql, params)
+                    ok.append(position)
+                except sqlite3.Error as e:
+                    failed.append((position, str(e)))
+            return ok, failed
+
+    def round_trip(self, rows=0):
+        self.latency.round_trip(rows)
+
+    def close(self):
+        """Write out queued activity and notification rows"""
+        self.activity_log.close()
+        self.notification_log.close()
+
+    # -- activity log and notifications --------------------------------------
+
+    def table_writer(self, table):
+        """One multi-row INSERT per batch: a single round trip, all rows or none, like insert(rows)"""
+        def write(rows):
+            columns = ["id", *rows[0]]
+            row_placeholders = "(" + ", ".join(["?"] * len(columns)) + ")"
+            params = tuple(value for row in rows for value in (str(uuid.uuid4()), *row.values()))
+            self.round_trip(rows=len(rows))
+            self.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                         + ", ".join([row_placeholders] * len(rows)), params)
+        return write
+
+    def audit(self, user, action, entity_type, entity_id, notifications=()):
+        """Like audit() in route.js: queue (or with audit="sync", write) the activity row and notifications"""
+        if self.audit_mode == "off":
+            return
+        now = iso(self.now())
+        activity = {"user_id": user["id"], "action": action, "entity_type": entity_type,
+                    "entity_id": entity_id, "timestamp": now}
+        created = [{"user_id": user_id, "type": kind, "message": message, "created_at": now}
+                   for user_id, kind, message in notifications]
+
+        if self.audit_mode == "sync":
+            self.activity_log.write_through([activity])
+            if created:
+                self.notification_log.write_through(created)
+            return
+        self.activity_log.push(activity)
+        for row in created:
+            self.notification_log.push(row)
+
+    def task_notifications(self, user, task, changes):
+        """(user_id, type, message) for the assignee someone else assigned, the creator of a task someone else completed"""
+        notifications = []
+        if changes.get("assignee_id") and changes["assignee_id"] != user["id"]:
+            notifications.append((changes["assignee_id"], "task_assigned", f'You were assigned "{task["title"]}"'))
+        if changes.get("status") == "completed" and task.get("created_by") not in (None, user["id"]):
+            notifications.append((task["created_by"], "task_completed", f'"{task["title"]}" was completed'))
+        return notifications
+
+    def public_user(self, row):
+        return {
+            "id": row["id"],
+            "email": row["email"],
+            "user_metadata": {"name": row["name"]},
+            "created_at": row["created_at"]
+        }
+
+    def user_ref(self, user_id):
+        rows = self.query("SELECT id, name, email FROM users WHERE id = ?", (user_id,))
+        return rows[0] if rows else None
+
+    def issue_session(self, user_row):
+        """A Supabase-style session whose access token is an HS256 JWT"""
+        session_id = str(uuid.uuid4())
+        self.insert("sessions", {"id": session_id, "user_id": user_row["id"], "created_at": iso(self.now())})
+        issued_at = int(time.time())
+        token = sign_jwt({
+            "sub": user_row["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": user_row["email"],
+            "user_metadata": {"name": user_row["name"]},
+            "session_id": session_id,
+            "iat": issued_at,
+            "exp": issued_at + ACCESS_TOKEN_TTL_S
+        }, self.jwt_secret)
+        return {
+            "access_token": token,
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_TTL_S,
+            "refresh_token": secrets.token_urlsafe(16),
+            "user": self.public_user(user_row)
+        }
+
+    # -- logout revocations (revocationsCurrent and friends in route.js) -------
+
+    def remember_revocation(self, session_id, expires_at):
+        """False (and the list stops being current) when it is full: nothing is evicted early"""
+        if session_id not in self.revoked_sessions and len(self.revoked_sessions) >= self.revoked_sessions_max:
+            self.revocations_current = False
+            self.revocations_since = None
+            return False
+        self.revoked_sessions[session_id] = expires_at
+        return True
+
+    def sync_revocations(self):
+        now = time.time()
+        for session_id, expires_at in list(self.revoked_sessions.items()):
+            if expires_at <= now:
+                del self.revoked_sessions[session_id]
+
+        # revoked_sessions_since(): from a little before the newest row pulled, for rows
+        # that committed after it; everything unexpired on the first pull
+        since = self.revocations_since - self.revocation_sync if self.revocations_since is not None else None
+        rows = self.query(
+            """SELECT session_id, revoked_at, expires_at FROM revoked_sessions
+               WHERE expires_at > ? AND (? IS NULL OR revoked_at > ?) ORDER BY revoked_at""",
+            (now, since, since))
+        self.round_trip(rows=len(rows))
+        self.revocations_synced_at = time.monotonic()
+
+        self.revocations_current = True
+        for row in rows:
+            if not self.remember_revocation(row["session_id"], row["expires_at"]):
+                return
+            self.revocations_since = row["revoked_at"]
+
+    def revocations_ok(self):
+        """Whether cached and locally verified tokens can be trusted, pulling revocations when due"""
+        with self.revocation_lock:
+            synced_at = self.revocations_synced_at
+            if synced_at is None or time.monotonic() - synced_at >= self.revocation_sync:
+                self.sync_revocations()
+            return self.revocations_current
+
+    def get_user(self, token):
+        """getUser in route.js: auth-server round trip, or local verification + cache"""
+        if not token:
+            if self.auth_mode == "remote":
+                self.round_trip()
+            return None
+
+        # Without a current revocation list, tokens go to the auth server like in remote mode
+        if self.auth_mode == "local" and self.revocations_ok():
+            cached = self.verified_tokens.get(token)
+            if cached:
+                return None if cached["session_id"] in self.revoked_sessions else cached
+            claims = verify_jwt(token, self.jwt_secret)
+            if not claims or claims["session_id"] in self.revoked_sessions:
+                return None
+            user = {
+                "id": claims["sub"],
+                "email": claims.get("email"),
+                "name": claims.get("user_metadata", {}).get("name"),
+                "session_id": claims["session_id"]
+            }
+            self.verified_tokens.set(token, user, min(VERIFIED_TOKEN_TTL_S, claims["exp"] - time.time()))
+            return user
+
+        # supabase.auth.getUser(token): the auth server also checks the session still exists
+        self.round_trip()
+        claims = verify_jwt(token, self.jwt_secret)
+        if not claims:
+            return None
+        rows = self.query(
+            "SELECT u.*, s.id AS session_id FROM sessions s JOIN users u ON u.id = s.user_id WHERE s.id = ?",
+            (claims["session_id"],))
+        return rows[0] if rows else None
+
+    def member_workspace_ids(self, user_id):
+        return [row["workspace_id"] for row in self.query(
+            "SELECT workspace_id FROM workspace_members WHERE user_id = ?", (user_id,))]
+
+    # -- conditional list GETs -----------------------------------------------
+
+    def cached_member_workspaces(self, user_id):
+        workspace_ids = self.member_workspaces.get(user_id)
+        if workspace_ids is None:
+            self.round_trip()
+            workspace_ids = sorted(self.member_workspace_ids(user_id))
+            self.member_workspaces.set(user_id, workspace_ids)
+        return workspace_ids
+
+    def version_scopes(self, user):
+        return [f"user:{user['id']}", *self.cached_member_workspaces(user["id"])]
+
+    def new_version(self):
+        return f"{self.instance_id}.{next(self.version_counter)}"
+
+    def scope_version(self, scope):
+        version = self.scope_versions.get(scope)
+        if version is None:
+            version = self.new_version()
+            self.scope_versions.set(scope, version)
+        return version
+
+    def bump_versions(self, user, *extra_workspace_ids):
+        for scope in {*self.version_scopes(user), *filter(None, extra_workspace_ids)}:
+            self.scope_versions.set(scope, self.new_version())
+
+    def coalesce(self, key, load):
+        """Single-flight reads, like coalesce() in route.js"""
+        return self.read_flights.run(key, load) if self.coalesce_reads else load()
+
+    def list_response(self, user, path, query, if_none_match, load, workspace_scoped=False):
+        """304 / cached body / load(), keyed like listResponse in route.js; returns (status, payload, headers)"""
+        search = urlencode(sorted(query.items()))
+        scopes = self.version_scopes(user)
+        versions = [self.scope_version(scope) for scope in scopes]
+        digest = hashlib.sha1("|".join([user["id"], path, search, *versions]).encode()).digest()
+        etag = f'"{b64url(digest)}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if if_none_match and etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            return 304, None, headers
+
+        key = f"{user['id']} {path}?{search}"
+        cached = self.list_cache.get(key)
+        if cached and cached[0] == etag:
+            return 200, cached[1], headers
+
+        if workspace_scoped:
+            flight_scope = ",".join(f"{scope}@{version}" for scope, version in zip(scopes[1:], versions[1:]))
+        else:
+            flight_scope = etag
+        payload = self.coalesce(f"{path}?{search} {flight_scope}", load)
+        if self.list_cache_max > 0:
+            self.list_cache.set(key, (etag, payload))
+        return 200, payload, headers
+
+    def visible_tasks_sql(self):
+        """RLS: tasks in one of the caller's workspaces, or without a project"""
+        return """
+          (t.workspace_id IN (SELECT workspace_id FROM workspace_members WHERE user_id = ?)
+           OR t.project_id IS NULL)
+        """
+
+    def task_refs(self, task_ids):
+        if not task_ids:
+            return {}
+        marks = ", ".join("?" for _ in task_ids)
+        rows = self.query(f"SELECT id, title FROM tasks WHERE id IN ({marks})", tuple(task_ids))
+        return {row["id"]: row for row in rows}
+
+    def with_entry_refs(self, entries):
+        tasks = self.task_refs({e["task_id"] for e in entries if e["task_id"]})
+        users = {}
+        for entry in entries:
+            if entry["user_id"] not in users:
+                users[entry["user_id"]] = self.user_ref(entry["user_id"])
+            entry["billable"] = bool(entry["billable"])
+            entry["task"] = tasks.get(entry["task_id"])
+            entry["user"] = users[entry["user_id"]]
+        return entries
+
+    def with_task_refs(self, tasks):
+        for task in tasks:
+            project = None
+            if task["project_id"]:
+                rows = self.query("SELECT id, name FROM projects WHERE id = ?", (task["project_id"],))
+                project = rows[0] if rows else None
+            task["project"] = project
+            task["assignee"] = self.user_ref(task["assignee_id"]) if task["assignee_id"] else None
+        return tasks
+
+    # -- auth ----------------------------------------------------------------
+
+    def signup(self, body):
+        email = (body.get("email") or "").strip().lower()
+        password = body.get("password") or ""
+        name = body.get("name")
+        if not email or not password:
+            raise APIError("Signup requires a valid email and password", 400)
+
+        # supabase.auth.signUp
+        self.round_trip()
+        if self.query("SELECT 1 FROM users WHERE email = ?", (email,)):
+            raise APIError("User already registered", 400)
+        now = iso(self.now())
+        user = {
+            "id": str(uuid.uuid4()),
+            "email": email,
+            "name": name,
+            "password_hash": hash_password(password, secrets.token_hex(8)),
+            "created_at": now
+        }
+        self.insert("users", user)
+
+        # Default workspace + owner membership (two more round trips in route.js)
+        self.round_trip()
+        workspace_id = str(uuid.uuid4())
+        self.insert("workspaces", {"id": workspace_id, "name": f"{name}'s Workspace",
+                                   "owner_id": user["id"], "created_at": now, "updated_at": now})
+        self.round_trip()
+        self.insert("workspace_members", {"id": str(uuid.uuid4()), "workspace_id": workspace_id,
+                                          "user_id": user["id"], "role": "owner", "created_at": now})
+
+        workspace = self.query("SELECT * FROM workspaces WHERE id = ?", (workspace_id,))[0]
+        return {"user": self.public_user(user), "session": self.issue_session(user), "workspace": workspace}
+
+    def login(self, body):
+        email = (body.get("email") or "").strip().lower()
+        password = body.get("password") or ""
+
+        self.round_trip()
+        rows = self.query("SELECT * FROM users WHERE email = ?", (email,))
+        if not rows:
+            raise APIError("Invalid login credentials", 400)
+        user = rows[0]
+        salt = user["password_hash"].split("$", 1)[0]
+        if hash_password(password, salt) != user["password_hash"]:
+            raise APIError("Invalid login credentials", 400)
+
+        return {"user": self.public_user(user), "session": self.issue_session(user)}
+
+    def logout(self, token):
+        user = self.get_user(token)
+        if user:
+            self.verified_tokens.delete(token)
+            # revoke_session(): recorded for every instance, and remembered here at once
+            claims = verify_jwt(token, self.jwt_secret)
+            expires_at = claims["exp"] if claims else time.time() + ACCESS_TOKEN_TTL_S
+            self.round_trip()
+            self.execute("DELETE FROM revoked_sessions WHERE expires_at <= ?", (time.time(),))
+            self.execute("INSERT OR IGNORE INTO revoked_sessions VALUES (?, ?, ?, ?)",
+                         (user["session_id"], user["id"], time.time(), expires_at))
+            with self.revocation_lock:
+                self.remember_revocation(user["session_id"], expires_at)
+            # GoTrue /logout ends the session server-side
+            self.round_trip()
+            self.execute("DELETE FROM sessions WHERE id = ?", (user["session_id"],))
+        return {"message": "Logged out successfully"}
+
+    # -- tasks ---------------------------------------------------------------
+
+    def get_tasks(self, user, query):
+        """Keyset-paginated task list; total_time is summed in SQL like the task_list view"""
+        try:
+            limit = int(query.get("limit") or TASK_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= TASK_PAGE_SIZE_MAX:
+            raise APIError(f"limit must be between 1 and {TASK_PAGE_SIZE_MAX}", 400)
+
+        sql = f"""
+          SELECT t.*, COALESCE((SELECT SUM(te.duration) FROM time_entries te
+                                WHERE te.task_id = t.id AND te.user_id = ?), 0) AS total_time
+          FROM tasks t
+          WHERE {self.visible_tasks_sql()}
+        """
+        params = [user["id"], user["id"]]
+        for column in ("status", "project_id", "assignee_id"):
+            if query.get(column):
+                sql += f" AND t.{column} = ?"
+                params.append(query[column])
+        if query.get("cursor"):
+            created_at, task_id = decode_cursor(query["cursor"])
+            sql += " AND t.created_at <= ? AND (t.created_at < ? OR (t.created_at = ? AND t.id < ?))"
+            params.extend([created_at, created_at, created_at, task_id])
+        sql += " ORDER BY t.created_at DESC, t.id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self.query(sql, tuple(params))
+        tasks = self.with_task_refs(rows[:limit])
+        subtasks = {}
+        if tasks:
+            marks = ", ".join("?" for _ in tasks)
+            for subtask in self.query(f"SELECT * FROM subtasks WHERE task_id IN ({marks})",
+                                      tuple(task["id"] for task in tasks)):
+                subtask["done"] = bool(subtask["done"])
+                subtasks.setdefault(subtask["task_id"], []).append(subtask)
+        for task in tasks:
+            task["subtasks"] = subtasks.get(task["id"], [])
+        next_cursor = encode_cursor(tasks[-1]) if len(rows) > limit else None
+
+        self.round_trip(rows=len(tasks) + sum(len(v) for v in subtasks.values()))
+        return {"tasks": tasks, "next_cursor": next_cursor}
+
+    def fetch_task(self, task_id):
+        rows = self.query("SELECT * FROM tasks WHERE id = ?", (task_id,))
+        if not rows:
+            raise APIError("JSON object requested, multiple (or no) rows returned", 500)
+        return self.with_task_refs(rows)[0]
+
+    def create_task(self, user, body):
+        unknown = set(body) - TASK_COLUMNS
+        if unknown:
+            raise APIError(f"Could not find the '{sorted(unknown)[0]}' column of 'tasks' in the schema cache", 500)
+        now = iso(self.now())
+        task = {k: v for k, v in body.items() if v != ""}
+        task.update({"id": str(uuid.uuid4()), "created_by": user["id"], "created_at": now, "updated_at": now})
+
+        self.round_trip()
+        self.insert("tasks", task)
+        created = self.fetch_task(task["id"])
+        self.bump_versions(user)
+        self.audit(user, "task.created", "task", created["id"], self.task_notifications(user, created, body))
+        return {"task": created}
+
+    def update_task(self, user, task_id, body):
+        unknown = set(body) - TASK_COLUMNS
+        if unknown:
+            raise APIError(f"Could not find the '{sorted(unknown)[0]}' column of 'tasks' in the schema cache", 500)
+
+        self.round_trip()
+        if body:
+            assignments = ", ".join(f"{column} = ?" for column in body)
+            self.execute(f"UPDATE tasks SET {assignments}, updated_at = ? WHERE id = ?",
+                         (*body.values(), iso(self.now()), task_id))
+        updated = self.fetch_task(task_id)
+        self.bump_versions(user)
+        self.audit(user, "task.updated", "task", updated["id"], self.task_notifications(user, updated, body))
+        return {"task": updated}
+
+    # -- bulk writes ---------------------------------------------------------
+
+    def bulk_write(self, user, body, key, validate, write, result_key):
+        """Validate every item, write the valid ones in one round trip, report errors per item"""
+        items = body.get(key)
+        if not isinstance(items, list) or not items:
+            raise APIError(f'Body must be {{ "{key}": [...] }} with at least one item', 400)
+        if len(items) > BULK_MAX_ITEMS:
+            raise APIError(f"At most {BULK_MAX_ITEMS} {key} per request", 400)
+
+        errors, valid, positions = [], [], []
+        for index, item in enumerate(items):
+            error = validate(item)
+            if error:
+                errors.append({"index": index, "error": error})
+            else:
+                valid.append(item)
+                positions.append(index)
+
+        results = []
+        if valid:
+            self.round_trip(rows=len(valid))
+            written, failed = write(valid)
+            results = [{"index": positions[i], "id": row_id} for i, row_id in written]
+            errors.extend({"index": positions[i], "error": error} for i, error in failed)
+
+        errors.sort(key=lambda e: e["index"])
+        self.bump_versions(user)
+        return {result_key: results, "errors": errors}
+
+    def insert_rows(self, table, rows):
+        statements = [(f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+                       tuple(row.values())) for row in rows]
+        ok, failed = self.write_batch(statements)
+        return [(i, rows[i]["id"]) for i in ok], failed
+
+    def bulk_create_tasks(self, user, body):
+        def write(items):
+            now = iso(self.now())
+            rows = [{**{k: v for k, v in item.items() if v is not None}, "id": str(uuid.uuid4()),
+                     "created_by": user["id"], "created_at": now, "updated_at": now} for item in items]
+            return self.insert_rows("tasks", rows)
+        return self.bulk_write(user, body, "tasks", validate_task, write, "created")
+
+    def bulk_update_tasks(self, user, body):
+        def write(items):
+            now = iso(self.now())
+            updated, failed = [], []
+            for i, item in enumerate(items):
+                fields = {k: v for k, v in item.items() if k != "id"}
+                with self.lock:
+                    try:
+                        with self.db:
+                            cursor = self.db.execute(
+                                f"UPDATE tasks SET {', '.join(f'{k} = ?' for k in fields)}, updated_at = ? WHERE id = ?",
+                                (*fields.values(), now, item["id"]))
+                    except sqlite3.Error as e:
+                        failed.append((i, str(e)))
+                        continue
+                if cursor.rowcount:
+                    updated.append((i, item["id"]))
+                else:
+                    failed.append((i, "Task not found"))
+            return updated, failed
+        return self.bulk_write(user, body, "tasks", validate_task_update, write, "updated")
+
+    def bulk_create_time_entries(self, user, body):
+        def write(items):
+            now = iso(self.now())
+            rows = []
+            for item in items:
+                start, end = parse_utc(item["start_time"]), parse_utc(item["end_time"])
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "task_id": item["task_id"],
+                    "user_id": user["id"],
+                    "start_time": iso(start.astimezone(timezone.utc)),
+                    "end_time": iso(end.astimezone(timezone.utc)),
+                    "duration": int((end - start).total_seconds() // 60),
+                    "description": item.get("description") or "",
+                    "billable": bool(item.get("billable", False)),
+                    "created_at": now
+                })
+            return self.insert_rows("time_entries", rows)
+        return self.bulk_write(user, body, "entries", validate_time_entry, write, "created")
+
+    # -- time tracking -------------------------------------------------------
+
+    def get_time_entries(self, user, query):
+        sql = "SELECT * FROM time_entries WHERE user_id = ?"
+        params = [user["id"]]
+        if query.get("task_id"):
+            sql += " AND task_id = ?"
+            params.append(query["task_id"])
+        entries = self.with_entry_refs(self.query(sql + " ORDER BY start_time DESC", tuple(params)))
+
+        self.round_trip(rows=len(entries))
+        return {"entries": entries}
+
+    def fetch_entry(self, entry_id):
+        return self.with_entry_refs(self.query("SELECT * FROM time_entries WHERE id = ?", (entry_id,)))[0]
+
+    def active_entry(self, user_id):
+        rows = self.query("SELECT * FROM time_entries WHERE user_id = ? AND end_time IS NULL", (user_id,))
+        return rows[0] if rows else None
+
+    def start_timer(self, user, body):
+        # One INSERT; the partial unique index rejects a second running timer, as in route.js
+        self.round_trip()
+        entry = {
+            "id": str(uuid.uuid4()),
+            "task_id": body.get("task_id"),
+            "user_id": user["id"],
+            "start_time": iso(self.now()),
+            "description": body.get("description") or "",
+            "created_at": iso(self.now())
+        }
+        columns = ", ".join(entry)
+        placeholders = ", ".join("?" for _ in entry)
+        with self.lock:
+            try:
+                with self.db:
+                    self.db.execute(f"INSERT INTO time_entries ({columns}) VALUES ({placeholders})",
+                                    tuple(entry.values()))
+            except sqlite3.IntegrityError as e:
+                if "UNIQUE" in str(e):
+                    raise APIError("You already have an active timer running", 400)
+                raise APIError(str(e), 500)
+        self.bump_versions(user)
+        return {"entry": self.fetch_entry(entry["id"])}
+
+    def stop_timer(self, user, body):
+        # One UPDATE that computes the duration from the stored start_time (the stop_timer RPC)
+        entry_id = body.get("entry_id")
+
+        self.round_trip()
+        with self.lock:
+            with self.db:
+                cursor = self.db.execute(
+                    """UPDATE time_entries
+                       SET end_time = :now,
+                           duration = CAST(ROUND((julianday(:now) - julianday(start_time)) * 86400000) AS INTEGER) / 60000
+                       WHERE id = :id AND user_id = :user_id AND end_time IS NULL""",
+                    {"now": iso(self.now()), "id": entry_id, "user_id": user["id"]})
+        if not cursor.rowcount:
+            raise APIError("Entry not found", 404)
+        self.bump_versions(user)
+        self.audit(user, "timer.stopped", "time_entry", entry_id)
+        return {"entry": self.fetch_entry(entry_id)}
+
+    def get_active_timer(self, user, query):
+        self.round_trip()
+        entry = self.active_entry(user["id"])
+        return {"entry": self.with_entry_refs([entry])[0] if entry else None}
+
+    def export_chunk(self, user, filters, after):
+        """One keyset chunk of finished entries in (start_time, id) order"""
+        sql = """SELECT te.id, te.start_time, te.end_time, te.duration, te.billable, te.description,
+                        te.task_id, t.title AS task_title, p.id AS project_id, p.name AS project_name
+                 FROM time_entries te
+                 LEFT JOIN tasks t ON t.id = te.task_id
+                 LEFT JOIN projects p ON p.id = t.project_id
+                 WHERE te.user_id = ? AND te.end_time IS NOT NULL"""
+        params = [user["id"]]
+        for condition, value in filters:
+            sql += f" AND {condition}"
+            params.append(value)
+        if after:
+            sql += " AND (te.start_time > ? OR (te.start_time = ? AND te.id > ?))"
+            params += [after["start_time"], after["start_time"], after["id"]]
+        sql += " ORDER BY te.start_time, te.id LIMIT ?"
+        rows = self.query(sql, (*params, EXPORT_CHUNK_SIZE))
+
+        self.round_trip(rows=len(rows))
+        for row in rows:
+            row["billable"] = bool(row["billable"])
+        return rows
+
+    def export_time_entries(self, user, query):
+        """Streams NDJSON/CSV like route.js; returns (status, line generator, headers)"""
+        export_format = query.get("format") or "ndjson"
+        day_from, day_to = query.get("from"), query.get("to")
+        project_id, billable = query.get("project_id"), query.get("billable")
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise APIError("format must be ndjson or csv", 400)
+        if any(value and not DAY_PATTERN.match(value) for value in (day_from, day_to)):
+            raise APIError("from/to must be dates in YYYY-MM-DD format", 400)
+        if project_id and not is_uuid(project_id):
+            raise APIError("project_id must be a UUID", 400)
+        if billable and billable not in ("true", "false"):
+            raise APIError("billable must be true or false", 400)
+
+        filters = []
+        if day_from:
+            filters.append(("te.start_time >= ?", f"{day_from}T00:00:00+00:00"))
+        if day_to:
+            next_day = datetime.fromisoformat(day_to) + timedelta(days=1)
+            filters.append(("te.start_time < ?", f"{next_day.date().isoformat()}T00:00:00+00:00"))
+        if project_id:
+            filters.append(("t.project_id = ?", project_id))
+        if billable:
+            filters.append(("te.billable = ?", billable == "true"))
+
+        def line(row):
+            if export_format == "csv":
+                return csv_line(row[column] for column in EXPORT_COLUMNS)
+            return json.dumps({column: row[column] for column in EXPORT_COLUMNS}, separators=(",", ":")) + "\n"
+
+        def stream(chunk):
+            if export_format == "csv":
+                yield csv_line(EXPORT_COLUMNS).encode()
+            while True:
+                if chunk:
+                    yield "".join(line(row) for row in chunk).encode()
+                if len(chunk) < EXPORT_CHUNK_SIZE:
+                    return
+                chunk = self.export_chunk(user, filters, chunk[-1])
+
+        # First chunk up front so a failing query is still a JSON error, as in route.js
+        headers = {
+            "Content-Type": EXPORT_CONTENT_TYPES[export_format],
+            "Content-Disposition": f'attachment; filename="time-entries.{export_format}"',
+            "Cache-Control": "no-store"
+        }
+        return 200, stream(self.export_chunk(user, filters, None)), headers
+
+    # -- projects ------------------------------------------------------------
+
+    def get_projects(self, user, query):
+        projects = self.query(
+            """SELECT p.* FROM projects p
+               WHERE EXISTS (SELECT 1 FROM workspace_members wm
+                             WHERE wm.workspace_id = p.workspace_id AND wm.user_id = ?)
+               ORDER BY p.name""",
+            (user["id"],))
+
+        self.round_trip(rows=len(projects))
+        return {"projects": projects}
+
+    def create_project(self, user, body):
+        unknown = set(body) - PROJECT_COLUMNS
+        if unknown:
+            raise APIError(f"Could not find the '{sorted(unknown)[0]}' column of 'projects' in the schema cache", 500)
+        project = dict(body)
+        if not project.get("workspace_id"):
+            # Like createProject in route.js: the app always sends the caller's workspace; default
+            # to the first of theirs (getMemberWorkspaces, cached) for API clients that don't
+            workspaces = self.cached_member_workspaces(user["id"])
+            project["workspace_id"] = workspaces[0] if workspaces else None
+        now = iso(self.now())
+        project.update({"id": str(uuid.uuid4()), "created_at": now, "updated_at": now})
+
+        self.round_trip()
+        self.insert("projects", project)
+        self.bump_versions(user, project["workspace_id"])
+        return {"project": self.query("SELECT * FROM projects WHERE id = ?", (project["id"],))[0]}
+
+    # -- dashboard -----------------------------------------------------------
+
+    def get_dashboard_stats(self, user, query):
+        """dashboard_stats() RPC: one round trip, time totals read from the daily rollup"""
+        day_from, day_to = query.get("from"), query.get("to")
+        if any(value and not DAY_PATTERN.match(value) for value in (day_from, day_to)):
+            raise APIError("from/to must be dates in YYYY-MM-DD format", 400)
+        today = self.now().date()
+        # Coalesced per user: both task counts and time totals depend on who is asking
+        return self.coalesce(f"dashboard/stats {user['id']} {today} {day_from} {day_to}",
+                             lambda: self.load_dashboard_stats(user, today, day_from, day_to))
+
+    def load_dashboard_stats(self, user, today, day_from, day_to):
+        counts = {row["status"]: row["count"] for row in self.query(
+            f"SELECT t.status, COUNT(*) AS count FROM tasks t WHERE {self.visible_tasks_sql()} GROUP BY t.status",
+            (user["id"],))}
+        task_stats = {
+            "total": sum(counts.values()),
+            "todo": counts.get("todo", 0),
+            "in_progress": counts.get("in_progress", 0),
+            "completed": counts.get("completed", 0)
+        }
+
+        range_to = day_to or today.isoformat()
+        lower = min((today - timedelta(days=29)).isoformat(), day_from or today.isoformat())
+        upper = max(today.isoformat(), range_to)
+        rollups = self.query(
+            "SELECT day, minutes FROM time_rollups_daily WHERE user_id = ? AND day >= ? AND day <= ?",
+            (user["id"], lower, upper))
+
+        def total(first, last):
+            return sum(row["minutes"] for row in rollups if first <= row["day"] <= last)
+
+        time_stats = {
+            "today": total(today.isoformat(), today.isoformat()),
+            # Rolling windows ending today, today included: 7 and 30 days
+            "week": total((today - timedelta(days=6)).isoformat(), today.isoformat()),
+            "month": total((today - timedelta(days=29)).isoformat(), today.isoformat())
+        }
+        if day_from:
+            time_stats["range"] = total(day_from, range_to)
+
+        self.round_trip()
+        return {"taskStats": task_stats, "timeStats": time_stats}
+
+    # -- reports -------------------------------------------------------------
+
+    def get_time_report(self, user, query):
+        """time_report() RPC: finished entries totalled per group in the database, one round trip"""
+        group_by = query.get("group_by")
+        day_from, day_to = query.get("from"), query.get("to")
+        billable, workspace_id = query.get("billable"), query.get("workspace_id")
+        if group_by not in REPORT_GROUPS:
+            raise APIError(f"group_by must be one of {', '.join(REPORT_GROUPS)}", 400)
+        if any(value and not DAY_PATTERN.match(value) for value in (day_from, day_to)):
+            raise APIError("from/to must be dates in YYYY-MM-DD format", 400)
+        if day_from and day_to and day_from > day_to:
+            raise APIError("from must not be after to", 400)
+        if billable and billable not in ("true", "false"):
+            raise APIError("billable must be true or false", 400)
+        if workspace_id and not is_uuid(workspace_id):
+            raise APIError("workspace_id must be a UUID", 400)
+
+        self.round_trip()
+        if workspace_id and not self.query(
+                "SELECT 1 FROM workspace_members WHERE workspace_id = ? AND user_id = ? AND role IN ('owner', 'admin')",
+                (workspace_id, user["id"])):
+            raise APIError("Workspace not found", 404)
+
+        lower = f"{day_from}T00:00:00+00:00" if day_from else ""
+        upper = f"{(datetime.fromisoformat(day_to) + timedelta(days=1)).date().isoformat()}T00:00:00+00:00" \
+            if day_to else "~"
+        if not workspace_id and not billable and group_by in ("day", "week"):
+            # The caller's own day/week totals come from the precomputed daily buckets
+            key = "day" if group_by == "day" else "date(day, 'weekday 0', '-6 days')"
+            groups = self.query(
+                f"""SELECT {key} AS key, SUM(minutes) AS minutes, SUM(billable_minutes) AS billable_minutes,
+                           SUM(entries) AS entries
+                    FROM time_rollups_daily
+                    WHERE user_id = ? AND day >= ? AND day <= ? AND entries > 0
+                    GROUP BY 1""",
+                (user["id"], day_from or "", day_to or "~"))
+        else:
+            if workspace_id:
+                source = "tasks t JOIN time_entries te ON te.task_id = t.id WHERE t.workspace_id = ?"
+                params = [workspace_id]
+            else:
+                source = "time_entries te LEFT JOIN tasks t ON t.id = te.task_id WHERE te.user_id = ?"
+                params = [user["id"]]
+            sql = f"""SELECT {REPORT_KEYS[group_by]} AS key, SUM(te.duration) AS minutes,
+                             SUM(CASE WHEN te.billable THEN te.duration ELSE 0 END) AS billable_minutes,
+                             COUNT(*) AS entries
+                      FROM {source}
+                        AND te.start_time >= ? AND te.start_time < ? AND te.duration IS NOT NULL"""
+            params += [lower, upper]
+            if billable:
+                sql += " AND te.billable = ?"
+                params.append(billable == "true")
+            groups = self.query(sql + " GROUP BY 1", params)
+
+        if group_by in REPORT_LABELS:
+            keys = [row["key"] for row in groups if row["key"]]
+            labels = {row["key"]: row["label"] for row in self.query(
+                REPORT_LABELS[group_by].format(", ".join("?" * len(keys))), keys)} if keys else {}
+            for row in groups:
+                row["label"] = labels.get(row["key"], "No project" if group_by == "project" else None)
+            groups.sort(key=lambda row: (-row["minutes"], row["key"] is None, row["key"] or ""))
+        else:
+            for row in groups:
+                row["label"] = row["key"]
+            groups.sort(key=lambda row: row["key"])
+
+        rows = [{field: row[field] for field in ("key", "label", "minutes", "billable_minutes", "entries")}
+                for row in groups]
+        total = {field: sum(row[field] for row in rows) for field in ("minutes", "billable_minutes", "entries")}
+        return {"group_by": group_by, "rows": rows, "total": total}
+
+    # -- delta sync ----------------------------------------------------------
+
+    def sync_head(self):
+        """sync_head(): never before the pruned part of the log"""
+        return self.query("""SELECT MAX(COALESCE((SELECT MAX(seq) FROM sync_changes), 0), pruned_through) AS head
+                             FROM sync_log_state""")[0]["head"]
+
+    def prune_sync_changes(self, retention_days=SYNC_RETENTION_DAYS):
+        """prune_sync_changes(): drop the log prefix older than the retention; returns the entries removed"""
+        with self.lock:
+            with self.db:
+                through = self.db.execute("SELECT MAX(seq) FROM sync_changes WHERE changed_at < julianday('now') - ?",
+                                          (retention_days,)).fetchone()[0]
+                if through is None:
+                    return 0
+                self.db.execute("UPDATE sync_log_state SET pruned_through = MAX(pruned_through, ?)", (through,))
+                return self.db.execute("DELETE FROM sync_changes WHERE seq <= ?", (through,)).rowcount
+
+    def prune_sync_log(self):
+        """
+        pruneSyncLog() in route.js: at most once per SYNC_PRUNE_INTERVAL_S. route.js does not
+        wait for it, so no round trip is charged
+        """
+        now = time.monotonic()
+        if self.sync_pruned_at is not None and now - self.sync_pruned_at < SYNC_PRUNE_INTERVAL_S:
+            return
+        self.sync_pruned_at = now
+        self.prune_sync_changes()
+
+    def get_sync(self, user, query):
+        """sync_since() RPC: one round trip over the caller's slice of sync_changes"""
+        since = query.get("since") or "0"
+        if not SYNC_CURSOR_PATTERN.match(since):
+            raise APIError("Invalid cursor", 400)
+        try:
+            limit = int(query.get("limit") or SYNC_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= SYNC_PAGE_SIZE_MAX:
+            raise APIError(f"limit must be between 1 and {SYNC_PAGE_SIZE_MAX}", 400)
+
+        self.prune_sync_log()
+        # A cursor from before the pruned part may have missed changes: tell the client to reload
+        if int(since) < self.query("SELECT pruned_through FROM sync_log_state")[0]["pruned_through"]:
+            self.round_trip()
+            return {"tasks": [], "projects": [], "time_entries": [], "messages": [], "docs": [], "deleted": [],
+                    "cursor": str(self.sync_head()), "has_more": False, "reset": True}
+
+        batch = self.query(
+            """SELECT seq, entity, entity_id FROM sync_changes
+               WHERE seq > ? AND (user_id = ? OR workspace_id IN
+                                  (SELECT workspace_id FROM workspace_members WHERE user_id = ?))
+               ORDER BY seq LIMIT ?""",
+            (int(since), user["id"], user["id"], limit))
+        changed = {}
+        for change in batch:
+            changed.setdefault(change["entity"], {})[change["entity_id"]] = True
+
+        def rows(entity, sql, before=(), after=()):
+            """Current rows for the changed ids of one entity; before/after are the params around {ids}"""
+            ids = list(changed.get(entity, ()))
+            if not ids:
+                return []
+            marks = ", ".join("?" for _ in ids)
+            return self.query(sql.format(ids=marks), (*before, *ids, *after))
+
+        tasks = rows("tasks", f"""
+          SELECT t.*, COALESCE((SELECT SUM(te.duration) FROM time_entries te
+                                WHERE te.task_id = t.id AND te.user_id = ?), 0) AS total_time,
+                 tp.name AS project_name
+          FROM tasks t LEFT JOIN projects tp ON tp.id = t.project_id
+          WHERE t.id IN ({{ids}}) AND {self.visible_tasks_sql()}""", (user["id"],), (user["id"],))
+        for task in tasks:
+            name = task.pop("project_name")
+            task["project"] = {"id": task["project_id"], "name": name} if task["project_id"] else None
+        projects = rows("projects", """
+          SELECT p.* FROM projects p
+          WHERE p.id IN ({ids}) AND p.workspace_id IN
+                (SELECT workspace_id FROM workspace_members WHERE user_id = ?)""", after=(user["id"],))
+        entries = rows("time_entries", "SELECT * FROM time_entries WHERE user_id = ? AND id IN ({ids})",
+                       before=(user["id"],))
+        refs = self.task_refs({e["task_id"] for e in entries if e["task_id"]})
+        for entry in entries:
+            entry["billable"] = bool(entry["billable"])
+            entry["task"] = refs.get(entry["task_id"])
+        messages = rows("messages", """
+          SELECT m.* FROM messages m JOIN channels c ON c.id = m.channel_id
+          WHERE m.id IN ({ids}) AND c.workspace_id IN
+                (SELECT workspace_id FROM workspace_members WHERE user_id = ?)""", after=(user["id"],))
+        docs = rows("docs", """
+          SELECT d.* FROM docs d
+          WHERE d.id IN ({ids}) AND d.workspace_id IN
+                (SELECT workspace_id FROM workspace_members WHERE user_id = ?)""", after=(user["id"],))
+
+        present = {(entity, row["id"]) for entity, found in
+                   (("tasks", tasks), ("projects", projects), ("time_entries", entries),
+                    ("messages", messages), ("docs", docs)) for row in found}
+        deleted = [{"type": entity, "id": entity_id} for entity, ids in changed.items()
+                   for entity_id in ids if (entity, entity_id) not in present]
+
+        self.round_trip(rows=len(batch) + len(present))
+        return {
+            "tasks": tasks,
+            "projects": projects,
+            "time_entries": entries,
+            "messages": messages,
+            "docs": docs,
+            "deleted": deleted,
+            "cursor": str(batch[-1]["seq"] if batch else int(since)),
+            "has_more": len(batch) == limit,
+            "reset": False
+        }
+
+    # -- search --------------------------------------------------------------
+
+    def search(self, user, query):
+        """search_workspace() RPC: ranked matches in the caller's workspaces, one round trip"""
+        q = (query.get("q") or "").strip()
+        if not q:
+            raise APIError("q is required", 400)
+        if len(q) > SEARCH_QUERY_MAX:
+            raise APIError(f"q must be at most {SEARCH_QUERY_MAX} characters", 400)
+        types = [t.strip() for t in query["types"].split(",")] if query.get("types") else list(SEARCH_TYPES)
+        if not types or any(t not in SEARCH_TYPES for t in types):
+            raise APIError(f"types must be a comma-separated subset of {', '.join(SEARCH_TYPES)}", 400)
+        workspace_id = query.get("workspace_id")
+        if workspace_id and not is_uuid(workspace_id):
+            raise APIError("workspace_id must be a UUID", 400)
+        try:
+            limit = int(query.get("limit") or SEARCH_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= SEARCH_PAGE_SIZE_MAX:
+            raise APIError(f"limit must be between 1 and {SEARCH_PAGE_SIZE_MAX}", 400)
+        after = decode_search_cursor(query["cursor"]) if query.get("cursor") else None
+
+        match = fts_query(q)
+        if match is None:
+            self.round_trip()
+            return {"results": [], "next_cursor": None}
+
+        workspaces = "(SELECT workspace_id FROM workspace_members WHERE user_id = ? AND (? IS NULL OR workspace_id = ?))"
+        selects = {
+            "tasks": (f"""
+              SELECT 'tasks' AS type, t.id, t.workspace_id, t.title, t.created_at,
+                     -bm25(tasks_search, 1.0, 0.4) AS rank,
+                     snippet(tasks_search, -1, '<b>', '</b>', '…', 12) AS snippet
+              FROM tasks_search JOIN tasks t ON t.rowid = tasks_search.rowid
+              WHERE tasks_search MATCH ?
+                AND (t.workspace_id IN {workspaces}
+                     OR (? IS NULL AND t.project_id IS NULL AND ? IN (t.created_by, t.assignee_id)))""",
+                      (match, user["id"], workspace_id, workspace_id, workspace_id, user["id"])),
+            "docs": (f"""
+              SELECT 'docs' AS type, d.id, d.workspace_id, d.title, d.created_at,
+                     -bm25(docs_search, 1.0, 0.4) AS rank,
+                     snippet(docs_search, -1, '<b>', '</b>', '…', 12) AS snippet
+              FROM docs_search JOIN docs d ON d.rowid = docs_search.rowid
+              WHERE docs_search MATCH ? AND d.workspace_id IN {workspaces}""",
+                     (match, user["id"], workspace_id, workspace_id)),
+            "messages": (f"""
+              SELECT 'messages' AS type, m.id, m.workspace_id, '#' || c.name AS title, m.timestamp AS created_at,
+                     -bm25(messages_search, 1.0, 0.4) AS rank,
+                     snippet(messages_search, 0, '<b>', '</b>', '…', 12) AS snippet
+              FROM messages_search JOIN messages m ON m.rowid = messages_search.rowid
+                   LEFT JOIN channels c ON c.id = m.channel_id
+              WHERE messages_search MATCH ? AND m.workspace_id IN {workspaces}""",
+                         (match, user["id"], workspace_id, workspace_id))
+        }
+        sql = " UNION ALL ".join(selects[t][0] for t in SEARCH_TYPES if t in types)
+        params = [param for t in SEARCH_TYPES if t in types for param in selects[t][1]]
+        sql = f"SELECT * FROM ({sql}) hits"
+        if after:
+            sql += " WHERE (rank, type, id) < (?, ?, ?)"
+            params.extend(after)
+        sql += " ORDER BY rank DESC, type DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self.query(sql, tuple(params))
+        results = rows[:limit]
+        self.round_trip(rows=len(results))
+        return {"results": results, "next_cursor": encode_search_cursor(results[-1]) if len(rows) > limit else None}
+
+    # -- chat --------------------------------------------------------------
+
+    def member_channel(self, user, channel_id):
+        rows = self.query("""
+          SELECT c.* FROM channels c
+          WHERE c.id = ? AND c.workspace_id IN (SELECT workspace_id FROM workspace_members WHERE user_id = ?)
+        """, (channel_id, user["id"])) if is_uuid(channel_id) else []
+        if not rows:
+            raise APIError("Channel not found", 404)
+        return rows[0]
+
+    def with_senders(self, messages):
+        senders = {}
+        for message in messages:
+            sender_id = message["sender_id"]
+            if sender_id not in senders:
+                ref = self.user_ref(sender_id)
+                senders[sender_id] = {"id": ref["id"], "name": ref["name"]} if ref else None
+            message["sender"] = senders[sender_id]
+        return messages
+
+    def get_channel_messages(self, user, channel_id, query):
+        """
+        A page of history, newest first, keyset on (timestamp, id). route.js fetches the channel
+        with its embedded page in one query while the membership lookup runs alongside it, so
+        the whole read costs one round trip
+        """
+        try:
+            limit = int(query.get("limit") or MESSAGE_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MESSAGE_PAGE_SIZE_MAX:
+            raise APIError(f"limit must be between 1 and {MESSAGE_PAGE_SIZE_MAX}", 400)
+        before = decode_cursor(query["before"]) if query.get("before") else None
+
+        self.member_channel(user, channel_id)
+        sql = "SELECT * FROM messages WHERE channel_id = ?"
+        params = [channel_id]
+        if before:
+            sql += " AND timestamp <= ? AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+            params.extend([before[0], before[0], before[0], before[1]])
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self.query(sql, tuple(params))
+        messages = self.with_senders(rows[:limit])
+        self.round_trip(rows=len(messages))
+        return {
+            "messages": messages,
+            "next_cursor": encode_cursor(messages[-1], "timestamp") if len(rows) > limit else None
+        }
+
+    def send_message(self, user, channel_id, body):
+        content = body.get("content").strip() if isinstance(body.get("content"), str) else ""
+        if not content:
+            raise APIError("content is required", 400)
+        if len(content) > MESSAGE_CONTENT_MAX:
+            raise APIError(f"content must be at most {MESSAGE_CONTENT_MAX} characters", 400)
+
+        self.round_trip()
+        self.member_channel(user, channel_id)
+        message = {"id": str(uuid.uuid4()), "channel_id": channel_id, "sender_id": user["id"],
+                   "content": content, "timestamp": iso(self.now())}
+        self.round_trip()
+        self.insert("messages", message)
+        created = self.query("SELECT * FROM messages WHERE id = ?", (message["id"],))
+        return {"message": self.with_senders(created)[0]}
+
+    # -- process metrics -----------------------------------------------------
+
+    def get_server_metrics(self):
+        """GET /debug/metrics: the same fields as route.js, where the stand-in has them"""
+        with self.lock:
+            if self.lag_monitor is None:
+                self.lag_monitor = LagMonitor()
+        return {
+            "rss_bytes": process_rss_bytes(),
+            "event_loop_lag_ms": self.lag_monitor.snapshot(),
+            "open_sockets": open_socket_count(),
+            "active_handles": threading.active_count(),
+            "backend_calls": self.latency.round_trips,
+            "coalescing": {
+                "enabled": self.coalesce_reads,
+                "calls": self.read_flights.calls,
+                "coalesced": self.read_flights.coalesced,
+                "in_flight": len(self.read_flights)
+            },
+            "audit": {
+                "mode": self.audit_mode,
+                "activity_logs": self.activity_log.stats(),
+                "notifications": self.notification_log.stats()
+            },
+            "caches": {
+                "verified_tokens": len(self.verified_tokens),
+                "revoked_sessions": len(self.revoked_sessions),
+                "workspace_versions": len(self.scope_versions),
+                "member_workspaces": len(self.member_workspaces),
+                "list_cache": len(self.list_cache)
+            },
+            "uptime_s": time.monotonic() - self.started_at
+        }
+
+    # -- routing -------------------------------------------------------------
+
+    def dispatch(self, method, path, query, body, token, if_none_match=None, clock=None):
+        """Route like the GET/POST/PUT/DELETE exports in route.js; returns (status, payload, headers)"""
+        try:
+            self.pin_clock(clock)
+            if method == "GET" and path == "":
+                return 200, {"message": "FlowOps API"}, {}
+            if method == "GET" and path == "debug/metrics":
+                return 200, self.get_server_metrics(), {"Cache-Control": "no-store"}
+
+            if method == "POST" and path == "auth/signup":
+                return 200, self.signup(body), {}
+            if method == "POST" and path == "auth/login":
+                return 200, self.login(body), {}
+            if method == "POST" and path == "auth/logout":
+                return 200, self.logout(token), {}
+
+            get_routes = {
+                "tasks": self.get_tasks,
+                "projects": self.get_projects,
+                "time-entries": self.get_time_entries,
+                "time-entries/active": self.get_active_timer,
+                "time-entries/export": self.export_time_entries,
+                "dashboard/stats": self.get_dashboard_stats,
+                "reports/time": self.get_time_report,
+                "sync": self.get_sync,
+                "search": self.search
+            }
+            post_routes = {
+                "tasks": self.create_task,
+                "projects": self.create_project,
+                "time-entries/start": self.start_timer,
+                "time-entries/stop": self.stop_timer,
+                "tasks/bulk": self.bulk_create_tasks,
+                "time-entries/bulk": self.bulk_create_time_entries
+            }
+
+            list_routes = ("tasks", "projects", "time-entries")
+            channel_messages = CHANNEL_MESSAGES_PATH.match(path)
+
+            if method == "GET" and channel_messages:
+                handler = lambda user: self.get_channel_messages(user, channel_messages.group(1), query)
+            elif method == "POST" and channel_messages:
+                handler = lambda user: self.send_message(user, channel_messages.group(1), body)
+            elif method == "GET" and path in list_routes:
+                handler = lambda user: self.list_response(
+                    user, path, query, if_none_match, lambda: get_routes[path](user, query),
+                    workspace_scoped=path == "projects")
+            elif method == "GET" and path in get_routes:
+                handler = lambda user: get_routes[path](user, query)
+            elif method == "POST" and path in post_routes:
+                handler = lambda user: post_routes[path](user, body)
+            elif method == "PUT" and path == "tasks/bulk":
+                handler = lambda user: self.bulk_update_tasks(user, body)
+            elif method == "PUT" and path.startswith("tasks/"):
+                handler = lambda user: self.update_task(user, path.split("/")[1], body)
+            else:
+                return 404, {"error": "Not found"}, {}
+
+            user = self.get_user(token)
+            if not user:
+                return 401, {"error": "Unauthorized"}, {}
+            result = handler(user)
+            return result if isinstance(result, tuple) else (200, result, {})
+        except APIError as e:
+            return e.status, {"error": e.message}, {}
+        except Exception as e:
+            # route.js answers any other failure with 500 and the message; so must the stand-in,
+            # or the error would kill the handler thread and the client sees the connection drop
+            return 500, {"error": str(e)}, {}
+
+
+def make_handler(api):
+    class LocalAPIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; with Nagle on, a keep-alive client's
+        # delayed ACK holds the body back ~40 ms
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def respond(self, status, payload, headers=None):
+            if inspect.isgenerator(payload):
+                return self.respond_stream(status, payload, headers)
+            data = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            if payload is not None:
+                self.send_header("Content-Type", "application/json")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def respond_stream(self, status, chunks, headers):
+            """Chunked transfer encoding: each generated block goes out as soon as it is built"""
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for data in chunks:
+                    self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            except APIError:
+                # Headers are already out: drop the connection so the client sees a truncated body
+                self.close_connection = True
+                return
+            self.wfile.write(b"0\r\n\r\n")
+
+        def handle_method(self):
+            url = urlparse(self.path)
+            if not url.path.startswith("/api"):
+                return self.respond(404, {"error": "Not found"})
+            path = url.path[len("/api"):].strip("/")
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                return self.respond(400, {"error": "Invalid JSON body"})
+            if not isinstance(body, dict):
+                return self.respond(400, {"error": "JSON body must be an object"})
+
+            auth = self.headers.get("Authorization") or ""
+            token = auth.replace("Bearer ", "") or None
+            status, payload, headers = api.dispatch(self.command, path, query, body, token,
+                                                    self.headers.get("If-None-Match"),
+                                                    self.headers.get(CLOCK_HEADER))
+            self.respond(status, payload, headers)
+
+        do_GET = do_POST = do_PUT = do_DELETE = handle_method
+
+    return LocalAPIHandler
+
+
+class LocalHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog of 5 drops connections under load-test concurrency
+    request_queue_size = 1024
+
+
+class LocalAPIServer:
+    """Runs LocalFlowOpsAPI on a background thread; base_url points at its /api prefix"""
+
+    def __init__(self, host="127.0.0.1", port=0, db_path=":memory:", latency=None, auth_mode="remote",
+                 list_cache_max=LIST_CACHE_MAX, clock_override=False, coalesce=True, audit="batched"):
+        self.api = LocalFlowOpsAPI(db_path, latency, auth_mode, list_cache_max=list_cache_max,
+                                   clock_override=clock_override, coalesce=coalesce, audit=audit)
+        self.httpd = LocalHTTPServer((host, port), make_handler(self.api))
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.api.close()
+
+
+def add_server_arguments(parser):
+    """Latency model and auth options shared by this script and backend_test.py --target local"""
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS,
+                        help="simulated Supabase round-trip latency")
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_JITTER_MS,
+                        help="uniform +/- jitter added to each round trip")
+    parser.add_argument("--per-row-ms", type=float, default=DEFAULT_PER_ROW_MS,
+                        help="extra transfer time per row returned")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the jitter generator")
+    parser.add_argument("--auth", choices=AUTH_MODES, default="remote",
+                        help="remote: getUser costs an auth round trip; local: in-process JWT check + cache")
+    parser.add_argument("--list-cache-max", type=int, default=LIST_CACHE_MAX,
+                        help="entries in the in-process list response cache (0 disables it; ETags stay on)")
+    parser.add_argument("--coalesce", choices=("on", "off"), default="on",
+                        help="share one backend query between concurrent identical reads (COALESCE_READS)")
+    parser.add_argument("--audit", choices=AUDIT_MODES, default="batched",
+                        help="activity log and notification writes: queued and batched, "
+                             "synchronous on each write, or off (AUDIT_LOG)")
+    parser.add_argument("--clock-override", action="store_true",
+                        help=f"honour {CLOCK_HEADER} request headers, so tests can move the clock")
+
+
+def latency_from_args(args):
+    return LatencyModel(args.latency_ms, args.jitter_ms, args.per_row_ms, args.seed)
+
+
+def server_from_args(args, host="127.0.0.1", port=0, db_path=":memory:"):
+    return LocalAPIServer(host, port, db_path, latency_from_args(args), args.auth, args.list_cache_max,
+                          args.clock_override, args.coalesce == "on", args.audit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FlowOps local API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--db", default=":memory:", help="SQLite file (default: in memory)")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, args.host, args.port, args.db)
+    # Runs the finally below on `kill` too, so queued activity rows are written before exit
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"FlowOps local API listening on {server.base_url} "
+          f"(latency {args.latency_ms}±{args.jitter_ms} ms per round trip, {args.auth} auth)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        server.api.close()
+
+
+if __name__ == "__main__":
+    main()
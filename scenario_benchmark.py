@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+FlowOps Scenario Benchmarks
+Runs named end-to-end scenarios through FlowOpsAPITester's request flow, each against a
+freshly started local stand-in (or one --base-url server for all of them):
+
+    cold_login          log in and make the first authenticated call with a new token
+    list_10k_tasks      page through a 10k-task workspace and re-read its first page
+    dashboard_1m        dashboard stats (default and custom range) over 1M time entries
+    timer_churn         start/stop timers back to back, checking the active timer between
+    bulk_import         import tasks and time entries through the bulk endpoints
+
+Only each scenario's measured phase is recorded (seeding is not). Per-route p95 latency
+and mean response size are stored as <baselines-dir>/<commit>.json; the run is then
+compared with the newest stored ancestor commit (or --baseline) and exits non-zero, with
+a readable diff, when a route's p95 or payload grew past the thresholds.
+
+    python scenario_benchmark.py
+    python scenario_benchmark.py --scenario timer_churn --scenario bulk_import --scale 0.1
+    python scenario_benchmark.py --baseline 9e6f243 --p95-threshold 0.5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import backend_test
+from backend_test import BULK_CHUNK, FlowOpsAPITester, RequestMetrics, start_local_target, succeeded
+from local_api_server import add_server_arguments
+
+BASELINES_DIR = os.path.join(backend_test.RESULTS_DIR, "baselines")
+P95_THRESHOLD = 0.25  # flag a route whose p95 grew by more than 25%...
+P95_FLOOR_MS = 5.0  # ...and by at least this much
+SIZE_THRESHOLD = 0.10  # flag a route whose mean payload grew by more than 10%...
+SIZE_FLOOR_BYTES = 64  # ...and by at least this much
+RUNS = 30  # repeats of single-request measurements
+SEED_WORKERS = 8
+
+# Full-size workloads; --scale multiplies them (with a floor) for quicker runs
+COLD_LOGINS = 50
+LIST_TASKS = 10_000
+DASHBOARD_ENTRIES = 1_000_000
+DASHBOARD_DAYS = 365
+TIMER_CYCLES = 100
+BULK_IMPORT_TASKS = 5_000
+BULK_IMPORT_ENTRIES = 5_000
+
+
+def log(message):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
+
+
+def scaled(count, scale, floor=1):
+    return max(floor, int(count * scale))
+
+
+def new_user(label):
+    """A signed-up tester with one project; its requests go to a throwaway metrics object"""
+    tester = FlowOpsAPITester(email=f"bench_{label}_{uuid.uuid4().hex[:8]}@flowops.com", verbose=False)
+    if not (tester.test_1_signup() and tester.test_3_create_project()):
+        raise RuntimeError(f"{label}: could not create the benchmark user")
+    tester.project_ids = [tester.project_id]
+    return tester
+
+
+def bulk_post(tester, endpoint, key, items):
+    """POST items in BULK_CHUNK batches from SEED_WORKERS threads; returns the created ids"""
+    def post(start):
+        response = tester.make_request("POST", endpoint, {key: items[start:start + BULK_CHUNK]})
+        if not succeeded(response) or response.json()["errors"]:
+            raise RuntimeError(f"POST {endpoint} failed while seeding")
+        return [created["id"] for created in response.json()["created"]]
+
+    with ThreadPoolExecutor(max_workers=SEED_WORKERS) as pool:
+        return [row_id for chunk in pool.map(post, range(0, len(items), BULK_CHUNK)) for row_id in chunk]
+
+
+def entries_for(task_ids, count, days):
+    """count finished 30-minute entries spread over the last `days` days"""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    entries = []
+    for index in range(count):
+        start = today - timedelta(days=index % days, minutes=(index // days) % 1380)
+        entries.append({"task_id": task_ids[index % len(task_ids)], "start_time": start.isoformat(),
+                        "end_time": (start + timedelta(minutes=30)).isoformat(), "billable": index % 3 == 0})
+    return entries
+
+
+def cold_login(metrics, scale):
+    users = [FlowOpsAPITester(email=f"bench_login_{uuid.uuid4().hex[:8]}@flowops.com", verbose=False)
+             for _ in range(scaled(COLD_LOGINS, scale, floor=5))]
+    for user in users:
+        if not user.test_1_signup():
+            raise RuntimeError("cold_login: signup failed")
+    for user in users:
+        user.metrics = metrics
+        if not user.test_2_login() or not succeeded(user.make_request("GET", "projects")):
+            raise RuntimeError("cold_login: login or first request failed")
+
+
+def list_10k_tasks(metrics, scale):
+    tester = new_user("list")
+    if not tester.seed_tasks(scaled(LIST_TASKS, scale, floor=BULK_CHUNK), workers=SEED_WORKERS):
+        raise RuntimeError("list_10k_tasks: seeding failed")
+    tester.metrics = metrics
+    tasks, _ = tester.paginate_tasks()
+    if tasks is None:
+        raise RuntimeError("list_10k_tasks: paging failed")
+    for _ in range(RUNS):
+        tester.make_request("GET", "tasks")
+
+
+def dashboard_1m(metrics, scale):
+    tester = new_user("dashboard")
+    task_ids = list(tester.seed_tasks(20, workers=1))
+    entries = entries_for(task_ids, scaled(DASHBOARD_ENTRIES, scale, floor=BULK_CHUNK), DASHBOARD_DAYS)
+    bulk_post(tester, "time-entries/bulk", "entries", entries)
+    today = datetime.now(timezone.utc).date()
+    tester.metrics = metrics
+    for _ in range(RUNS):
+        tester.make_request("GET", "dashboard/stats")
+        tester.make_request("GET", f"dashboard/stats?from={today - timedelta(days=90)}&to={today}")
+
+
+def timer_churn(metrics, scale):
+    tester = new_user("timer")
+    if not tester.test_5_create_task():
+        raise RuntimeError("timer_churn: could not create a task")
+    tester.metrics = metrics
+    for _ in range(scaled(TIMER_CYCLES, scale, floor=10)):
+        if not (tester.test_8_start_timer() and tester.test_9_get_active_timer() and tester.test_10_stop_timer()):
+            raise RuntimeError("timer_churn: a start/stop cycle failed")
+
+
+def bulk_import(metrics, scale):
+    tester = new_user("bulk")
+    tester.metrics = metrics
+    tasks = [{"title": f"Imported task {i}", "project_id": tester.project_id, "priority": "medium"}
+             for i in range(scaled(BULK_IMPORT_TASKS, scale, floor=4 * BULK_CHUNK))]
+    task_ids = bulk_post(tester, "tasks/bulk", "tasks", tasks)
+    bulk_post(tester, "time-entries/bulk", "entries",
+              entries_for(task_ids, scaled(BULK_IMPORT_ENTRIES, scale, floor=4 * BULK_CHUNK), 30))
+
+
+SCENARIOS = {
+    "cold_login": cold_login,
+    "list_10k_tasks": list_10k_tasks,
+    "dashboard_1m": dashboard_1m,
+    "timer_churn": timer_churn,
+    "bulk_import": bulk_import
+}
+
+
+def git_commit():
+    """(short sha, dirty) of the working tree, or ("unknown", True) outside git"""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", True
+
+
+def find_baseline(baselines_dir, commit):
+    """The newest clean stored run of an ancestor of HEAD, skipping HEAD itself"""
+    try:
+        history = subprocess.run(["git", "rev-list", "--abbrev-commit", "--max-count=500", "HEAD"],
+                                 capture_output=True, text=True, check=True).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    for sha in history:
+        path = os.path.join(baselines_dir, f"{sha}.json")
+        if sha != commit and os.path.exists(path):
+            return path
+    return None
+
+
+def compare(baseline, current, p95_threshold, size_threshold):
+    """Per-route rows of both runs side by side; returns (rows, regressions)"""
+    rows, regressions = [], []
+    for name, scenario in current["scenarios"].items():
+        before = {(r["method"], r["route"]): r for r in baseline["scenarios"].get(name, {}).get("routes", [])}
+        for route in scenario["routes"]:
+            old = before.get((route["method"], route["route"]))
+            if not old:
+                continue
+            key = f"{name}  {route['method']} {route['route']}"
+            row = {"key": key, "old_p95": old["wall_p95_ms"], "new_p95": route["wall_p95_ms"],
+                   "old_bytes": old["bytes_mean"], "new_bytes": route["bytes_mean"]}
+            rows.append(row)
+            if route["wall_p95_ms"] > old["wall_p95_ms"] * (1 + p95_threshold) and \
+                    route["wall_p95_ms"] - old["wall_p95_ms"] >= P95_FLOOR_MS:
+                regressions.append(f"{key}: p95 {old['wall_p95_ms']:.1f} ms → {route['wall_p95_ms']:.1f} ms "
+                                   f"({change(old['wall_p95_ms'], route['wall_p95_ms'])})")
+            if route["bytes_mean"] > old["bytes_mean"] * (1 + size_threshold) and \
+                    route["bytes_mean"] - old["bytes_mean"] >= SIZE_FLOOR_BYTES:
+                regressions.append(f"{key}: payload {old['bytes_mean']:.0f} B → {route['bytes_mean']:.0f} B "
+                                   f"({change(old['bytes_mean'], route['bytes_mean'])})")
+            if route["errors"] > old["errors"]:
+                regressions.append(f"{key}: {route['errors']} errors (baseline {old['errors']})")
+    return rows, regressions
+
+
+def change(old, new):
+    return f"{(new - old) / old * 100:+.0f}%" if old else "new"
+
+
+def print_comparison(rows, baseline_commit):
+    print(f"\n{'='*50}")
+    print(f"⚖️  baseline {baseline_commit} → this run")
+    print(f"{'='*50}")
+    print(f"{'scenario / route':<48}{'p95 before':>12}{'p95 after':>11}{'Δp95':>7}{'bytes before':>14}{'bytes after':>13}")
+    for row in rows:
+        print(f"{row['key']:<48}{row['old_p95']:>12.1f}{row['new_p95']:>11.1f}{change(row['old_p95'], row['new_p95']):>7}"
+              f"{row['old_bytes']:>14.0f}{row['new_bytes']:>13.0f}")
+
+
+def run_scenarios(args, names):
+    results = {}
+    for name in names:
+        server = start_local_target(args, clock_override=True) if args.target == "local" else None
+        metrics = RequestMetrics()
+        log(f"▶️  {name}")
+        started = time.perf_counter()
+        try:
+            SCENARIOS[name](metrics, args.scale)
+        finally:
+            if server:
+                server.stop()
+        elapsed = time.perf_counter() - started
+        routes = [{key: row[key] for key in ("method", "route", "count", "errors", "wall_p50_ms", "wall_p95_ms",
+                                             "bytes_mean", "bytes_max")} for row in metrics.summary()]
+        results[name] = {"elapsed_s": round(elapsed, 1), "routes": routes}
+        for row in routes:
+            log(f"   {row['method']} {row['route']:<24} n={row['count']:<6} p95={row['wall_p95_ms']:>8.1f} ms  "
+                f"{row['bytes_mean']:>10.0f} B")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="FlowOps scenario benchmarks with per-commit baselines")
+    parser.add_argument("--target", choices=["local", "remote"], default="local",
+                        help="local: a fresh stand-in per scenario; remote: --base-url")
+    parser.add_argument("--base-url", default=backend_test.REMOTE_BASE_URL,
+                        help="remote target: API base URL, e.g. http://localhost:3000/api")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run (repeatable; default all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every workload size by this")
+    parser.add_argument("--baselines-dir", default=BASELINES_DIR, help="where per-commit results are stored")
+    parser.add_argument("--baseline", help="commit to compare against (default: newest stored ancestor)")
+    parser.add_argument("--p95-threshold", type=float, default=P95_THRESHOLD,
+                        help="allowed relative p95 growth per route")
+    parser.add_argument("--size-threshold", type=float, default=SIZE_THRESHOLD,
+                        help="allowed relative growth of mean response size per route")
+    parser.add_argument("--no-save", action="store_true", help="compare only; do not store this run")
+    add_server_arguments(parser.add_argument_group("local target latency model"))
+    parser.set_defaults(seed=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    backend_test.BASE_URL = args.base_url
+    names = args.scenario or list(SCENARIOS)
+    commit, dirty = git_commit()
+    log(f"🚀 Scenario benchmarks at {commit}{' (uncommitted changes)' if dirty else ''}: {', '.join(names)}")
+
+    current = {
+        "commit": commit,
+        "dirty": dirty,
+        "generated_at": datetime.now().isoformat(),
+        "settings": {"target": args.target, "scale": args.scale, "latency_ms": args.latency_ms,
+                     "jitter_ms": args.jitter_ms, "per_row_ms": args.per_row_ms, "auth": args.auth},
+        "scenarios": run_scenarios(args, names)
+    }
+
+    if not args.no_save:
+        os.makedirs(args.baselines_dir, exist_ok=True)
+        # Only clean trees become baselines; a dirty run is kept next to them for reference
+        path = os.path.join(args.baselines_dir, f"{commit}{'-dirty' if dirty else ''}.json")
+        with open(path, "w") as f:
+            json.dump(current, f, indent=2)
+        log(f"📁 Results written to {path}")
+
+    if args.baseline:
+        baseline_path = os.path.join(args.baselines_dir, f"{args.baseline}.json")
+        if not os.path.exists(baseline_path):
+            raise SystemExit(f"No stored results for {args.baseline} in {args.baselines_dir}")
+    else:
+        baseline_path = find_baseline(args.baselines_dir, None if dirty else commit)
+    if not baseline_path:
+        log("ℹ️  No baseline to compare with yet")
+        return
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline["settings"] != current["settings"]:
+        log(f"⚠️  Baseline settings differ: {baseline['settings']}")
+
+    rows, regressions = compare(baseline, current, args.p95_threshold, args.size_threshold)
+    print_comparison(rows, baseline["commit"])
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {baseline['commit']}:")
+        for regression in regressions:
+            print(f"   {regression}")
+        raise SystemExit(1)
+    print(f"\n✅ No route regressed past p95 +{args.p95_threshold:.0%} or payload +{args.size_threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -316,6 +316,1049 @@ CREATE INDEX IF NOT EXISTS idx_messages_channel_id ON messages(channel_id);
 CREATE INDEX IF NOT EXISTS idx_workspace_members_user_id ON workspace_members(user_id);
 CREATE INDEX IF NOT EXISTS idx_workspace_members_workspace_id ON workspace_members(workspace_id);
 
+-- Dashboard time rollups (per-user, per-day minutes kept up to date by trigger)
+-- Daily rollup (days are UTC calendar days of start_time)
+CREATE TABLE IF NOT EXISTS time_rollups_daily (
+  user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+  day DATE NOT NULL,
+  minutes BIGINT NOT NULL DEFAULT 0,
+  billable_minutes BIGINT NOT NULL DEFAULT 0,
+  entries INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, day)
+);
+
+ALTER TABLE time_rollups_daily ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their time rollups" ON time_rollups_daily
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Keep the rollup in step with time_entries. Only finished entries (duration set) count,
+-- so stopping a timer is what adds the minutes.
+CREATE OR REPLACE FUNCTION apply_time_rollup()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.duration IS NOT NULL THEN
+    UPDATE time_rollups_daily
+    SET minutes = minutes - OLD.duration,
+        billable_minutes = billable_minutes - CASE WHEN OLD.billable THEN OLD.duration ELSE 0 END,
+        entries = entries - 1
+    WHERE user_id = OLD.user_id
+      AND day = (OLD.start_time AT TIME ZONE 'UTC')::date;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.duration IS NOT NULL THEN
+    INSERT INTO time_rollups_daily (user_id, day, minutes, billable_minutes, entries)
+    VALUES (
+      NEW.user_id,
+      (NEW.start_time AT TIME ZONE 'UTC')::date,
+      NEW.duration,
+      CASE WHEN NEW.billable THEN NEW.duration ELSE 0 END,
+      1
+    )
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET minutes = time_rollups_daily.minutes + EXCLUDED.minutes,
+        billable_minutes = time_rollups_daily.billable_minutes + EXCLUDED.billable_minutes,
+        entries = time_rollups_daily.entries + 1;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS time_entries_rollup ON time_entries;
+CREATE TRIGGER time_entries_rollup
+  AFTER INSERT OR DELETE OR UPDATE OF duration, start_time, user_id, billable ON time_entries
+  FOR EACH ROW EXECUTE FUNCTION apply_time_rollup();
+
+-- Backfill from entries that existed before the trigger
+INSERT INTO time_rollups_daily (user_id, day, minutes, billable_minutes, entries)
+SELECT
+  user_id,
+  (start_time AT TIME ZONE 'UTC')::date,
+  SUM(duration),
+  SUM(CASE WHEN billable THEN duration ELSE 0 END),
+  COUNT(*)
+FROM time_entries
+WHERE duration IS NOT NULL
+GROUP BY user_id, (start_time AT TIME ZONE 'UTC')::date
+ON CONFLICT (user_id, day) DO NOTHING;
+
+-- Whole dashboard in one call. Task counts are aggregated in the database (visible tasks
+-- under RLS); time totals read at most ~30 rollup rows per user regardless of entry count.
+-- week and month are rolling windows ending today: the last 7 and 30 days, today included.
+-- p_from/p_to add a custom day range to timeStats.range.
+CREATE OR REPLACE FUNCTION dashboard_stats(
+  p_user_id UUID,
+  p_today DATE DEFAULT (NOW() AT TIME ZONE 'UTC')::date,
+  p_from DATE DEFAULT NULL,
+  p_to DATE DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'taskStats', (
+      SELECT json_build_object(
+        'total', COUNT(*),
+        'todo', COUNT(*) FILTER (WHERE status = 'todo'),
+        'in_progress', COUNT(*) FILTER (WHERE status = 'in_progress'),
+        'completed', COUNT(*) FILTER (WHERE status = 'completed')
+      )
+      FROM tasks
+    ),
+    'timeStats', (
+      SELECT json_build_object(
+        'today', COALESCE(SUM(minutes) FILTER (WHERE day = p_today), 0),
+        'week', COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_today - 6 AND p_today), 0),
+        'month', COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_today - 29 AND p_today), 0),
+        'range', CASE WHEN p_from IS NULL THEN NULL
+                      ELSE COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_from AND COALESCE(p_to, p_today)), 0)
+                 END
+      )
+      FROM time_rollups_daily
+      WHERE user_id = p_user_id
+        AND day >= LEAST(p_today - 29, COALESCE(p_from, p_today - 29))
+        AND day <= GREATEST(p_today, COALESCE(p_to, p_today))
+    )
+  );
+$$;
+
+-- Task list pagination (keyset indexes + DB-computed total_time)
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at_id ON tasks(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_created_at_id ON tasks(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_created_at_id ON tasks(project_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_created_at_id ON tasks(assignee_id, created_at DESC, id DESC);
+
+-- security_invoker keeps the RLS policies of tasks and time_entries in force, so
+-- total_time is the caller's visible time on the task, as it was when summed in JS
+CREATE OR REPLACE VIEW task_list WITH (security_invoker = true) AS
+SELECT
+  t.*,
+  COALESCE((SELECT SUM(te.duration) FROM time_entries te WHERE te.task_id = t.id), 0)::INTEGER AS total_time
+FROM tasks t;
+
+-- Bulk writes (one call per batch, per-item errors)
+CREATE OR REPLACE FUNCTION bulk_insert_tasks(p_tasks JSONB, p_created_by UUID)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_created JSONB;
+  v_errors JSONB := '[]'::jsonb;
+  v_item JSONB;
+  v_index BIGINT;
+  v_id UUID;
+BEGIN
+  BEGIN
+    WITH rows AS (
+      SELECT ord - 1 AS idx, uuid_generate_v4() AS id, item
+      FROM jsonb_array_elements(p_tasks) WITH ORDINALITY AS e(item, ord)
+    ), inserted AS (
+      INSERT INTO tasks (id, project_id, title, description, assignee_id, created_by, status, priority, due_date)
+      SELECT
+        id,
+        (item->>'project_id')::uuid,
+        item->>'title',
+        item->>'description',
+        (item->>'assignee_id')::uuid,
+        p_created_by,
+        COALESCE(item->>'status', 'todo'),
+        COALESCE(item->>'priority', 'medium'),
+        (item->>'due_date')::timestamptz
+      FROM rows
+      RETURNING id
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object('index', idx, 'id', id) ORDER BY idx), '[]'::jsonb)
+    INTO v_created
+    FROM rows
+    WHERE id IN (SELECT id FROM inserted);
+
+    RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+  EXCEPTION WHEN OTHERS THEN
+    v_created := '[]'::jsonb;
+  END;
+
+  FOR v_item, v_index IN SELECT item, ord - 1 FROM jsonb_array_elements(p_tasks) WITH ORDINALITY AS e(item, ord) LOOP
+    BEGIN
+      INSERT INTO tasks (project_id, title, description, assignee_id, created_by, status, priority, due_date)
+      VALUES (
+        (v_item->>'project_id')::uuid,
+        v_item->>'title',
+        v_item->>'description',
+        (v_item->>'assignee_id')::uuid,
+        p_created_by,
+        COALESCE(v_item->>'status', 'todo'),
+        COALESCE(v_item->>'priority', 'medium'),
+        (v_item->>'due_date')::timestamptz
+      )
+      RETURNING id INTO v_id;
+      v_created := v_created || jsonb_build_object('index', v_index, 'id', v_id);
+    EXCEPTION WHEN OTHERS THEN
+      v_errors := v_errors || jsonb_build_object('index', v_index, 'error', SQLERRM);
+    END;
+  END LOOP;
+
+  RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+END;
+$$;
+
+-- Items are {id, ...fields}; only the fields present in an item are changed
+CREATE OR REPLACE FUNCTION bulk_update_tasks(p_updates JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_updated JSONB := '[]'::jsonb;
+  v_errors JSONB := '[]'::jsonb;
+  v_item JSONB;
+  v_index BIGINT;
+  v_id UUID;
+BEGIN
+  FOR v_item, v_index IN SELECT item, ord - 1 FROM jsonb_array_elements(p_updates) WITH ORDINALITY AS e(item, ord) LOOP
+    BEGIN
+      UPDATE tasks SET
+        project_id = CASE WHEN v_item ? 'project_id' THEN (v_item->>'project_id')::uuid ELSE project_id END,
+        title = CASE WHEN v_item ? 'title' THEN v_item->>'title' ELSE title END,
+        description = CASE WHEN v_item ? 'description' THEN v_item->>'description' ELSE description END,
+        assignee_id = CASE WHEN v_item ? 'assignee_id' THEN (v_item->>'assignee_id')::uuid ELSE assignee_id END,
+        status = CASE WHEN v_item ? 'status' THEN v_item->>'status' ELSE status END,
+        priority = CASE WHEN v_item ? 'priority' THEN v_item->>'priority' ELSE priority END,
+        due_date = CASE WHEN v_item ? 'due_date' THEN (v_item->>'due_date')::timestamptz ELSE due_date END,
+        updated_at = NOW()
+      WHERE id = (v_item->>'id')::uuid
+      RETURNING id INTO v_id;
+
+      IF v_id IS NULL THEN
+        v_errors := v_errors || jsonb_build_object('index', v_index, 'error', 'Task not found');
+      ELSE
+        v_updated := v_updated || jsonb_build_object('index', v_index, 'id', v_id);
+      END IF;
+    EXCEPTION WHEN OTHERS THEN
+      v_errors := v_errors || jsonb_build_object('index', v_index, 'error', SQLERRM);
+    END;
+  END LOOP;
+
+  RETURN jsonb_build_object('updated', v_updated, 'errors', v_errors);
+END;
+$$;
+
+-- Finished (historical) entries only; duration is computed from start/end like stopTimer
+CREATE OR REPLACE FUNCTION bulk_insert_time_entries(p_entries JSONB, p_user_id UUID)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_created JSONB;
+  v_errors JSONB := '[]'::jsonb;
+  v_item JSONB;
+  v_index BIGINT;
+  v_id UUID;
+BEGIN
+  BEGIN
+    WITH rows AS (
+      SELECT ord - 1 AS idx, uuid_generate_v4() AS id, item
+      FROM jsonb_array_elements(p_entries) WITH ORDINALITY AS e(item, ord)
+    ), inserted AS (
+      INSERT INTO time_entries (id, task_id, user_id, start_time, end_time, duration, description, billable)
+      SELECT
+        id,
+        (item->>'task_id')::uuid,
+        p_user_id,
+        (item->>'start_time')::timestamptz,
+        (item->>'end_time')::timestamptz,
+        FLOOR(EXTRACT(EPOCH FROM (item->>'end_time')::timestamptz - (item->>'start_time')::timestamptz) / 60)::integer,
+        COALESCE(item->>'description', ''),
+        COALESCE((item->>'billable')::boolean, FALSE)
+      FROM rows
+      RETURNING id
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object('index', idx, 'id', id) ORDER BY idx), '[]'::jsonb)
+    INTO v_created
+    FROM rows
+    WHERE id IN (SELECT id FROM inserted);
+
+    RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+  EXCEPTION WHEN OTHERS THEN
+    v_created := '[]'::jsonb;
+  END;
+
+  FOR v_item, v_index IN SELECT item, ord - 1 FROM jsonb_array_elements(p_entries) WITH ORDINALITY AS e(item, ord) LOOP
+    BEGIN
+      INSERT INTO time_entries (task_id, user_id, start_time, end_time, duration, description, billable)
+      VALUES (
+        (v_item->>'task_id')::uuid,
+        p_user_id,
+        (v_item->>'start_time')::timestamptz,
+        (v_item->>'end_time')::timestamptz,
+        FLOOR(EXTRACT(EPOCH FROM (v_item->>'end_time')::timestamptz - (v_item->>'start_time')::timestamptz) / 60)::integer,
+        COALESCE(v_item->>'description', ''),
+        COALESCE((v_item->>'billable')::boolean, FALSE)
+      )
+      RETURNING id INTO v_id;
+      v_created := v_created || jsonb_build_object('index', v_index, 'id', v_id);
+    EXCEPTION WHEN OTHERS THEN
+      v_errors := v_errors || jsonb_build_object('index', v_index, 'error', SQLERRM);
+    END;
+  END LOOP;
+
+  RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+END;
+$$;
+
+-- Atomic timers (one running timer per user, duration computed in the database)
+-- Close any duplicate running timers left by the old check-then-insert race, keeping
+-- each user's most recent one open. Older ones end when the newest one started.
+WITH running AS (
+  SELECT id, start_time,
+         MAX(start_time) OVER (PARTITION BY user_id) AS latest_start,
+         ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY start_time DESC, id DESC) AS rank
+  FROM time_entries
+  WHERE end_time IS NULL
+)
+UPDATE time_entries te
+SET end_time = running.latest_start,
+    duration = FLOOR(EXTRACT(EPOCH FROM running.latest_start - running.start_time) / 60)::integer
+FROM running
+WHERE te.id = running.id
+  AND running.rank > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_time_entries_running_per_user
+  ON time_entries(user_id) WHERE end_time IS NULL;
+
+-- Timers start on the database clock
+ALTER TABLE time_entries ALTER COLUMN start_time SET DEFAULT NOW();
+
+-- Stop the caller's running timer; returns the entry with its task and user embedded,
+-- or NULL when p_entry_id is not a running timer of p_user_id
+CREATE OR REPLACE FUNCTION stop_timer(p_entry_id UUID, p_user_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+AS $$
+  WITH stopped AS (
+    UPDATE time_entries
+    SET end_time = NOW(),
+        duration = FLOOR(EXTRACT(EPOCH FROM NOW() - start_time) / 60)::integer
+    WHERE id = p_entry_id
+      AND user_id = p_user_id
+      AND end_time IS NULL
+    RETURNING *
+  )
+  SELECT to_jsonb(s) || jsonb_build_object(
+    'task', (SELECT jsonb_build_object('id', t.id, 'title', t.title) FROM tasks t WHERE t.id = s.task_id),
+    'user', (SELECT jsonb_build_object('id', u.id, 'name', u.name, 'email', u.email) FROM users u WHERE u.id = s.user_id)
+  )
+  FROM stopped s;
+$$;
+
+-- Time entry export (keyset chunks over (start_time, id))
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_start_id ON time_entries(user_id, start_time, id);
+
+-- Delta sync (change log behind GET /sync)
+CREATE TABLE IF NOT EXISTS sync_changes (
+  seq BIGSERIAL PRIMARY KEY,
+  entity TEXT NOT NULL CHECK (entity IN ('tasks', 'projects', 'time_entries', 'messages', 'docs')),
+  entity_id UUID NOT NULL,
+  workspace_id UUID,
+  user_id UUID,
+  changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_changes_workspace_seq ON sync_changes(workspace_id, seq) WHERE workspace_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_sync_changes_user_seq ON sync_changes(user_id, seq) WHERE user_id IS NOT NULL;
+
+ALTER TABLE sync_changes ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their sync changes" ON sync_changes
+  FOR SELECT USING (
+    auth.uid() = user_id OR
+    EXISTS (SELECT 1 FROM workspace_members WHERE workspace_id = sync_changes.workspace_id AND user_id = auth.uid())
+  );
+
+-- Who can see a row: tasks follow their project's workspace (project-less tasks sync to
+-- their creator), time entries their owner, messages their channel's workspace
+CREATE OR REPLACE FUNCTION sync_scope(p_entity TEXT, p_row JSONB, OUT workspace_id UUID, OUT user_id UUID)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  CASE p_entity
+    WHEN 'tasks' THEN
+      SELECT p.workspace_id INTO workspace_id FROM projects p WHERE p.id = (p_row->>'project_id')::uuid;
+      user_id := (p_row->>'created_by')::uuid;
+    WHEN 'projects' THEN
+      workspace_id := (p_row->>'workspace_id')::uuid;
+    WHEN 'time_entries' THEN
+      user_id := (p_row->>'user_id')::uuid;
+    WHEN 'messages' THEN
+      SELECT c.workspace_id INTO workspace_id FROM channels c WHERE c.id = (p_row->>'channel_id')::uuid;
+    WHEN 'docs' THEN
+      workspace_id := (p_row->>'workspace_id')::uuid;
+      user_id := (p_row->>'created_by')::uuid;
+  END CASE;
+END;
+$$;
+
+-- Logs the new scope, and the old one too when an update moved the row, so readers who
+-- lost sight of it learn it is gone
+CREATE OR REPLACE FUNCTION log_sync_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_new RECORD;
+  v_old RECORD;
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    SELECT * INTO v_new FROM sync_scope(TG_TABLE_NAME, to_jsonb(NEW));
+    INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+    VALUES (TG_TABLE_NAME, NEW.id, v_new.workspace_id, v_new.user_id);
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    SELECT * INTO v_old FROM sync_scope(TG_TABLE_NAME, to_jsonb(OLD));
+    IF TG_OP = 'DELETE' THEN
+      INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+      VALUES (TG_TABLE_NAME, OLD.id, v_old.workspace_id, v_old.user_id);
+    ELSIF (v_old.workspace_id, v_old.user_id) IS DISTINCT FROM (v_new.workspace_id, v_new.user_id) THEN
+      INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+      VALUES (TG_TABLE_NAME, OLD.id, v_old.workspace_id, v_old.user_id);
+    END IF;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tasks_sync_log ON tasks;
+CREATE TRIGGER tasks_sync_log AFTER INSERT OR UPDATE OR DELETE ON tasks
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS projects_sync_log ON projects;
+CREATE TRIGGER projects_sync_log AFTER INSERT OR UPDATE OR DELETE ON projects
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS time_entries_sync_log ON time_entries;
+CREATE TRIGGER time_entries_sync_log AFTER INSERT OR UPDATE OR DELETE ON time_entries
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS messages_sync_log ON messages;
+CREATE TRIGGER messages_sync_log AFTER INSERT OR UPDATE OR DELETE ON messages
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS docs_sync_log ON docs;
+CREATE TRIGGER docs_sync_log AFTER INSERT OR UPDATE OR DELETE ON docs
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+
+-- Backfill: one entry per existing row, so a first sync from 0 returns everything
+INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+SELECT e.entity, e.id, s.workspace_id, s.user_id
+FROM (
+  SELECT 'projects' AS entity, id, to_jsonb(p) AS row FROM projects p
+  UNION ALL SELECT 'tasks', id, to_jsonb(t) FROM tasks t
+  UNION ALL SELECT 'time_entries', id, to_jsonb(te) FROM time_entries te
+  UNION ALL SELECT 'messages', id, to_jsonb(m) FROM messages m
+  UNION ALL SELECT 'docs', id, to_jsonb(d) FROM docs d
+) e
+CROSS JOIN LATERAL sync_scope(e.entity, e.row) s;
+
+
+-- Retention: sync_changes only grows (every timer start and stop adds an entry), so
+-- entries older than 30 days are pruned. sync_log_state keeps the newest seq removed;
+-- sync_since answers cursors before it with reset (see below).
+CREATE TABLE IF NOT EXISTS sync_log_state (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  pruned_through BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO sync_log_state DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+ALTER TABLE sync_log_state ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can read the sync log state" ON sync_log_state
+  FOR SELECT USING (TRUE);
+
+CREATE INDEX IF NOT EXISTS idx_sync_changes_changed_at ON sync_changes(changed_at);
+
+-- Removes the entries older than 30 days, as one prefix of the log, and returns how many
+-- went. The API calls it at most hourly per instance (pruneSyncLog in route.js).
+CREATE OR REPLACE FUNCTION prune_sync_changes()
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_through BIGINT;
+  v_deleted BIGINT;
+BEGIN
+  SELECT MAX(seq) INTO v_through FROM sync_changes WHERE changed_at < NOW() - INTERVAL '30 days';
+  IF v_through IS NULL THEN
+    RETURN 0;
+  END IF;
+  -- Same transaction: no reader sees entries gone without the boundary that makes it reset
+  UPDATE sync_log_state SET pruned_through = GREATEST(pruned_through, v_through);
+  DELETE FROM sync_changes WHERE seq <= v_through;
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$;
+
+-- Latest position in the log: where a client that just did a full load starts syncing.
+-- Never before the pruned part, even when every entry there is gone or invisible (RLS).
+CREATE OR REPLACE FUNCTION sync_head()
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT GREATEST(COALESCE((SELECT MAX(seq) FROM sync_changes), 0), pruned_through) FROM sync_log_state;
+$$;
+
+-- Up to p_limit log entries after p_since, collapsed to current rows (with the same
+-- embeds the list routes return) and deletions. cursor is the last seq read; has_more
+-- means the limit was hit and the caller should ask again from cursor. A p_since from
+-- before the pruned part of the log gets reset: true and no rows instead: the caller
+-- must do a full load, then sync on from cursor (the head when the reset was answered).
+CREATE OR REPLACE FUNCTION sync_since(p_user_id UUID, p_since BIGINT DEFAULT 0, p_limit INTEGER DEFAULT 1000)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH state AS (
+    SELECT p_since < pruned_through AS reset FROM sync_log_state
+  ), batch AS (
+    SELECT seq, entity, entity_id
+    FROM sync_changes
+    WHERE seq > p_since
+      AND NOT (SELECT reset FROM state)
+      AND (user_id = p_user_id
+           OR workspace_id IN (SELECT workspace_id FROM workspace_members WHERE user_id = p_user_id))
+    ORDER BY seq
+    LIMIT p_limit
+  ), changed AS (
+    SELECT DISTINCT entity, entity_id FROM batch
+  ), tasks_out AS (
+    SELECT to_jsonb(t) || jsonb_build_object(
+      'project', (SELECT jsonb_build_object('id', p.id, 'name', p.name) FROM projects p WHERE p.id = t.project_id)
+    ) AS row, t.id
+    FROM task_list t
+    WHERE t.id IN (SELECT entity_id FROM changed WHERE entity = 'tasks')
+  ), projects_out AS (
+    SELECT to_jsonb(p) AS row, p.id
+    FROM projects p
+    WHERE p.id IN (SELECT entity_id FROM changed WHERE entity = 'projects')
+  ), entries_out AS (
+    SELECT to_jsonb(te) || jsonb_build_object(
+      'task', (SELECT jsonb_build_object('id', t.id, 'title', t.title) FROM tasks t WHERE t.id = te.task_id)
+    ) AS row, te.id
+    FROM time_entries te
+    WHERE te.id IN (SELECT entity_id FROM changed WHERE entity = 'time_entries')
+      AND te.user_id = p_user_id
+  ), messages_out AS (
+    SELECT to_jsonb(m) AS row, m.id
+    FROM messages m
+    WHERE m.id IN (SELECT entity_id FROM changed WHERE entity = 'messages')
+  ), docs_out AS (
+    SELECT to_jsonb(d) AS row, d.id
+    FROM docs d
+    WHERE d.id IN (SELECT entity_id FROM changed WHERE entity = 'docs')
+  ), present AS (
+    SELECT 'tasks' AS entity, id FROM tasks_out
+    UNION ALL SELECT 'projects', id FROM projects_out
+    UNION ALL SELECT 'time_entries', id FROM entries_out
+    UNION ALL SELECT 'messages', id FROM messages_out
+    UNION ALL SELECT 'docs', id FROM docs_out
+  )
+  SELECT jsonb_build_object(
+    'tasks', COALESCE((SELECT jsonb_agg(row) FROM tasks_out), '[]'::jsonb),
+    'projects', COALESCE((SELECT jsonb_agg(row) FROM projects_out), '[]'::jsonb),
+    'time_entries', COALESCE((SELECT jsonb_agg(row) FROM entries_out), '[]'::jsonb),
+    'messages', COALESCE((SELECT jsonb_agg(row) FROM messages_out), '[]'::jsonb),
+    'docs', COALESCE((SELECT jsonb_agg(row) FROM docs_out), '[]'::jsonb),
+    'deleted', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('type', c.entity, 'id', c.entity_id))
+      FROM changed c
+      WHERE NOT EXISTS (SELECT 1 FROM present WHERE present.entity = c.entity AND present.id = c.entity_id)
+    ), '[]'::jsonb),
+    'cursor', CASE WHEN (SELECT reset FROM state) THEN sync_head()
+                   ELSE COALESCE((SELECT MAX(seq) FROM batch), p_since) END,
+    'has_more', (SELECT COUNT(*) FROM batch) = p_limit,
+    'reset', (SELECT reset FROM state)
+  );
+$$;
+
+-- Denormalized workspace_id (tasks, subtasks and messages; RLS without per-row joins)
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS workspace_id UUID REFERENCES workspaces(id) ON DELETE SET NULL;
+ALTER TABLE subtasks ADD COLUMN IF NOT EXISTS workspace_id UUID REFERENCES workspaces(id) ON DELETE SET NULL;
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS workspace_id UUID REFERENCES workspaces(id) ON DELETE SET NULL;
+
+UPDATE tasks t
+SET workspace_id = p.workspace_id
+FROM projects p
+WHERE p.id = t.project_id AND t.workspace_id IS DISTINCT FROM p.workspace_id;
+
+UPDATE subtasks s
+SET workspace_id = t.workspace_id
+FROM tasks t
+WHERE t.id = s.task_id AND s.workspace_id IS DISTINCT FROM t.workspace_id;
+
+UPDATE messages m
+SET workspace_id = c.workspace_id
+FROM channels c
+WHERE c.id = m.channel_id AND m.workspace_id IS DISTINCT FROM c.workspace_id;
+
+-- workspace_id is always derived from the parent row; a value sent by a client is ignored
+CREATE OR REPLACE FUNCTION set_task_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  NEW.workspace_id := (SELECT workspace_id FROM projects WHERE id = NEW.project_id);
+  RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION set_subtask_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  NEW.workspace_id := (SELECT workspace_id FROM tasks WHERE id = NEW.task_id);
+  RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION set_message_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  NEW.workspace_id := (SELECT workspace_id FROM channels WHERE id = NEW.channel_id);
+  RETURN NEW;
+END;
+$$;
+
+-- A parent moving to another workspace takes its children along (projects -> tasks ->
+-- subtasks, channels -> messages); the child's BEFORE trigger re-reads the parent.
+-- Column lists on UPDATE OF only see columns named in the SET clause, so the tasks
+-- trigger also listens on project_id, which changes workspace_id via set_task_workspace()
+CREATE OR REPLACE FUNCTION propagate_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.workspace_id IS DISTINCT FROM OLD.workspace_id THEN
+    CASE TG_TABLE_NAME
+      WHEN 'projects' THEN
+        UPDATE tasks SET workspace_id = NEW.workspace_id WHERE project_id = NEW.id;
+      WHEN 'tasks' THEN
+        UPDATE subtasks SET workspace_id = NEW.workspace_id WHERE task_id = NEW.id;
+      WHEN 'channels' THEN
+        UPDATE messages SET workspace_id = NEW.workspace_id WHERE channel_id = NEW.id;
+    END CASE;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tasks_set_workspace ON tasks;
+CREATE TRIGGER tasks_set_workspace BEFORE INSERT OR UPDATE OF project_id, workspace_id ON tasks
+  FOR EACH ROW EXECUTE FUNCTION set_task_workspace();
+DROP TRIGGER IF EXISTS subtasks_set_workspace ON subtasks;
+CREATE TRIGGER subtasks_set_workspace BEFORE INSERT OR UPDATE OF task_id, workspace_id ON subtasks
+  FOR EACH ROW EXECUTE FUNCTION set_subtask_workspace();
+DROP TRIGGER IF EXISTS messages_set_workspace ON messages;
+CREATE TRIGGER messages_set_workspace BEFORE INSERT OR UPDATE OF channel_id, workspace_id ON messages
+  FOR EACH ROW EXECUTE FUNCTION set_message_workspace();
+
+DROP TRIGGER IF EXISTS projects_propagate_workspace ON projects;
+CREATE TRIGGER projects_propagate_workspace AFTER UPDATE OF workspace_id ON projects
+  FOR EACH ROW EXECUTE FUNCTION propagate_workspace();
+DROP TRIGGER IF EXISTS tasks_propagate_workspace ON tasks;
+CREATE TRIGGER tasks_propagate_workspace AFTER UPDATE OF project_id, workspace_id ON tasks
+  FOR EACH ROW EXECUTE FUNCTION propagate_workspace();
+DROP TRIGGER IF EXISTS channels_propagate_workspace ON channels;
+CREATE TRIGGER channels_propagate_workspace AFTER UPDATE OF workspace_id ON channels
+  FOR EACH ROW EXECUTE FUNCTION propagate_workspace();
+
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_created_at_id ON tasks(workspace_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_subtasks_workspace_task ON subtasks(workspace_id, task_id);
+CREATE INDEX IF NOT EXISTS idx_messages_workspace_timestamp ON messages(workspace_id, timestamp DESC);
+-- Covers the membership lookup below with an index-only scan
+CREATE INDEX IF NOT EXISTS idx_workspace_members_user_workspace ON workspace_members(user_id, workspace_id);
+
+-- The caller's workspaces. SECURITY DEFINER reads workspace_members without going through
+-- its own (self-referencing) policy; policies call it as ARRAY(SELECT ...), an InitPlan
+-- that runs once per statement and can drive an index scan on workspace_id
+CREATE OR REPLACE FUNCTION user_workspace_ids()
+RETURNS SETOF UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT workspace_id FROM workspace_members WHERE user_id = auth.uid();
+$$;
+
+DROP POLICY IF EXISTS "Users can view workspace members" ON workspace_members;
+CREATE POLICY "Users can view workspace members" ON workspace_members
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids()))
+  );
+
+DROP POLICY IF EXISTS "Users can view workspace tasks" ON tasks;
+CREATE POLICY "Users can view workspace tasks" ON tasks
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids())) OR
+    tasks.project_id IS NULL
+  );
+
+DROP POLICY IF EXISTS "Users can view subtasks" ON subtasks;
+CREATE POLICY "Users can view subtasks" ON subtasks
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids())) OR
+    EXISTS (SELECT 1 FROM tasks WHERE tasks.id = subtasks.task_id AND tasks.project_id IS NULL)
+  );
+
+DROP POLICY IF EXISTS "Users can view channel messages" ON messages;
+CREATE POLICY "Users can view channel messages" ON messages
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids()))
+  );
+
+-- task_list was created with t.*, which Postgres expands when the view is created;
+-- recreate it so list rows include workspace_id
+DROP VIEW IF EXISTS task_list;
+CREATE VIEW task_list WITH (security_invoker = true) AS
+SELECT
+  t.*,
+  COALESCE((SELECT SUM(te.duration) FROM time_entries te WHERE te.task_id = t.id), 0)::INTEGER AS total_time
+FROM tasks t;
+
+-- Full-text search (GIN indexes behind GET /search)
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+CREATE OR REPLACE FUNCTION search_vector(p_title TEXT, p_body TEXT)
+RETURNS TSVECTOR
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT setweight(to_tsvector('english'::regconfig, COALESCE(p_title, '')), 'A') ||
+         setweight(to_tsvector('english'::regconfig, COALESCE(p_body, '')), 'B');
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_search ON tasks
+  USING GIN (workspace_id, search_vector(title, description));
+CREATE INDEX IF NOT EXISTS idx_docs_search ON docs
+  USING GIN (workspace_id, search_vector(title, content));
+CREATE INDEX IF NOT EXISTS idx_messages_search ON messages
+  USING GIN (workspace_id, search_vector(content, ''));
+
+-- One page of ranked matches for p_query (websearch syntax: words, "phrases", -exclusions,
+-- OR) in the caller's workspaces, or in p_workspace_id only. Tasks without a project count
+-- when the caller created or is assigned to them. Results are ordered by (rank, type, id)
+-- descending; pass the last row's values as p_after_* for the next page. Headlines are
+-- built only for the returned rows.
+CREATE OR REPLACE FUNCTION search_workspace(
+  p_user_id UUID,
+  p_query TEXT,
+  p_types TEXT[] DEFAULT ARRAY['tasks', 'docs', 'messages'],
+  p_workspace_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 20,
+  p_after_rank REAL DEFAULT NULL,
+  p_after_type TEXT DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('english', p_query) AS query,
+           ARRAY(
+             SELECT workspace_id FROM workspace_members
+             WHERE user_id = p_user_id AND (p_workspace_id IS NULL OR workspace_id = p_workspace_id)
+           ) AS workspace_ids
+  ), hits AS (
+    SELECT 'tasks'::text AS type, t.id, ts_rank_cd(search_vector(t.title, t.description), q.query) AS rank
+    FROM tasks t, q
+    WHERE 'tasks' = ANY (p_types)
+      AND search_vector(t.title, t.description) @@ q.query
+      AND (t.workspace_id = ANY (q.workspace_ids) OR
+           (p_workspace_id IS NULL AND t.project_id IS NULL AND p_user_id IN (t.created_by, t.assignee_id)))
+    UNION ALL
+    SELECT 'docs', d.id, ts_rank_cd(search_vector(d.title, d.content), q.query)
+    FROM docs d, q
+    WHERE 'docs' = ANY (p_types)
+      AND search_vector(d.title, d.content) @@ q.query
+      AND d.workspace_id = ANY (q.workspace_ids)
+    UNION ALL
+    SELECT 'messages', m.id, ts_rank_cd(search_vector(m.content, ''), q.query)
+    FROM messages m, q
+    WHERE 'messages' = ANY (p_types)
+      AND search_vector(m.content, '') @@ q.query
+      AND m.workspace_id = ANY (q.workspace_ids)
+  ), page AS (
+    SELECT * FROM hits
+    WHERE p_after_rank IS NULL OR (rank, type, id) < (p_after_rank, p_after_type, p_after_id)
+    ORDER BY rank DESC, type DESC, id DESC
+    LIMIT p_limit + 1
+  ), results AS (
+    SELECT page.type, page.id, page.rank, r.workspace_id, r.title, r.created_at,
+           ts_headline('english', r.body, q.query,
+                       'StartSel=<b>, StopSel=</b>, MaxWords=20, MinWords=8, MaxFragments=1') AS snippet
+    FROM page
+    CROSS JOIN q
+    CROSS JOIN LATERAL (
+      SELECT t.workspace_id, t.title, COALESCE(NULLIF(t.description, ''), t.title) AS body, t.created_at
+      FROM tasks t WHERE page.type = 'tasks' AND t.id = page.id
+      UNION ALL
+      SELECT d.workspace_id, d.title, COALESCE(NULLIF(d.content, ''), d.title), d.created_at
+      FROM docs d WHERE page.type = 'docs' AND d.id = page.id
+      UNION ALL
+      SELECT m.workspace_id, '#' || c.name, m.content, m.timestamp
+      FROM messages m LEFT JOIN channels c ON c.id = m.channel_id
+      WHERE page.type = 'messages' AND m.id = page.id
+    ) r
+  )
+  SELECT jsonb_build_object(
+    'results', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'type', type, 'id', id, 'workspace_id', workspace_id, 'title', title,
+        'snippet', snippet, 'rank', rank, 'created_at', created_at
+      ) ORDER BY rank DESC, type DESC, id DESC)
+      FROM (SELECT * FROM results ORDER BY rank DESC, type DESC, id DESC LIMIT p_limit) shown
+    ), '[]'::jsonb),
+    'has_more', (SELECT COUNT(*) FROM page) > p_limit
+  );
+$$;
+
+-- Chat history (keyset index on (channel_id, timestamp, id); member-only sends)
+
+CREATE INDEX IF NOT EXISTS idx_messages_channel_timestamp_id ON messages(channel_id, timestamp DESC, id DESC);
+DROP INDEX IF EXISTS idx_messages_channel_id;
+
+-- Senders must be members of the channel's workspace, not just themselves
+DROP POLICY IF EXISTS "Users can send messages" ON messages;
+CREATE POLICY "Users can send messages" ON messages
+  FOR INSERT WITH CHECK (
+    auth.uid() = sender_id AND
+    EXISTS (
+      SELECT 1 FROM channels c
+      WHERE c.id = messages.channel_id AND c.workspace_id = ANY (ARRAY(SELECT user_workspace_ids()))
+    )
+  );
+
+-- Timer test clock (optional p_now for stop_timer)
+
+DROP FUNCTION IF EXISTS stop_timer(UUID, UUID);
+CREATE OR REPLACE FUNCTION stop_timer(p_entry_id UUID, p_user_id UUID, p_now TIMESTAMPTZ DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+AS $$
+  WITH stopped AS (
+    UPDATE time_entries
+    SET end_time = COALESCE(p_now, NOW()),
+        duration = FLOOR(EXTRACT(EPOCH FROM COALESCE(p_now, NOW()) - start_time) / 60)::integer
+    WHERE id = p_entry_id
+      AND user_id = p_user_id
+      AND end_time IS NULL
+    RETURNING *
+  )
+  SELECT to_jsonb(s) || jsonb_build_object(
+    'task', (SELECT jsonb_build_object('id', t.id, 'title', t.title) FROM tasks t WHERE t.id = s.task_id),
+    'user', (SELECT jsonb_build_object('id', u.id, 'name', u.name, 'email', u.email) FROM users u WHERE u.id = s.user_id)
+  )
+  FROM stopped s;
+$$;
+
+-- Time reports (GET /reports/time)
+
+-- Rows are {key, label, minutes, billable_minutes, entries}: days and weeks in date order,
+-- other groups by minutes descending. Returns NULL unless auth.uid() is p_user_id and,
+-- with p_workspace_id, an owner or admin of that workspace. from/to are inclusive UTC days.
+CREATE OR REPLACE FUNCTION time_report(
+  p_user_id UUID,
+  p_group_by TEXT,
+  p_from DATE DEFAULT NULL,
+  p_to DATE DEFAULT NULL,
+  p_billable BOOLEAN DEFAULT NULL,
+  p_workspace_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH scope AS (
+    SELECT
+      -- SECURITY DEFINER bypasses RLS, so the caller must be p_user_id themselves
+      COALESCE(p_user_id = auth.uid(), FALSE) AND (
+        p_workspace_id IS NULL OR EXISTS (
+          SELECT 1 FROM workspace_members
+          WHERE workspace_id = p_workspace_id AND user_id = p_user_id AND role IN ('owner', 'admin')
+        )
+      ) AS allowed,
+      p_workspace_id IS NULL AND p_billable IS NULL AND p_group_by IN ('day', 'week') AS from_rollups,
+      COALESCE(p_from::timestamp AT TIME ZONE 'UTC', '-infinity') AS lower_bound,
+      COALESCE((p_to + 1)::timestamp AT TIME ZONE 'UTC', 'infinity') AS upper_bound
+  ), entries AS (
+    SELECT te.user_id, te.task_id, te.start_time, te.duration, te.billable
+    FROM time_entries te, scope
+    WHERE p_workspace_id IS NULL
+      AND NOT scope.from_rollups
+      AND te.user_id = p_user_id
+      AND te.start_time >= scope.lower_bound
+      AND te.start_time < scope.upper_bound
+      AND te.duration IS NOT NULL
+      AND (p_billable IS NULL OR te.billable = p_billable)
+    UNION ALL
+    SELECT te.user_id, te.task_id, te.start_time, te.duration, te.billable
+    FROM tasks t
+    JOIN time_entries te ON te.task_id = t.id
+    CROSS JOIN scope
+    WHERE t.workspace_id = p_workspace_id
+      AND scope.allowed
+      AND te.start_time >= scope.lower_bound
+      AND te.start_time < scope.upper_bound
+      AND te.duration IS NOT NULL
+      AND (p_billable IS NULL OR te.billable = p_billable)
+  ), buckets AS (
+    SELECT
+      CASE p_group_by
+        WHEN 'project' THEN t.project_id::text
+        WHEN 'user' THEN e.user_id::text
+        WHEN 'task' THEN e.task_id::text
+        WHEN 'day' THEN (e.start_time AT TIME ZONE 'UTC')::date::text
+        WHEN 'week' THEN date_trunc('week', e.start_time AT TIME ZONE 'UTC')::date::text
+      END AS key,
+      e.duration AS minutes,
+      CASE WHEN e.billable THEN e.duration ELSE 0 END AS billable_minutes,
+      1 AS entries
+    FROM entries e
+    LEFT JOIN tasks t ON p_group_by = 'project' AND t.id = e.task_id
+    UNION ALL
+    SELECT
+      CASE p_group_by WHEN 'day' THEN r.day::text ELSE date_trunc('week', r.day)::date::text END,
+      r.minutes,
+      r.billable_minutes,
+      r.entries
+    FROM time_rollups_daily r, scope
+    WHERE scope.from_rollups
+      AND r.user_id = p_user_id
+      AND r.day BETWEEN COALESCE(p_from, '-infinity') AND COALESCE(p_to, 'infinity')
+      AND r.entries > 0
+  ), grouped AS (
+    SELECT key, SUM(minutes) AS minutes, SUM(billable_minutes) AS billable_minutes, SUM(entries) AS entries
+    FROM buckets
+    GROUP BY key
+  ), labelled AS (
+    SELECT
+      g.*,
+      CASE p_group_by
+        WHEN 'project' THEN COALESCE(p.name, 'No project')
+        WHEN 'user' THEN COALESCE(u.name, u.email)
+        WHEN 'task' THEN tk.title
+        ELSE g.key
+      END AS label
+    FROM grouped g
+    LEFT JOIN projects p ON p_group_by = 'project' AND p.id::text = g.key
+    LEFT JOIN users u ON p_group_by = 'user' AND u.id::text = g.key
+    LEFT JOIN tasks tk ON p_group_by = 'task' AND tk.id::text = g.key
+  )
+  SELECT CASE WHEN NOT (SELECT allowed FROM scope) THEN NULL ELSE jsonb_build_object(
+    'rows', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'key', key, 'label', label, 'minutes', minutes,
+        'billable_minutes', billable_minutes, 'entries', entries
+      ) ORDER BY
+        CASE WHEN p_group_by IN ('day', 'week') THEN key END,
+        minutes DESC,
+        key)
+      FROM labelled
+    ), '[]'::jsonb),
+    'total', (
+      SELECT jsonb_build_object(
+        'minutes', COALESCE(SUM(minutes), 0),
+        'billable_minutes', COALESCE(SUM(billable_minutes), 0),
+        'entries', COALESCE(SUM(entries), 0)
+      )
+      FROM grouped
+    )
+  ) END;
+$$;
+
+-- Only signed-in callers; the function itself checks they report on themselves
+REVOKE EXECUTE ON FUNCTION time_report(UUID, TEXT, DATE, DATE, BOOLEAN, UUID) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION time_report(UUID, TEXT, DATE, DATE, BOOLEAN, UUID) TO authenticated;
+
+-- Sessions ended through POST /auth/logout. The API verifies access tokens locally, so the
+-- auth server's own session check never runs; every API instance pulls this list instead
+-- (revoked_sessions_since) and refuses tokens of listed sessions until they expire. Rows
+-- are only needed until then, and revoke_session() purges the expired ones.
+CREATE TABLE IF NOT EXISTS revoked_sessions (
+  session_id UUID PRIMARY KEY,
+  user_id UUID NOT NULL,
+  revoked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_revoked_sessions_revoked_at ON revoked_sessions(revoked_at);
+CREATE INDEX IF NOT EXISTS idx_revoked_sessions_expires_at ON revoked_sessions(expires_at);
+
+-- No policies: rows are written and read only through the functions below
+ALTER TABLE revoked_sessions ENABLE ROW LEVEL SECURITY;
+
+-- Revokes the caller's own session, the one their access token (auth.jwt()) belongs to
+CREATE OR REPLACE FUNCTION revoke_session()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF auth.uid() IS NULL OR auth.jwt() ->> 'session_id' IS NULL THEN
+    RETURN;
+  END IF;
+  DELETE FROM revoked_sessions WHERE expires_at <= NOW();
+  INSERT INTO revoked_sessions (session_id, user_id, expires_at)
+  VALUES ((auth.jwt() ->> 'session_id')::uuid, auth.uid(), to_timestamp((auth.jwt() ->> 'exp')::bigint))
+  ON CONFLICT (session_id) DO NOTHING;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION revoke_session() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION revoke_session() TO authenticated;
+
+-- Unexpired revocations recorded after p_since (all of them when NULL), oldest first.
+-- The API's shared client calls it with the anon key; a session id is useless without
+-- its access token, so the list is not secret.
+CREATE OR REPLACE FUNCTION revoked_sessions_since(p_since TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS TABLE (session_id UUID, revoked_at TIMESTAMP WITH TIME ZONE, expires_at TIMESTAMP WITH TIME ZONE)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT r.session_id, r.revoked_at, r.expires_at
+  FROM revoked_sessions r
+  WHERE r.expires_at > NOW()
+    AND (p_since IS NULL OR r.revoked_at > p_since)
+  ORDER BY r.revoked_at;
+$$;
+
 -- Insert some seed data (optional)
 -- You can run this after creating your first account to have some demo data
 
@@ -0,0 +1,114 @@
+-- Dashboard time rollups
+-- Per-user, per-day totals of logged minutes, maintained by trigger whenever a
+-- time entry gets (or changes) its duration, plus one RPC that returns the whole
+-- dashboard payload so the API makes a single round trip.
+
+-- Daily rollup (days are UTC calendar days of start_time)
+CREATE TABLE IF NOT EXISTS time_rollups_daily (
+  user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
+  day DATE NOT NULL,
+  minutes BIGINT NOT NULL DEFAULT 0,
+  billable_minutes BIGINT NOT NULL DEFAULT 0,
+  entries INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, day)
+);
+
+ALTER TABLE time_rollups_daily ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their time rollups" ON time_rollups_daily
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Keep the rollup in step with time_entries. Only finished entries (duration set) count,
+-- so stopping a timer is what adds the minutes.
+CREATE OR REPLACE FUNCTION apply_time_rollup()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.duration IS NOT NULL THEN
+    UPDATE time_rollups_daily
+    SET minutes = minutes - OLD.duration,
+        billable_minutes = billable_minutes - CASE WHEN OLD.billable THEN OLD.duration ELSE 0 END,
+        entries = entries - 1
+    WHERE user_id = OLD.user_id
+      AND day = (OLD.start_time AT TIME ZONE 'UTC')::date;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.duration IS NOT NULL THEN
+    INSERT INTO time_rollups_daily (user_id, day, minutes, billable_minutes, entries)
+    VALUES (
+      NEW.user_id,
+      (NEW.start_time AT TIME ZONE 'UTC')::date,
+      NEW.duration,
+      CASE WHEN NEW.billable THEN NEW.duration ELSE 0 END,
+      1
+    )
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET minutes = time_rollups_daily.minutes + EXCLUDED.minutes,
+        billable_minutes = time_rollups_daily.billable_minutes + EXCLUDED.billable_minutes,
+        entries = time_rollups_daily.entries + 1;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS time_entries_rollup ON time_entries;
+CREATE TRIGGER time_entries_rollup
+  AFTER INSERT OR DELETE OR UPDATE OF duration, start_time, user_id, billable ON time_entries
+  FOR EACH ROW EXECUTE FUNCTION apply_time_rollup();
+
+-- Backfill from entries that existed before the trigger
+INSERT INTO time_rollups_daily (user_id, day, minutes, billable_minutes, entries)
+SELECT
+  user_id,
+  (start_time AT TIME ZONE 'UTC')::date,
+  SUM(duration),
+  SUM(CASE WHEN billable THEN duration ELSE 0 END),
+  COUNT(*)
+FROM time_entries
+WHERE duration IS NOT NULL
+GROUP BY user_id, (start_time AT TIME ZONE 'UTC')::date
+ON CONFLICT (user_id, day) DO NOTHING;
+
+-- Whole dashboard in one call. Task counts are aggregated in the database (visible tasks
+-- under RLS); time totals read at most ~31 rollup rows per user regardless of entry count.
+-- p_from/p_to add a custom day range to timeStats.range.
+CREATE OR REPLACE FUNCTION dashboard_stats(
+  p_user_id UUID,
+  p_today DATE DEFAULT (NOW() AT TIME ZONE 'UTC')::date,
+  p_from DATE DEFAULT NULL,
+  p_to DATE DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'taskStats', (
+      SELECT json_build_object(
+        'total', COUNT(*),
+        'todo', COUNT(*) FILTER (WHERE status = 'todo'),
+        'in_progress', COUNT(*) FILTER (WHERE status = 'in_progress'),
+        'completed', COUNT(*) FILTER (WHERE status = 'completed')
+      )
+      FROM tasks
+    ),
+    'timeStats', (
+      SELECT json_build_object(
+        'today', COALESCE(SUM(minutes) FILTER (WHERE day = p_today), 0),
+        'week', COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_today - 7 AND p_today), 0),
+        'month', COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_today - 30 AND p_today), 0),
+        'range', CASE WHEN p_from IS NULL THEN NULL
+                      ELSE COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_from AND COALESCE(p_to, p_today)), 0)
+                 END
+      )
+      FROM time_rollups_daily
+      WHERE user_id = p_user_id
+        AND day >= LEAST(p_today - 30, COALESCE(p_from, p_today - 30))
+        AND day <= GREATEST(p_today, COALESCE(p_to, p_today))
+    )
+  );
+$$;
@@ -0,0 +1,17 @@
+-- Task list pagination
+-- Keyset indexes on (created_at, id) for the unfiltered list and each supported filter,
+-- and a view that computes total_time in the database so GET /tasks no longer embeds
+-- every time entry.
+
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at_id ON tasks(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_created_at_id ON tasks(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_created_at_id ON tasks(project_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_created_at_id ON tasks(assignee_id, created_at DESC, id DESC);
+
+-- security_invoker keeps the RLS policies of tasks and time_entries in force, so
+-- total_time is the caller's visible time on the task, as it was when summed in JS
+CREATE OR REPLACE VIEW task_list WITH (security_invoker = true) AS
+SELECT
+  t.*,
+  COALESCE((SELECT SUM(te.duration) FROM time_entries te WHERE te.task_id = t.id), 0)::INTEGER AS total_time
+FROM tasks t;
@@ -0,0 +1,173 @@
+-- Bulk writes
+-- One call per batch for POST/PUT /tasks/bulk and POST /time-entries/bulk. Each function
+-- first tries a single set-based statement; if the database rejects it (e.g. a foreign
+-- key on one row), it retries row by row so the caller gets an error per item instead
+-- of losing the whole batch. Results are [{index, id}] / [{index, error}], where index
+-- is the item's position in the input array. Functions run as the caller, so RLS applies.
+
+CREATE OR REPLACE FUNCTION bulk_insert_tasks(p_tasks JSONB, p_created_by UUID)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_created JSONB;
+  v_errors JSONB := '[]'::jsonb;
+  v_item JSONB;
+  v_index BIGINT;
+  v_id UUID;
+BEGIN
+  BEGIN
+    WITH rows AS (
+      SELECT ord - 1 AS idx, uuid_generate_v4() AS id, item
+      FROM jsonb_array_elements(p_tasks) WITH ORDINALITY AS e(item, ord)
+    ), inserted AS (
+      INSERT INTO tasks (id, project_id, title, description, assignee_id, created_by, status, priority, due_date)
+      SELECT
+        id,
+        (item->>'project_id')::uuid,
+        item->>'title',
+        item->>'description',
+        (item->>'assignee_id')::uuid,
+        p_created_by,
+        COALESCE(item->>'status', 'todo'),
+        COALESCE(item->>'priority', 'medium'),
+        (item->>'due_date')::timestamptz
+      FROM rows
+      RETURNING id
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object('index', idx, 'id', id) ORDER BY idx), '[]'::jsonb)
+    INTO v_created
+    FROM rows
+    WHERE id IN (SELECT id FROM inserted);
+
+    RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+  EXCEPTION WHEN OTHERS THEN
+    v_created := '[]'::jsonb;
+  END;
+
+  FOR v_item, v_index IN SELECT item, ord - 1 FROM jsonb_array_elements(p_tasks) WITH ORDINALITY AS e(item, ord) LOOP
+    BEGIN
+      INSERT INTO tasks (project_id, title, description, assignee_id, created_by, status, priority, due_date)
+      VALUES (
+        (v_item->>'project_id')::uuid,
+        v_item->>'title',
+        v_item->>'description',
+        (v_item->>'assignee_id')::uuid,
+        p_created_by,
+        COALESCE(v_item->>'status', 'todo'),
+        COALESCE(v_item->>'priority', 'medium'),
+        (v_item->>'due_date')::timestamptz
+      )
+      RETURNING id INTO v_id;
+      v_created := v_created || jsonb_build_object('index', v_index, 'id', v_id);
+    EXCEPTION WHEN OTHERS THEN
+      v_errors := v_errors || jsonb_build_object('index', v_index, 'error', SQLERRM);
+    END;
+  END LOOP;
+
+  RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+END;
+$$;
+
+-- Items are {id, ...fields}; only the fields present in an item are changed
+CREATE OR REPLACE FUNCTION bulk_update_tasks(p_updates JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_updated JSONB := '[]'::jsonb;
+  v_errors JSONB := '[]'::jsonb;
+  v_item JSONB;
+  v_index BIGINT;
+  v_id UUID;
+BEGIN
+  FOR v_item, v_index IN SELECT item, ord - 1 FROM jsonb_array_elements(p_updates) WITH ORDINALITY AS e(item, ord) LOOP
+    BEGIN
+      UPDATE tasks SET
+        project_id = CASE WHEN v_item ? 'project_id' THEN (v_item->>'project_id')::uuid ELSE project_id END,
+        title = CASE WHEN v_item ? 'title' THEN v_item->>'title' ELSE title END,
+        description = CASE WHEN v_item ? 'description' THEN v_item->>'description' ELSE description END,
+        assignee_id = CASE WHEN v_item ? 'assignee_id' THEN (v_item->>'assignee_id')::uuid ELSE assignee_id END,
+        status = CASE WHEN v_item ? 'status' THEN v_item->>'status' ELSE status END,
+        priority = CASE WHEN v_item ? 'priority' THEN v_item->>'priority' ELSE priority END,
+        due_date = CASE WHEN v_item ? 'due_date' THEN (v_item->>'due_date')::timestamptz ELSE due_date END,
+        updated_at = NOW()
+      WHERE id = (v_item->>'id')::uuid
+      RETURNING id INTO v_id;
+
+      IF v_id IS NULL THEN
+        v_errors := v_errors || jsonb_build_object('index', v_index, 'error', 'Task not found');
+      ELSE
+        v_updated := v_updated || jsonb_build_object('index', v_index, 'id', v_id);
+      END IF;
+    EXCEPTION WHEN OTHERS THEN
+      v_errors := v_errors || jsonb_build_object('index', v_index, 'error', SQLERRM);
+    END;
+  END LOOP;
+
+  RETURN jsonb_build_object('updated', v_updated, 'errors', v_errors);
+END;
+$$;
+
+-- Finished (historical) entries only; duration is computed from start/end like stopTimer
+CREATE OR REPLACE FUNCTION bulk_insert_time_entries(p_entries JSONB, p_user_id UUID)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_created JSONB;
+  v_errors JSONB := '[]'::jsonb;
+  v_item JSONB;
+  v_index BIGINT;
+  v_id UUID;
+BEGIN
+  BEGIN
+    WITH rows AS (
+      SELECT ord - 1 AS idx, uuid_generate_v4() AS id, item
+      FROM jsonb_array_elements(p_entries) WITH ORDINALITY AS e(item, ord)
+    ), inserted AS (
+      INSERT INTO time_entries (id, task_id, user_id, start_time, end_time, duration, description, billable)
+      SELECT
+        id,
+        (item->>'task_id')::uuid,
+        p_user_id,
+        (item->>'start_time')::timestamptz,
+        (item->>'end_time')::timestamptz,
+        FLOOR(EXTRACT(EPOCH FROM (item->>'end_time')::timestamptz - (item->>'start_time')::timestamptz) / 60)::integer,
+        COALESCE(item->>'description', ''),
+        COALESCE((item->>'billable')::boolean, FALSE)
+      FROM rows
+      RETURNING id
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object('index', idx, 'id', id) ORDER BY idx), '[]'::jsonb)
+    INTO v_created
+    FROM rows
+    WHERE id IN (SELECT id FROM inserted);
+
+    RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+  EXCEPTION WHEN OTHERS THEN
+    v_created := '[]'::jsonb;
+  END;
+
+  FOR v_item, v_index IN SELECT item, ord - 1 FROM jsonb_array_elements(p_entries) WITH ORDINALITY AS e(item, ord) LOOP
+    BEGIN
+      INSERT INTO time_entries (task_id, user_id, start_time, end_time, duration, description, billable)
+      VALUES (
+        (v_item->>'task_id')::uuid,
+        p_user_id,
+        (v_item->>'start_time')::timestamptz,
+        (v_item->>'end_time')::timestamptz,
+        FLOOR(EXTRACT(EPOCH FROM (v_item->>'end_time')::timestamptz - (v_item->>'start_time')::timestamptz) / 60)::integer,
+        COALESCE(v_item->>'description', ''),
+        COALESCE((v_item->>'billable')::boolean, FALSE)
+      )
+      RETURNING id INTO v_id;
+      v_created := v_created || jsonb_build_object('index', v_index, 'id', v_id);
+    EXCEPTION WHEN OTHERS THEN
+      v_errors := v_errors || jsonb_build_object('index', v_index, 'error', SQLERRM);
+    END;
+  END LOOP;
+
+  RETURN jsonb_build_object('created', v_created, 'errors', v_errors);
+END;
+$$;
@@ -0,0 +1,49 @@
+-- Atomic timers
+-- One running timer per user is enforced by a partial unique index, so starting a
+-- timer is a single INSERT (a second concurrent start fails with unique_violation)
+-- and stopping one is a single RPC that stamps end_time and computes the duration
+-- from the database clock.
+
+-- Close any duplicate running timers left by the old check-then-insert race, keeping
+-- each user's most recent one open. Older ones end when the newest one started.
+WITH running AS (
+  SELECT id, start_time,
+         MAX(start_time) OVER (PARTITION BY user_id) AS latest_start,
+         ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY start_time DESC, id DESC) AS rank
+  FROM time_entries
+  WHERE end_time IS NULL
+)
+UPDATE time_entries te
+SET end_time = running.latest_start,
+    duration = FLOOR(EXTRACT(EPOCH FROM running.latest_start - running.start_time) / 60)::integer
+FROM running
+WHERE te.id = running.id
+  AND running.rank > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_time_entries_running_per_user
+  ON time_entries(user_id) WHERE end_time IS NULL;
+
+-- Timers start on the database clock
+ALTER TABLE time_entries ALTER COLUMN start_time SET DEFAULT NOW();
+
+-- Stop the caller's running timer; returns the entry with its task and user embedded,
+-- or NULL when p_entry_id is not a running timer of p_user_id
+CREATE OR REPLACE FUNCTION stop_timer(p_entry_id UUID, p_user_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+AS $$
+  WITH stopped AS (
+    UPDATE time_entries
+    SET end_time = NOW(),
+        duration = FLOOR(EXTRACT(EPOCH FROM NOW() - start_time) / 60)::integer
+    WHERE id = p_entry_id
+      AND user_id = p_user_id
+      AND end_time IS NULL
+    RETURNING *
+  )
+  SELECT to_jsonb(s) || jsonb_build_object(
+    'task', (SELECT jsonb_build_object('id', t.id, 'title', t.title) FROM tasks t WHERE t.id = s.task_id),
+    'user', (SELECT jsonb_build_object('id', u.id, 'name', u.name, 'email', u.email) FROM users u WHERE u.id = s.user_id)
+  )
+  FROM stopped s;
+$$;
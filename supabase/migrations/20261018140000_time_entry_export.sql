@@ -0,0 +1,5 @@
+-- Time entry export
+-- GET /time-entries/export walks a user's entries in (start_time, id) order, one keyset
+-- chunk at a time; this index serves each chunk as a short range scan.
+
+CREATE INDEX IF NOT EXISTS idx_time_entries_user_start_id ON time_entries(user_id, start_time, id);
@@ -0,0 +1,188 @@
+-- Delta sync
+-- Every insert, update and delete on tasks, projects, time_entries, messages and docs
+-- appends a row to sync_changes, tagged with the workspace and/or user that can see it.
+-- GET /sync?since=<seq> reads the caller's slice of the log after a cursor and returns the
+-- current rows for what changed; ids that no longer exist (or that the caller can no
+-- longer see, e.g. a task moved to another workspace) come back as deletions.
+
+CREATE TABLE IF NOT EXISTS sync_changes (
+  seq BIGSERIAL PRIMARY KEY,
+  entity TEXT NOT NULL CHECK (entity IN ('tasks', 'projects', 'time_entries', 'messages', 'docs')),
+  entity_id UUID NOT NULL,
+  workspace_id UUID,
+  user_id UUID,
+  changed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_changes_workspace_seq ON sync_changes(workspace_id, seq) WHERE workspace_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_sync_changes_user_seq ON sync_changes(user_id, seq) WHERE user_id IS NOT NULL;
+
+ALTER TABLE sync_changes ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their sync changes" ON sync_changes
+  FOR SELECT USING (
+    auth.uid() = user_id OR
+    EXISTS (SELECT 1 FROM workspace_members WHERE workspace_id = sync_changes.workspace_id AND user_id = auth.uid())
+  );
+
+-- Who can see a row: tasks follow their project's workspace (project-less tasks sync to
+-- their creator), time entries their owner, messages their channel's workspace
+CREATE OR REPLACE FUNCTION sync_scope(p_entity TEXT, p_row JSONB, OUT workspace_id UUID, OUT user_id UUID)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  CASE p_entity
+    WHEN 'tasks' THEN
+      SELECT p.workspace_id INTO workspace_id FROM projects p WHERE p.id = (p_row->>'project_id')::uuid;
+      user_id := (p_row->>'created_by')::uuid;
+    WHEN 'projects' THEN
+      workspace_id := (p_row->>'workspace_id')::uuid;
+    WHEN 'time_entries' THEN
+      user_id := (p_row->>'user_id')::uuid;
+    WHEN 'messages' THEN
+      SELECT c.workspace_id INTO workspace_id FROM channels c WHERE c.id = (p_row->>'channel_id')::uuid;
+    WHEN 'docs' THEN
+      workspace_id := (p_row->>'workspace_id')::uuid;
+      user_id := (p_row->>'created_by')::uuid;
+  END CASE;
+END;
+$$;
+
+-- Logs the new scope, and the old one too when an update moved the row, so readers who
+-- lost sight of it learn it is gone
+CREATE OR REPLACE FUNCTION log_sync_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_new RECORD;
+  v_old RECORD;
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    SELECT * INTO v_new FROM sync_scope(TG_TABLE_NAME, to_jsonb(NEW));
+    INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+    VALUES (TG_TABLE_NAME, NEW.id, v_new.workspace_id, v_new.user_id);
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    SELECT * INTO v_old FROM sync_scope(TG_TABLE_NAME, to_jsonb(OLD));
+    IF TG_OP = 'DELETE' THEN
+      INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+      VALUES (TG_TABLE_NAME, OLD.id, v_old.workspace_id, v_old.user_id);
+    ELSIF (v_old.workspace_id, v_old.user_id) IS DISTINCT FROM (v_new.workspace_id, v_new.user_id) THEN
+      INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+      VALUES (TG_TABLE_NAME, OLD.id, v_old.workspace_id, v_old.user_id);
+    END IF;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tasks_sync_log ON tasks;
+CREATE TRIGGER tasks_sync_log AFTER INSERT OR UPDATE OR DELETE ON tasks
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS projects_sync_log ON projects;
+CREATE TRIGGER projects_sync_log AFTER INSERT OR UPDATE OR DELETE ON projects
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS time_entries_sync_log ON time_entries;
+CREATE TRIGGER time_entries_sync_log AFTER INSERT OR UPDATE OR DELETE ON time_entries
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS messages_sync_log ON messages;
+CREATE TRIGGER messages_sync_log AFTER INSERT OR UPDATE OR DELETE ON messages
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+DROP TRIGGER IF EXISTS docs_sync_log ON docs;
+CREATE TRIGGER docs_sync_log AFTER INSERT OR UPDATE OR DELETE ON docs
+  FOR EACH ROW EXECUTE FUNCTION log_sync_change();
+
+-- Backfill: one entry per existing row, so a first sync from 0 returns everything
+INSERT INTO sync_changes (entity, entity_id, workspace_id, user_id)
+SELECT e.entity, e.id, s.workspace_id, s.user_id
+FROM (
+  SELECT 'projects' AS entity, id, to_jsonb(p) AS row FROM projects p
+  UNION ALL SELECT 'tasks', id, to_jsonb(t) FROM tasks t
+  UNION ALL SELECT 'time_entries', id, to_jsonb(te) FROM time_entries te
+  UNION ALL SELECT 'messages', id, to_jsonb(m) FROM messages m
+  UNION ALL SELECT 'docs', id, to_jsonb(d) FROM docs d
+) e
+CROSS JOIN LATERAL sync_scope(e.entity, e.row) s;
+
+-- Latest position in the log: where a client that just did a full load starts syncing
+CREATE OR REPLACE FUNCTION sync_head()
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT COALESCE(MAX(seq), 0) FROM sync_changes;
+$$;
+
+-- Up to p_limit log entries after p_since, collapsed to current rows (with the same
+-- embeds the list routes return) and deletions. cursor is the last seq read; has_more
+-- means the limit was hit and the caller should ask again from cursor.
+CREATE OR REPLACE FUNCTION sync_since(p_user_id UUID, p_since BIGINT DEFAULT 0, p_limit INTEGER DEFAULT 1000)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH batch AS (
+    SELECT seq, entity, entity_id
+    FROM sync_changes
+    WHERE seq > p_since
+      AND (user_id = p_user_id
+           OR workspace_id IN (SELECT workspace_id FROM workspace_members WHERE user_id = p_user_id))
+    ORDER BY seq
+    LIMIT p_limit
+  ), changed AS (
+    SELECT DISTINCT entity, entity_id FROM batch
+  ), tasks_out AS (
+    SELECT to_jsonb(t) || jsonb_build_object(
+      'project', (SELECT jsonb_build_object('id', p.id, 'name', p.name) FROM projects p WHERE p.id = t.project_id)
+    ) AS row, t.id
+    FROM task_list t
+    WHERE t.id IN (SELECT entity_id FROM changed WHERE entity = 'tasks')
+  ), projects_out AS (
+    SELECT to_jsonb(p) AS row, p.id
+    FROM projects p
+    WHERE p.id IN (SELECT entity_id FROM changed WHERE entity = 'projects')
+  ), entries_out AS (
+    SELECT to_jsonb(te) || jsonb_build_object(
+      'task', (SELECT jsonb_build_object('id', t.id, 'title', t.title) FROM tasks t WHERE t.id = te.task_id)
+    ) AS row, te.id
+    FROM time_entries te
+    WHERE te.id IN (SELECT entity_id FROM changed WHERE entity = 'time_entries')
+      AND te.user_id = p_user_id
+  ), messages_out AS (
+    SELECT to_jsonb(m) AS row, m.id
+    FROM messages m
+    WHERE m.id IN (SELECT entity_id FROM changed WHERE entity = 'messages')
+  ), docs_out AS (
+    SELECT to_jsonb(d) AS row, d.id
+    FROM docs d
+    WHERE d.id IN (SELECT entity_id FROM changed WHERE entity = 'docs')
+  ), present AS (
+    SELECT 'tasks' AS entity, id FROM tasks_out
+    UNION ALL SELECT 'projects', id FROM projects_out
+    UNION ALL SELECT 'time_entries', id FROM entries_out
+    UNION ALL SELECT 'messages', id FROM messages_out
+    UNION ALL SELECT 'docs', id FROM docs_out
+  )
+  SELECT jsonb_build_object(
+    'tasks', COALESCE((SELECT jsonb_agg(row) FROM tasks_out), '[]'::jsonb),
+    'projects', COALESCE((SELECT jsonb_agg(row) FROM projects_out), '[]'::jsonb),
+    'time_entries', COALESCE((SELECT jsonb_agg(row) FROM entries_out), '[]'::jsonb),
+    'messages', COALESCE((SELECT jsonb_agg(row) FROM messages_out), '[]'::jsonb),
+    'docs', COALESCE((SELECT jsonb_agg(row) FROM docs_out), '[]'::jsonb),
+    'deleted', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('type', c.entity, 'id', c.entity_id))
+      FROM changed c
+      WHERE NOT EXISTS (SELECT 1 FROM present WHERE present.entity = c.entity AND present.id = c.entity_id)
+    ), '[]'::jsonb),
+    'cursor', COALESCE((SELECT MAX(seq) FROM batch), p_since),
+    'has_more', (SELECT COUNT(*) FROM batch) = p_limit
+  );
+$$;
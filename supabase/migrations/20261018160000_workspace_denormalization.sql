@@ -0,0 +1,162 @@
+-- Denormalized workspace_id
+-- tasks, subtasks and messages carry the workspace they belong to, copied from their
+-- project, task or channel by triggers. Their SELECT policies compare that one indexed
+-- column with the caller's workspace ids (looked up once per statement) instead of
+-- joining through projects or channels to workspace_members for every row, so a list
+-- query only touches rows in the caller's workspaces however many other workspaces exist.
+-- rls_benchmark.py records EXPLAIN ANALYZE timings for both policy variants.
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS workspace_id UUID REFERENCES workspaces(id) ON DELETE SET NULL;
+ALTER TABLE subtasks ADD COLUMN IF NOT EXISTS workspace_id UUID REFERENCES workspaces(id) ON DELETE SET NULL;
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS workspace_id UUID REFERENCES workspaces(id) ON DELETE SET NULL;
+
+UPDATE tasks t
+SET workspace_id = p.workspace_id
+FROM projects p
+WHERE p.id = t.project_id AND t.workspace_id IS DISTINCT FROM p.workspace_id;
+
+UPDATE subtasks s
+SET workspace_id = t.workspace_id
+FROM tasks t
+WHERE t.id = s.task_id AND s.workspace_id IS DISTINCT FROM t.workspace_id;
+
+UPDATE messages m
+SET workspace_id = c.workspace_id
+FROM channels c
+WHERE c.id = m.channel_id AND m.workspace_id IS DISTINCT FROM c.workspace_id;
+
+-- workspace_id is always derived from the parent row; a value sent by a client is ignored
+CREATE OR REPLACE FUNCTION set_task_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  NEW.workspace_id := (SELECT workspace_id FROM projects WHERE id = NEW.project_id);
+  RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION set_subtask_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  NEW.workspace_id := (SELECT workspace_id FROM tasks WHERE id = NEW.task_id);
+  RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION set_message_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  NEW.workspace_id := (SELECT workspace_id FROM channels WHERE id = NEW.channel_id);
+  RETURN NEW;
+END;
+$$;
+
+-- A parent moving to another workspace takes its children along (projects -> tasks ->
+-- subtasks, channels -> messages); the child's BEFORE trigger re-reads the parent.
+-- Column lists on UPDATE OF only see columns named in the SET clause, so the tasks
+-- trigger also listens on project_id, which changes workspace_id via set_task_workspace()
+CREATE OR REPLACE FUNCTION propagate_workspace()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.workspace_id IS DISTINCT FROM OLD.workspace_id THEN
+    CASE TG_TABLE_NAME
+      WHEN 'projects' THEN
+        UPDATE tasks SET workspace_id = NEW.workspace_id WHERE project_id = NEW.id;
+      WHEN 'tasks' THEN
+        UPDATE subtasks SET workspace_id = NEW.workspace_id WHERE task_id = NEW.id;
+      WHEN 'channels' THEN
+        UPDATE messages SET workspace_id = NEW.workspace_id WHERE channel_id = NEW.id;
+    END CASE;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS tasks_set_workspace ON tasks;
+CREATE TRIGGER tasks_set_workspace BEFORE INSERT OR UPDATE OF project_id, workspace_id ON tasks
+  FOR EACH ROW EXECUTE FUNCTION set_task_workspace();
+DROP TRIGGER IF EXISTS subtasks_set_workspace ON subtasks;
+CREATE TRIGGER subtasks_set_workspace BEFORE INSERT OR UPDATE OF task_id, workspace_id ON subtasks
+  FOR EACH ROW EXECUTE FUNCTION set_subtask_workspace();
+DROP TRIGGER IF EXISTS messages_set_workspace ON messages;
+CREATE TRIGGER messages_set_workspace BEFORE INSERT OR UPDATE OF channel_id, workspace_id ON messages
+  FOR EACH ROW EXECUTE FUNCTION set_message_workspace();
+
+DROP TRIGGER IF EXISTS projects_propagate_workspace ON projects;
+CREATE TRIGGER projects_propagate_workspace AFTER UPDATE OF workspace_id ON projects
+  FOR EACH ROW EXECUTE FUNCTION propagate_workspace();
+DROP TRIGGER IF EXISTS tasks_propagate_workspace ON tasks;
+CREATE TRIGGER tasks_propagate_workspace AFTER UPDATE OF project_id, workspace_id ON tasks
+  FOR EACH ROW EXECUTE FUNCTION propagate_workspace();
+DROP TRIGGER IF EXISTS channels_propagate_workspace ON channels;
+CREATE TRIGGER channels_propagate_workspace AFTER UPDATE OF workspace_id ON channels
+  FOR EACH ROW EXECUTE FUNCTION propagate_workspace();
+
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_created_at_id ON tasks(workspace_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_subtasks_workspace_task ON subtasks(workspace_id, task_id);
+CREATE INDEX IF NOT EXISTS idx_messages_workspace_timestamp ON messages(workspace_id, timestamp DESC);
+-- Covers the membership lookup below with an index-only scan
+CREATE INDEX IF NOT EXISTS idx_workspace_members_user_workspace ON workspace_members(user_id, workspace_id);
+
+-- The caller's workspaces. SECURITY DEFINER reads workspace_members without going through
+-- its own (self-referencing) policy; policies call it as ARRAY(SELECT ...), an InitPlan
+-- that runs once per statement and can drive an index scan on workspace_id
+CREATE OR REPLACE FUNCTION user_workspace_ids()
+RETURNS SETOF UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT workspace_id FROM workspace_members WHERE user_id = auth.uid();
+$$;
+
+DROP POLICY IF EXISTS "Users can view workspace members" ON workspace_members;
+CREATE POLICY "Users can view workspace members" ON workspace_members
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids()))
+  );
+
+DROP POLICY IF EXISTS "Users can view workspace tasks" ON tasks;
+CREATE POLICY "Users can view workspace tasks" ON tasks
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids())) OR
+    tasks.project_id IS NULL
+  );
+
+DROP POLICY IF EXISTS "Users can view subtasks" ON subtasks;
+CREATE POLICY "Users can view subtasks" ON subtasks
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids())) OR
+    EXISTS (SELECT 1 FROM tasks WHERE tasks.id = subtasks.task_id AND tasks.project_id IS NULL)
+  );
+
+DROP POLICY IF EXISTS "Users can view channel messages" ON messages;
+CREATE POLICY "Users can view channel messages" ON messages
+  FOR SELECT USING (
+    workspace_id = ANY (ARRAY(SELECT user_workspace_ids()))
+  );
+
+-- task_list was created with t.*, which Postgres expands when the view is created;
+-- recreate it so list rows include workspace_id
+DROP VIEW IF EXISTS task_list;
+CREATE VIEW task_list WITH (security_invoker = true) AS
+SELECT
+  t.*,
+  COALESCE((SELECT SUM(te.duration) FROM time_entries te WHERE te.task_id = t.id), 0)::INTEGER AS total_time
+FROM tasks t;
@@ -0,0 +1,104 @@
+-- Full-text search
+-- tasks(title, description), docs(title, content) and messages(content) are indexed as
+-- weighted tsvectors (title A, body B) in GIN indexes that lead with workspace_id, so a
+-- search only visits matches in the caller's workspaces. The vectors live in expression
+-- indexes rather than stored columns, which keeps them out of select('*') responses.
+-- GET /search calls search_workspace(), which ranks with ts_rank_cd and pages by keyset.
+
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+CREATE OR REPLACE FUNCTION search_vector(p_title TEXT, p_body TEXT)
+RETURNS TSVECTOR
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT setweight(to_tsvector('english'::regconfig, COALESCE(p_title, '')), 'A') ||
+         setweight(to_tsvector('english'::regconfig, COALESCE(p_body, '')), 'B');
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_search ON tasks
+  USING GIN (workspace_id, search_vector(title, description));
+CREATE INDEX IF NOT EXISTS idx_docs_search ON docs
+  USING GIN (workspace_id, search_vector(title, content));
+CREATE INDEX IF NOT EXISTS idx_messages_search ON messages
+  USING GIN (workspace_id, search_vector(content, ''));
+
+-- One page of ranked matches for p_query (websearch syntax: words, "phrases", -exclusions,
+-- OR) in the caller's workspaces, or in p_workspace_id only. Tasks without a project count
+-- when the caller created or is assigned to them. Results are ordered by (rank, type, id)
+-- descending; pass the last row's values as p_after_* for the next page. Headlines are
+-- built only for the returned rows.
+CREATE OR REPLACE FUNCTION search_workspace(
+  p_user_id UUID,
+  p_query TEXT,
+  p_types TEXT[] DEFAULT ARRAY['tasks', 'docs', 'messages'],
+  p_workspace_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 20,
+  p_after_rank REAL DEFAULT NULL,
+  p_after_type TEXT DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('english', p_query) AS query,
+           ARRAY(
+             SELECT workspace_id FROM workspace_members
+             WHERE user_id = p_user_id AND (p_workspace_id IS NULL OR workspace_id = p_workspace_id)
+           ) AS workspace_ids
+  ), hits AS (
+    SELECT 'tasks'::text AS type, t.id, ts_rank_cd(search_vector(t.title, t.description), q.query) AS rank
+    FROM tasks t, q
+    WHERE 'tasks' = ANY (p_types)
+      AND search_vector(t.title, t.description) @@ q.query
+      AND (t.workspace_id = ANY (q.workspace_ids) OR
+           (p_workspace_id IS NULL AND t.project_id IS NULL AND p_user_id IN (t.created_by, t.assignee_id)))
+    UNION ALL
+    SELECT 'docs', d.id, ts_rank_cd(search_vector(d.title, d.content), q.query)
+    FROM docs d, q
+    WHERE 'docs' = ANY (p_types)
+      AND search_vector(d.title, d.content) @@ q.query
+      AND d.workspace_id = ANY (q.workspace_ids)
+    UNION ALL
+    SELECT 'messages', m.id, ts_rank_cd(search_vector(m.content, ''), q.query)
+    FROM messages m, q
+    WHERE 'messages' = ANY (p_types)
+      AND search_vector(m.content, '') @@ q.query
+      AND m.workspace_id = ANY (q.workspace_ids)
+  ), page AS (
+    SELECT * FROM hits
+    WHERE p_after_rank IS NULL OR (rank, type, id) < (p_after_rank, p_after_type, p_after_id)
+    ORDER BY rank DESC, type DESC, id DESC
+    LIMIT p_limit + 1
+  ), results AS (
+    SELECT page.type, page.id, page.rank, r.workspace_id, r.title, r.created_at,
+           ts_headline('english', r.body, q.query,
+                       'StartSel=<b>, StopSel=</b>, MaxWords=20, MinWords=8, MaxFragments=1') AS snippet
+    FROM page
+    CROSS JOIN q
+    CROSS JOIN LATERAL (
+      SELECT t.workspace_id, t.title, COALESCE(NULLIF(t.description, ''), t.title) AS body, t.created_at
+      FROM tasks t WHERE page.type = 'tasks' AND t.id = page.id
+      UNION ALL
+      SELECT d.workspace_id, d.title, COALESCE(NULLIF(d.content, ''), d.title), d.created_at
+      FROM docs d WHERE page.type = 'docs' AND d.id = page.id
+      UNION ALL
+      SELECT m.workspace_id, '#' || c.name, m.content, m.timestamp
+      FROM messages m LEFT JOIN channels c ON c.id = m.channel_id
+      WHERE page.type = 'messages' AND m.id = page.id
+    ) r
+  )
+  SELECT jsonb_build_object(
+    'results', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'type', type, 'id', id, 'workspace_id', workspace_id, 'title', title,
+        'snippet', snippet, 'rank', rank, 'created_at', created_at
+      ) ORDER BY rank DESC, type DESC, id DESC)
+      FROM (SELECT * FROM results ORDER BY rank DESC, type DESC, id DESC LIMIT p_limit) shown
+    ), '[]'::jsonb),
+    'has_more', (SELECT COUNT(*) FROM page) > p_limit
+  );
+$$;
@@ -0,0 +1,19 @@
+-- Chat history
+-- GET /channels/:id/messages pages a channel's messages newest first with a keyset on
+-- (timestamp, id), so every page is one range scan of this index however deep it starts;
+-- an OFFSET page would read and discard every newer message first. The index also serves
+-- plain channel_id lookups, so the single-column one is dropped.
+
+CREATE INDEX IF NOT EXISTS idx_messages_channel_timestamp_id ON messages(channel_id, timestamp DESC, id DESC);
+DROP INDEX IF EXISTS idx_messages_channel_id;
+
+-- Senders must be members of the channel's workspace, not just themselves
+DROP POLICY IF EXISTS "Users can send messages" ON messages;
+CREATE POLICY "Users can send messages" ON messages
+  FOR INSERT WITH CHECK (
+    auth.uid() = sender_id AND
+    EXISTS (
+      SELECT 1 FROM channels c
+      WHERE c.id = messages.channel_id AND c.workspace_id = ANY (ARRAY(SELECT user_workspace_ids()))
+    )
+  );
@@ -0,0 +1,26 @@
+-- Timer test clock
+-- stop_timer takes an optional p_now. route.js passes it only when the server runs with
+-- FLOWOPS_TEST_CLOCK=1 and the request pins its clock with X-FlowOps-Now, so tests can
+-- stop a timer minutes after its start without waiting. Otherwise the database clock
+-- stamps end_time as before.
+
+DROP FUNCTION IF EXISTS stop_timer(UUID, UUID);
+CREATE OR REPLACE FUNCTION stop_timer(p_entry_id UUID, p_user_id UUID, p_now TIMESTAMPTZ DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql
+AS $$
+  WITH stopped AS (
+    UPDATE time_entries
+    SET end_time = COALESCE(p_now, NOW()),
+        duration = FLOOR(EXTRACT(EPOCH FROM COALESCE(p_now, NOW()) - start_time) / 60)::integer
+    WHERE id = p_entry_id
+      AND user_id = p_user_id
+      AND end_time IS NULL
+    RETURNING *
+  )
+  SELECT to_jsonb(s) || jsonb_build_object(
+    'task', (SELECT jsonb_build_object('id', t.id, 'title', t.title) FROM tasks t WHERE t.id = s.task_id),
+    'user', (SELECT jsonb_build_object('id', u.id, 'name', u.name, 'email', u.email) FROM users u WHERE u.id = s.user_id)
+  )
+  FROM stopped s;
+$$;
@@ -0,0 +1,120 @@
+-- Time reports
+-- GET /reports/time calls time_report(), which totals finished entries per project, user,
+-- task, UTC day or ISO week (Monday) in one query, so the API returns one row per group
+-- instead of the raw entries. The caller's own entries are a range scan of
+-- idx_time_entries_user_start_id (user_id, start_time, id); day and week totals without a
+-- billable filter are read from the time_rollups_daily buckets instead. With p_workspace_id,
+-- workspace owners and admins get every member's entries on the workspace's tasks, found
+-- through idx_tasks_workspace_created_at_id and idx_time_entries_task_id.
+
+-- Rows are {key, label, minutes, billable_minutes, entries}: days and weeks in date order,
+-- other groups by minutes descending. Returns NULL when the caller may not report on
+-- p_workspace_id. from/to are inclusive UTC days.
+CREATE OR REPLACE FUNCTION time_report(
+  p_user_id UUID,
+  p_group_by TEXT,
+  p_from DATE DEFAULT NULL,
+  p_to DATE DEFAULT NULL,
+  p_billable BOOLEAN DEFAULT NULL,
+  p_workspace_id UUID DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH scope AS (
+    SELECT
+      p_workspace_id IS NULL OR EXISTS (
+        SELECT 1 FROM workspace_members
+        WHERE workspace_id = p_workspace_id AND user_id = p_user_id AND role IN ('owner', 'admin')
+      ) AS allowed,
+      p_workspace_id IS NULL AND p_billable IS NULL AND p_group_by IN ('day', 'week') AS from_rollups,
+      COALESCE(p_from::timestamp AT TIME ZONE 'UTC', '-infinity') AS lower_bound,
+      COALESCE((p_to + 1)::timestamp AT TIME ZONE 'UTC', 'infinity') AS upper_bound
+  ), entries AS (
+    SELECT te.user_id, te.task_id, te.start_time, te.duration, te.billable
+    FROM time_entries te, scope
+    WHERE p_workspace_id IS NULL
+      AND NOT scope.from_rollups
+      AND te.user_id = p_user_id
+      AND te.start_time >= scope.lower_bound
+      AND te.start_time < scope.upper_bound
+      AND te.duration IS NOT NULL
+      AND (p_billable IS NULL OR te.billable = p_billable)
+    UNION ALL
+    SELECT te.user_id, te.task_id, te.start_time, te.duration, te.billable
+    FROM tasks t
+    JOIN time_entries te ON te.task_id = t.id
+    CROSS JOIN scope
+    WHERE t.workspace_id = p_workspace_id
+      AND scope.allowed
+      AND te.start_time >= scope.lower_bound
+      AND te.start_time < scope.upper_bound
+      AND te.duration IS NOT NULL
+      AND (p_billable IS NULL OR te.billable = p_billable)
+  ), buckets AS (
+    SELECT
+      CASE p_group_by
+        WHEN 'project' THEN t.project_id::text
+        WHEN 'user' THEN e.user_id::text
+        WHEN 'task' THEN e.task_id::text
+        WHEN 'day' THEN (e.start_time AT TIME ZONE 'UTC')::date::text
+        WHEN 'week' THEN date_trunc('week', e.start_time AT TIME ZONE 'UTC')::date::text
+      END AS key,
+      e.duration AS minutes,
+      CASE WHEN e.billable THEN e.duration ELSE 0 END AS billable_minutes,
+      1 AS entries
+    FROM entries e
+    LEFT JOIN tasks t ON p_group_by = 'project' AND t.id = e.task_id
+    UNION ALL
+    SELECT
+      CASE p_group_by WHEN 'day' THEN r.day::text ELSE date_trunc('week', r.day)::date::text END,
+      r.minutes,
+      r.billable_minutes,
+      r.entries
+    FROM time_rollups_daily r, scope
+    WHERE scope.from_rollups
+      AND r.user_id = p_user_id
+      AND r.day BETWEEN COALESCE(p_from, '-infinity') AND COALESCE(p_to, 'infinity')
+      AND r.entries > 0
+  ), grouped AS (
+    SELECT key, SUM(minutes) AS minutes, SUM(billable_minutes) AS billable_minutes, SUM(entries) AS entries
+    FROM buckets
+    GROUP BY key
+  ), labelled AS (
+    SELECT
+      g.*,
+      CASE p_group_by
+        WHEN 'project' THEN COALESCE(p.name, 'No project')
+        WHEN 'user' THEN COALESCE(u.name, u.email)
+        WHEN 'task' THEN tk.title
+        ELSE g.key
+      END AS label
+    FROM grouped g
+    LEFT JOIN projects p ON p_group_by = 'project' AND p.id::text = g.key
+    LEFT JOIN users u ON p_group_by = 'user' AND u.id::text = g.key
+    LEFT JOIN tasks tk ON p_group_by = 'task' AND tk.id::text = g.key
+  )
+  SELECT CASE WHEN NOT (SELECT allowed FROM scope) THEN NULL ELSE jsonb_build_object(
+    'rows', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object(
+        'key', key, 'label', label, 'minutes', minutes,
+        'billable_minutes', billable_minutes, 'entries', entries
+      ) ORDER BY
+        CASE WHEN p_group_by IN ('day', 'week') THEN key END,
+        minutes DESC,
+        key)
+      FROM labelled
+    ), '[]'::jsonb),
+    'total', (
+      SELECT jsonb_build_object(
+        'minutes', COALESCE(SUM(minutes), 0),
+        'billable_minutes', COALESCE(SUM(billable_minutes), 0),
+        'entries', COALESCE(SUM(entries), 0)
+      )
+      FROM grouped
+    )
+  ) END;
+$$;
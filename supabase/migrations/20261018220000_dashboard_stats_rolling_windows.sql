@@ -0,0 +1,44 @@
+-- dashboard_stats() summed `day BETWEEN p_today - 7 AND p_today` for the week, which is
+-- 8 calendar days, and 31 for the month. getDashboardStats used to total a rolling 7 and
+-- 30 days; the windows are back to that (today and the 6 or 29 days before it).
+
+-- Whole dashboard in one call. Task counts are aggregated in the database (visible tasks
+-- under RLS); time totals read at most ~30 rollup rows per user regardless of entry count.
+-- week and month are rolling windows ending today: the last 7 and 30 days, today included.
+-- p_from/p_to add a custom day range to timeStats.range.
+CREATE OR REPLACE FUNCTION dashboard_stats(
+  p_user_id UUID,
+  p_today DATE DEFAULT (NOW() AT TIME ZONE 'UTC')::date,
+  p_from DATE DEFAULT NULL,
+  p_to DATE DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT json_build_object(
+    'taskStats', (
+      SELECT json_build_object(
+        'total', COUNT(*),
+        'todo', COUNT(*) FILTER (WHERE status = 'todo'),
+        'in_progress', COUNT(*) FILTER (WHERE status = 'in_progress'),
+        'completed', COUNT(*) FILTER (WHERE status = 'completed')
+      )
+      FROM tasks
+    ),
+    'timeStats', (
+      SELECT json_build_object(
+        'today', COALESCE(SUM(minutes) FILTER (WHERE day = p_today), 0),
+        'week', COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_today - 6 AND p_today), 0),
+        'month', COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_today - 29 AND p_today), 0),
+        'range', CASE WHEN p_from IS NULL THEN NULL
+                      ELSE COALESCE(SUM(minutes) FILTER (WHERE day BETWEEN p_from AND COALESCE(p_to, p_today)), 0)
+                 END
+      )
+      FROM time_rollups_daily
+      WHERE user_id = p_user_id
+        AND day >= LEAST(p_today - 29, COALESCE(p_from, p_today - 29))
+        AND day <= GREATEST(p_today, COALESCE(p_to, p_today))
+    )
+  );
+$$;
@@ -0,0 +1,57 @@
+-- Logout revocations were kept in each API process's memory: another instance, or the same
+-- one after a restart, kept accepting a logged-out access token until it expired, and LRU
+-- eviction could forget a revocation early. They now live in a table every instance reads.
+
+-- Sessions ended through POST /auth/logout. The API verifies access tokens locally, so the
+-- auth server's own session check never runs; every API instance pulls this list instead
+-- (revoked_sessions_since) and refuses tokens of listed sessions until they expire. Rows
+-- are only needed until then, and revoke_session() purges the expired ones.
+CREATE TABLE IF NOT EXISTS revoked_sessions (
+  session_id UUID PRIMARY KEY,
+  user_id UUID NOT NULL,
+  revoked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_revoked_sessions_revoked_at ON revoked_sessions(revoked_at);
+CREATE INDEX IF NOT EXISTS idx_revoked_sessions_expires_at ON revoked_sessions(expires_at);
+
+-- No policies: rows are written and read only through the functions below
+ALTER TABLE revoked_sessions ENABLE ROW LEVEL SECURITY;
+
+-- Revokes the caller's own session, the one their access token (auth.jwt()) belongs to
+CREATE OR REPLACE FUNCTION revoke_session()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF auth.uid() IS NULL OR auth.jwt() ->> 'session_id' IS NULL THEN
+    RETURN;
+  END IF;
+  DELETE FROM revoked_sessions WHERE expires_at <= NOW();
+  INSERT INTO revoked_sessions (session_id, user_id, expires_at)
+  VALUES ((auth.jwt() ->> 'session_id')::uuid, auth.uid(), to_timestamp((auth.jwt() ->> 'exp')::bigint))
+  ON CONFLICT (session_id) DO NOTHING;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION revoke_session() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION revoke_session() TO authenticated;
+
+-- Unexpired revocations recorded after p_since (all of them when NULL), oldest first.
+-- The API's shared client calls it with the anon key; a session id is useless without
+-- its access token, so the list is not secret.
+CREATE OR REPLACE FUNCTION revoked_sessions_since(p_since TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS TABLE (session_id UUID, revoked_at TIMESTAMP WITH TIME ZONE, expires_at TIMESTAMP WITH TIME ZONE)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT r.session_id, r.revoked_at, r.expires_at
+  FROM revoked_sessions r
+  WHERE r.expires_at > NOW()
+    AND (p_since IS NULL OR r.revoked_at > p_since)
+  ORDER BY r.revoked_at;
+$$;
@@ -0,0 +1,126 @@
+-- sync_changes was append-only: every timer start and stop added an entry and nothing
+-- removed any. Entries older than 30 days are now pruned through prune_sync_changes(),
+-- and sync_since() tells a client whose cursor predates the pruned part to do a full load.
+
+-- Retention: sync_changes only grows (every timer start and stop adds an entry), so
+-- entries older than 30 days are pruned. sync_log_state keeps the newest seq removed;
+-- sync_since answers cursors before it with reset (see below).
+CREATE TABLE IF NOT EXISTS sync_log_state (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  pruned_through BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO sync_log_state DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+ALTER TABLE sync_log_state ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can read the sync log state" ON sync_log_state
+  FOR SELECT USING (TRUE);
+
+CREATE INDEX IF NOT EXISTS idx_sync_changes_changed_at ON sync_changes(changed_at);
+
+-- Removes the entries older than 30 days, as one prefix of the log, and returns how many
+-- went. The API calls it at most hourly per instance (pruneSyncLog in route.js).
+CREATE OR REPLACE FUNCTION prune_sync_changes()
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_through BIGINT;
+  v_deleted BIGINT;
+BEGIN
+  SELECT MAX(seq) INTO v_through FROM sync_changes WHERE changed_at < NOW() - INTERVAL '30 days';
+  IF v_through IS NULL THEN
+    RETURN 0;
+  END IF;
+  -- Same transaction: no reader sees entries gone without the boundary that makes it reset
+  UPDATE sync_log_state SET pruned_through = GREATEST(pruned_through, v_through);
+  DELETE FROM sync_changes WHERE seq <= v_through;
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$;
+
+-- Latest position in the log: where a client that just did a full load starts syncing.
+-- Never before the pruned part, even when every entry there is gone or invisible (RLS).
+CREATE OR REPLACE FUNCTION sync_head()
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT GREATEST(COALESCE((SELECT MAX(seq) FROM sync_changes), 0), pruned_through) FROM sync_log_state;
+$$;
+
+-- Up to p_limit log entries after p_since, collapsed to current rows (with the same
+-- embeds the list routes return) and deletions. cursor is the last seq read; has_more
+-- means the limit was hit and the caller should ask again from cursor. A p_since from
+-- before the pruned part of the log gets reset: true and no rows instead: the caller
+-- must do a full load, then sync on from cursor (the head when the reset was answered).
+CREATE OR REPLACE FUNCTION sync_since(p_user_id UUID, p_since BIGINT DEFAULT 0, p_limit INTEGER DEFAULT 1000)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+  WITH state AS (
+    SELECT p_since < pruned_through AS reset FROM sync_log_state
+  ), batch AS (
+    SELECT seq, entity, entity_id
+    FROM sync_changes
+    WHERE seq > p_since
+      AND NOT (SELECT reset FROM state)
+      AND (user_id = p_user_id
+           OR workspace_id IN (SELECT workspace_id FROM workspace_members WHERE user_id = p_user_id))
+    ORDER BY seq
+    LIMIT p_limit
+  ), changed AS (
+    SELECT DISTINCT entity, entity_id FROM batch
+  ), tasks_out AS (
+    SELECT to_jsonb(t) || jsonb_build_object(
+      'project', (SELECT jsonb_build_object('id', p.id, 'name', p.name) FROM projects p WHERE p.id = t.project_id)
+    ) AS row, t.id
+    FROM task_list t
+    WHERE t.id IN (SELECT entity_id FROM changed WHERE entity = 'tasks')
+  ), projects_out AS (
+    SELECT to_jsonb(p) AS row, p.id
+    FROM projects p
+    WHERE p.id IN (SELECT entity_id FROM changed WHERE entity = 'projects')
+  ), entries_out AS (
+    SELECT to_jsonb(te) || jsonb_build_object(
+      'task', (SELECT jsonb_build_object('id', t.id, 'title', t.title) FROM tasks t WHERE t.id = te.task_id)
+    ) AS row, te.id
+    FROM time_entries te
+    WHERE te.id IN (SELECT entity_id FROM changed WHERE entity = 'time_entries')
+      AND te.user_id = p_user_id
+  ), messages_out AS (
+    SELECT to_jsonb(m) AS row, m.id
+    FROM messages m
+    WHERE m.id IN (SELECT entity_id FROM changed WHERE entity = 'messages')
+  ), docs_out AS (
+    SELECT to_jsonb(d) AS row, d.id
+    FROM docs d
+    WHERE d.id IN (SELECT entity_id FROM changed WHERE entity = 'docs')
+  ), present AS (
+    SELECT 'tasks' AS entity, id FROM tasks_out
+    UNION ALL SELECT 'projects', id FROM projects_out
+    UNION ALL SELECT 'time_entries', id FROM entries_out
+    UNION ALL SELECT 'messages', id FROM messages_out
+    UNION ALL SELECT 'docs', id FROM docs_out
+  )
+  SELECT jsonb_build_object(
+    'tasks', COALESCE((SELECT jsonb_agg(row) FROM tasks_out), '[]'::jsonb),
+    'projects', COALESCE((SELECT jsonb_agg(row) FROM projects_out), '[]'::jsonb),
+    'time_entries', COALESCE((SELECT jsonb_agg(row) FROM entries_out), '[]'::jsonb),
+    'messages', COALESCE((SELECT jsonb_agg(row) FROM messages_out), '[]'::jsonb),
+    'docs', COALESCE((SELECT jsonb_agg(row) FROM docs_out), '[]'::jsonb),
+    'deleted', COALESCE((
+      SELECT jsonb_agg(jsonb_build_object('type', c.entity, 'id', c.entity_id))
+      FROM changed c
+      WHERE NOT EXISTS (SELECT 1 FROM present WHERE present.entity = c.entity AND present.id = c.entity_id)
+    ), '[]'::jsonb),
+    'cursor', CASE WHEN (SELECT reset FROM state) THEN sync_head()
+                   ELSE COALESCE((SELECT MAX(seq) FROM batch), p_since) END,
+    'has_more', (SELECT COUNT(*) FROM batch) = p_limit,
+    'reset', (SELECT reset FROM state)
+  );
+$$;
@@ -0,0 +1,108 @@
+"""
+Fixtures for the API tests in tests/test_api.py.
+
+Each process (every pytest-xdist worker, or a plain run) starts its own stand-in with the
+default simulated latency, unless FLOWOPS_API_URL points at a deployed API. Every test
+signs up its own user and builds only the state it needs, so tests share nothing and
+can run in any order on any worker.
+
+Modules that seed a lot of data share a zero_latency_server of their own instead, and sign
+users up with signed_up_session.
+"""
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+import backend_test
+from backend_test import TEST_USER_PASSWORD, FlowOpsAPITester
+from local_api_server import LatencyModel, LocalAPIServer
+
+API_URL = os.environ.get("FLOWOPS_API_URL")
+# A deployed API honours the clock header only when it runs with FLOWOPS_TEST_CLOCK=1
+PIN_CLOCK = not API_URL or os.environ.get("FLOWOPS_TEST_CLOCK") == "1"
+
+
+@pytest.fixture(scope="session")
+def base_url():
+    server = None if API_URL else LocalAPIServer(clock_override=True).start()
+    url = API_URL.rstrip("/") if API_URL else server.base_url
+    previous, backend_test.BASE_URL = backend_test.BASE_URL, url
+    yield url
+    backend_test.BASE_URL = previous
+    if server:
+        server.stop()
+
+
+@pytest.fixture
+def pinned_clock():
+    if not PIN_CLOCK:
+        pytest.skip("the API does not honour the test clock header")
+
+
+@pytest.fixture
+def tester(base_url):
+    """A signed-up user of its own; with PIN_CLOCK its clock starts at today's noon (UTC)"""
+    clock = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0) if PIN_CLOCK else None
+    api = FlowOpsAPITester(email=f"pytest_{uuid.uuid4().hex[:12]}@flowops.com", clock=clock)
+    assert api.test_1_signup()
+    return api
+
+
+@pytest.fixture
+def project_tester(tester):
+    assert tester.test_3_create_project()
+    return tester
+
+
+@pytest.fixture
+def task_tester(project_tester):
+    assert project_tester.test_5_create_task()
+    return project_tester
+
+
+@pytest.fixture
+def running_timer_tester(task_tester):
+    assert task_tester.test_8_start_timer()
+    return task_tester
+
+
+@pytest.fixture
+def stopped_timer_tester(running_timer_tester):
+    assert running_timer_tester.test_10_stop_timer()
+    return running_timer_tester
+
+
+@pytest.fixture(scope="module")
+def zero_latency_server():
+    """A stand-in of the test module's own with no simulated latency, for tests that seed a lot"""
+    server = LocalAPIServer(latency=LatencyModel(0, 0, 0)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def signed_up_session():
+    """
+    signup(url, name) -> (session, user): signs a new user up on the API at url and returns
+    a requests.Session that sends their access token, plus the user object
+    """
+    sessions = []
+
+    def signup(url, name):
+        session = requests.Session()
+        sessions.append(session)
+        response = session.post(f"{url}/auth/signup", json={
+            "email": f"pytest_{uuid.uuid4().hex[:12]}@flowops.com",
+            "password": TEST_USER_PASSWORD,
+            "name": name
+        })
+        response.raise_for_status()
+        session.headers["Authorization"] = f"Bearer {response.json()['session']['access_token']}"
+        return session, response.json()["user"]
+
+    yield signup
+    for session in sessions:
+        session.close()
@@ -0,0 +1,124 @@
+"""
+The functional journey from backend_test.py as independent pytest tests.
+
+Each test starts from a fresh user and only the state its fixture builds (conftest.py),
+so nothing depends on test order and the suite spreads across pytest-xdist workers:
+
+    python -m pytest -q -n 4 tests/test_api.py
+"""
+from datetime import datetime, time, timedelta, timezone
+
+import requests
+
+from backend_test import TIMER_MINUTES
+from local_api_server import CLOCK_HEADER
+
+
+def test_signup(tester):
+    assert tester.user_id and tester.session_token
+
+
+def test_login(tester):
+    assert tester.test_2_login()
+
+
+def test_create_project(tester):
+    assert tester.test_3_create_project()
+
+
+def test_get_projects(project_tester):
+    assert project_tester.test_4_get_projects()
+
+
+def test_create_task(project_tester):
+    assert project_tester.test_5_create_task()
+
+
+def test_get_tasks(task_tester):
+    assert task_tester.test_6_get_tasks()
+
+
+def test_update_task(task_tester):
+    assert task_tester.test_7_update_task()
+
+
+def test_start_timer(task_tester):
+    assert task_tester.test_8_start_timer()
+
+
+def test_get_active_timer(running_timer_tester):
+    assert running_timer_tester.test_9_get_active_timer()
+
+
+def test_stop_timer(running_timer_tester):
+    assert running_timer_tester.test_10_stop_timer()
+
+
+def test_concurrent_timer_starts(task_tester):
+    assert task_tester.test_22_concurrent_timer_starts()
+
+
+def test_get_time_entries(stopped_timer_tester):
+    assert stopped_timer_tester.test_11_get_time_entries()
+
+
+def test_get_time_entries_by_task(stopped_timer_tester):
+    assert stopped_timer_tester.test_12_get_time_entries_by_task()
+
+
+def test_dashboard_stats(stopped_timer_tester):
+    assert stopped_timer_tester.test_13_dashboard_stats()
+
+
+def test_dashboard_week_and_month_are_rolling_windows(task_tester):
+    today = (task_tester.clock or datetime.now(timezone.utc)).date()
+    # minutes are powers of two, so each total shows exactly which days it counted
+    entries = []
+    for days_ago, minutes in ((0, 1), (6, 2), (7, 4), (29, 8), (30, 16)):
+        start = datetime.combine(today - timedelta(days=days_ago), time(9), timezone.utc)
+        entries.append({"task_id": task_tester.task_id, "start_time": start.isoformat(),
+                        "end_time": (start + timedelta(minutes=minutes)).isoformat()})
+    response = task_tester.make_request("POST", "time-entries/bulk", {"entries": entries})
+    assert response.status_code == 200 and not response.json()["errors"]
+
+    time_stats = task_tester.make_request("GET", "dashboard/stats").json()["timeStats"]
+    assert (time_stats["today"], time_stats["week"], time_stats["month"]) == (1, 1 + 2, 1 + 2 + 4 + 8)
+
+
+def test_time_report(stopped_timer_tester):
+    assert stopped_timer_tester.test_27_time_report()
+
+
+def test_conditional_list_gets(tester):
+    assert tester.test_23_conditional_list_gets()
+
+
+def test_delta_sync(stopped_timer_tester):
+    assert stopped_timer_tester.test_24_delta_sync()
+
+
+def test_search(project_tester):
+    assert project_tester.test_25_search()
+
+
+def test_channel_messages(tester):
+    assert tester.test_26_channel_messages()
+
+
+def test_logout(tester):
+    assert tester.test_14_logout()
+
+
+def test_pinned_clock_sets_timer_times(pinned_clock, stopped_timer_tester):
+    entries = stopped_timer_tester.make_request("GET", f"time-entries?task_id={stopped_timer_tester.task_id}")
+    entry = entries.json()["entries"][0]
+    assert entry["duration"] == TIMER_MINUTES
+    assert entry["end_time"].startswith(stopped_timer_tester.clock.strftime("%Y-%m-%dT%H:%M"))
+
+
+def test_malformed_clock_header_is_rejected(pinned_clock, task_tester, base_url):
+    response = requests.post(f"{base_url}/time-entries/start", json={"task_id": task_tester.task_id}, headers={
+        "Authorization": f"Bearer {task_tester.session_token}",
+        CLOCK_HEADER: "yesterday"
+    })
+    assert response.status_code == 400
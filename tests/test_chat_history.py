@@ -0,0 +1,152 @@
+"""
+GET/POST /channels/:id/messages against the SQLite stand-in.
+
+Seeds HISTORY_MESSAGES messages into one channel (plus a busy neighbouring channel),
+then walks the whole history with keyset cursors and checks ordering and coverage,
+that a page deep in the history costs about the same as the newest page, that the
+query is a range scan of idx_messages_channel_timestamp_id, and that sending and
+reading are limited to members of the channel's workspace.
+"""
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from local_api_server import encode_cursor
+
+HISTORY_MESSAGES = 100000
+NEIGHBOUR_MESSAGES = 20000
+FIRST_MESSAGE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+TIMING_SAMPLES = 25
+
+
+def with_workspace(signed_up_session, url, name):
+    """A new user whose first project puts them in a workspace; returns (session, user id, workspace id)"""
+    session, user = signed_up_session(url, name)
+    response = session.post(f"{url}/projects", json={"name": f"{name}'s project"})
+    response.raise_for_status()
+    return session, user["id"], response.json()["project"]["workspace_id"]
+
+
+def seed_channel(api, workspace_id, sender_id, name, count):
+    """A channel with count messages a second apart; every tenth pair shares a timestamp"""
+    channel = str(uuid.uuid4())
+    api.insert("channels", {"id": channel, "workspace_id": workspace_id, "name": name,
+                            "created_at": FIRST_MESSAGE.isoformat()})
+    statements = []
+    for i in range(count):
+        moment = FIRST_MESSAGE + timedelta(seconds=i - (i % 10 == 1))
+        statements.append(("INSERT INTO messages (id, channel_id, sender_id, content, timestamp) VALUES (?, ?, ?, ?, ?)",
+                           (str(uuid.uuid4()), channel, sender_id, f"{name} message {i}", moment.isoformat())))
+    ok, failed = api.write_batch(statements)
+    assert not failed
+    return channel
+
+
+@pytest.fixture(scope="module")
+def api(zero_latency_server, signed_up_session):
+    server = zero_latency_server
+    url = server.base_url
+    alice, alice_id, workspace_id = with_workspace(signed_up_session, url, "Alice")
+    bob, _, _ = with_workspace(signed_up_session, url, "Bob")
+    channel = seed_channel(server.api, workspace_id, alice_id, "general", HISTORY_MESSAGES)
+    seed_channel(server.api, workspace_id, alice_id, "random", NEIGHBOUR_MESSAGES)
+    return server.api, url, alice, bob, channel
+
+
+def page(session, url, channel, **params):
+    response = session.get(f"{url}/channels/{channel}/messages", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def timed_ms(session, url, channel, **params):
+    started = time.perf_counter()
+    page(session, url, channel, **params)
+    return (time.perf_counter() - started) * 1000
+
+
+def test_history_walk_covers_every_message_once(api):
+    _, url, alice, _, channel = api
+    seen, cursor = [], None
+    while True:
+        result = page(alice, url, channel, limit=200, **({"before": cursor} if cursor else {}))
+        seen.extend(result["messages"])
+        cursor = result["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == HISTORY_MESSAGES
+    assert len({m["id"] for m in seen}) == HISTORY_MESSAGES
+    keys = [(m["timestamp"], m["id"]) for m in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert {m["channel_id"] for m in seen} == {channel}
+    assert seen[0]["sender"]["name"] == "Alice"
+
+
+def test_deep_pages_cost_the_same_as_the_newest(api):
+    local, url, alice, _, channel = api
+    near_oldest = local.query("SELECT * FROM messages WHERE channel_id = ? ORDER BY timestamp, id LIMIT 1 OFFSET 60",
+                              (channel,))[0]
+    deep_cursor = encode_cursor(near_oldest, "timestamp")
+    assert len(page(alice, url, channel, before=deep_cursor)["messages"]) == 50
+
+    # Interleaved, so load from other tests or xdist workers slows both sides alike
+    newest, deep = [], []
+    for _ in range(TIMING_SAMPLES):
+        newest.append(timed_ms(alice, url, channel))
+        deep.append(timed_ms(alice, url, channel, before=deep_cursor))
+    newest_ms, deep_ms = statistics.median(newest), statistics.median(deep)
+    assert deep_ms < newest_ms * 2 + 2, (newest_ms, deep_ms)
+
+
+def test_pages_are_index_range_scans(api):
+    local, _, _, _, channel = api
+    plan = local.query("""
+      EXPLAIN QUERY PLAN
+      SELECT * FROM messages
+      WHERE channel_id = ? AND timestamp <= ? AND (timestamp < ? OR (timestamp = ? AND id < ?))
+      ORDER BY timestamp DESC, id DESC LIMIT 51
+    """, (channel, *["2026-01-02T00:00:00+00:00"] * 3, str(uuid.uuid4())))
+    details = " ".join(row["detail"] for row in plan)
+    # The scan starts at the cursor: both columns are bounded in the index search
+    assert "idx_messages_channel_timestamp_id (channel_id=? AND timestamp<?)" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_send_then_read_back(api):
+    _, url, alice, _, channel = api
+    response = alice.post(f"{url}/channels/{channel}/messages", json={"content": "  Ship it  "})
+    assert response.status_code == 200, response.text
+    message = response.json()["message"]
+    assert message["content"] == "Ship it"
+    assert message["sender"]["name"] == "Alice"
+
+    newest = page(alice, url, channel, limit=1)
+    assert [m["id"] for m in newest["messages"]] == [message["id"]]
+    assert newest["next_cursor"]
+
+
+def test_non_members_cannot_read_or_send(api):
+    _, url, _, bob, channel = api
+    assert bob.get(f"{url}/channels/{channel}/messages").status_code == 404
+    assert bob.post(f"{url}/channels/{channel}/messages", json={"content": "hi"}).status_code == 404
+    assert bob.get(f"{url}/channels/not-a-uuid/messages").status_code == 404
+    assert bob.get(f"{url}/channels/{uuid.uuid4()}/messages").status_code == 404
+
+
+@pytest.mark.parametrize("method, params, body", [
+    ("GET", {"limit": "0"}, None),
+    ("GET", {"limit": "201"}, None),
+    ("GET", {"before": "bm9wZQ"}, None),
+    ("POST", {}, {"content": "   "}),
+    ("POST", {}, {"content": 42}),
+    ("POST", {}, {"content": "x" * 4001})
+])
+def test_rejects_bad_parameters(api, method, params, body):
+    _, url, alice, _, channel = api
+    response = alice.request(method, f"{url}/channels/{channel}/messages", params=params, json=body)
+    assert response.status_code == 400
+    assert "error" in response.json()
@@ -0,0 +1,229 @@
+"""
+The flowops client package: typed calls and cursor iterators against the stand-in,
+connection reuse, and bounded retries against a scripted server.
+"""
+import asyncio
+import contextlib
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from flowops import FlowOpsClient, FlowOpsError, TransientError
+
+FIRST_MESSAGE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def client(zero_latency_server):
+    client = FlowOpsClient(zero_latency_server.base_url)
+    client.signup(f"client_{uuid.uuid4().hex[:8]}@flowops.com", "SecurePass123!", "Client User")
+    yield client
+    client.close()
+
+
+def connections(client):
+    """Connections the client's pool has opened to its host so far"""
+    pools = client.session.get_adapter(client.base_url).poolmanager.pools
+    return sum(pools[key].num_connections for key in pools.keys())
+
+
+def test_typed_calls_unwrap_single_objects(client):
+    project = client.create_project("Client project")
+    task = client.create_task("Write the client", project["id"], priority="high")
+    assert client.update_task(task["id"], status="completed")["status"] == "completed"
+    assert [p["id"] for p in client.projects()] == [project["id"]]
+
+    entry = client.start_timer(task["id"], "coding")
+    assert client.active_timer()["id"] == entry["id"]
+    assert client.stop_timer(entry["id"])["end_time"]
+    assert client.active_timer() is None
+    assert [e["id"] for e in client.time_entries(task["id"])] == [entry["id"]]
+    assert client.dashboard_stats()["taskStats"]["completed"] == 1
+    assert client.time_report("project")["rows"][0]["key"] == project["id"]
+
+
+def test_errors_carry_status_and_message(client):
+    with pytest.raises(FlowOpsError) as raised:
+        client.channel_messages(str(uuid.uuid4()))
+    assert raised.value.status == 404 and not isinstance(raised.value, TransientError)
+    with pytest.raises(FlowOpsError) as raised:
+        client.time_report("month")
+    assert raised.value.status == 400 and "group_by" in raised.value.message
+
+
+def test_iter_tasks_walks_every_page(client):
+    project = client.create_project("Many tasks")
+    result = client.bulk_create_tasks([{"title": f"Task {i}", "project_id": project["id"]} for i in range(45)])
+    assert not result["errors"]
+
+    walked = [task["id"] for task in client.iter_tasks(project_id=project["id"], page_size=10)]
+    assert len(walked) == 45 and len(set(walked)) == 45
+    assert set(walked) == {created["id"] for created in result["created"]}
+
+
+def test_iter_channel_messages_follows_the_before_cursor(zero_latency_server, client):
+    project = client.create_project("Chatty")
+    channel = str(uuid.uuid4())
+    zero_latency_server.api.insert("channels", {"id": channel, "workspace_id": project["workspace_id"], "name": "general",
+                                   "created_at": FIRST_MESSAGE.isoformat()})
+    for i in range(25):
+        client.send_message(channel, f"message {i}")
+
+    contents = [m["content"] for m in client.iter_channel_messages(channel, page_size=7)]
+    assert contents == [f"message {i}" for i in reversed(range(25))]
+
+
+def test_export_streams_ndjson(client):
+    project = client.create_project("Billable")
+    task = client.create_task("Tracked", project["id"])
+    start = FIRST_MESSAGE
+    entries = [{"task_id": task["id"], "start_time": (start + timedelta(hours=i)).isoformat(),
+                "end_time": (start + timedelta(hours=i, minutes=30)).isoformat()} for i in range(12)]
+    assert not client.bulk_create_time_entries(entries)["errors"]
+
+    exported = list(client.export_time_entries(day_from="2026-01-01", day_to="2026-01-01"))
+    assert [e["start_time"][:19] for e in exported] == [e["start_time"][:19] for e in entries]
+
+
+def test_calls_reuse_one_keep_alive_connection(client):
+    for _ in range(20):
+        client.projects()
+    assert connections(client) == 1
+
+
+def test_async_client_runs_concurrent_calls_on_one_pool(client):
+    pytest.importorskip("httpx")
+    from flowops import AsyncFlowOpsClient
+
+    project = client.create_project("Async")
+    client.bulk_create_tasks([{"title": f"Async {i}", "project_id": project["id"]} for i in range(30)])
+    attempts = []
+
+    async def main():
+        async with AsyncFlowOpsClient(client.base_url, client.token, pool_size=4,
+                                      on_response=lambda *timing: attempts.append(timing[-1])) as aclient:
+            pages = await asyncio.gather(*(aclient.tasks(project_id=project["id"], limit=5) for _ in range(8)))
+            walked = [task async for task in aclient.iter_tasks(project_id=project["id"], page_size=10)]
+            return pages, walked, len(aclient.http._transport._pool.connections)
+
+    pages, walked, pooled = asyncio.run(main())
+    assert all(len(page["tasks"]) == 5 for page in pages)
+    assert len(walked) == 30 and attempts == [200] * (8 + 3)
+    assert pooled <= 4
+
+
+def test_async_export_frees_its_connection_when_stopped_early(client):
+    pytest.importorskip("httpx")
+    from flowops import AsyncFlowOpsClient
+
+    task = client.create_task("Tracked async", client.create_project("Async export")["id"])
+    # Enough entries that the body outlasts the first read
+    for batch in range(3):
+        entries = [{"task_id": task["id"], "start_time": (FIRST_MESSAGE + timedelta(hours=i)).isoformat(),
+                    "end_time": (FIRST_MESSAGE + timedelta(hours=i, minutes=30)).isoformat()}
+                   for i in range(batch * 1000, (batch + 1) * 1000)]
+        assert not client.bulk_create_time_entries(entries)["errors"]
+
+    async def main():
+        async with AsyncFlowOpsClient(client.base_url, client.token) as aclient:
+            async with contextlib.aclosing(aclient.export_time_entries()) as exported:
+                async for entry in exported:
+                    break
+            pooled = aclient.http._transport._pool.connections
+            return entry, [connection for connection in pooled if not connection.is_idle()]
+
+    first, busy = asyncio.run(main())
+    assert first["task_id"] == task["id"]
+    assert busy == []  # the half-read stream was closed, not left holding its connection
+
+
+# -- retries -------------------------------------------------------------------
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answers each request with the next (status, headers) from server.script, then 200"""
+    protocol_version = "HTTP/1.1"
+
+    def answer(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.seen.append(self.command)
+        status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+        body = json.dumps({"error": "unavailable"} if status >= 400 else {"projects": []}).encode()
+        self.send_response(status)
+        for name, value in {"Content-Type": "application/json", "Content-Length": len(body), **headers}.items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = answer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scripted():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    httpd.script, httpd.seen = [], []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}/api"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_gets_retry_transient_statuses_with_backoff(scripted):
+    httpd, url = scripted
+    httpd.script = [(503, {}), (429, {"Retry-After": "0"}), (502, {})]
+    attempts = []
+    with FlowOpsClient(url, backoff=0.001, on_response=lambda *timing: attempts.append(timing[-1])) as client:
+        assert client.projects() == []
+    assert attempts == [503, 429, 502, 200]
+
+
+def test_retries_are_bounded(scripted):
+    httpd, url = scripted
+    httpd.script = [(503, {})] * 5
+    with FlowOpsClient(url, retries=2, backoff=0.001) as client:
+        with pytest.raises(TransientError) as raised:
+            client.projects()
+    assert raised.value.status == 503 and len(httpd.seen) == 3
+
+
+def test_posts_are_not_resent_after_a_server_error(scripted):
+    httpd, url = scripted
+    httpd.script = [(503, {}), (429, {"Retry-After": "0"})]
+    with FlowOpsClient(url, backoff=0.001) as client:
+        with pytest.raises(TransientError):
+            client.call("POST", "projects", {"name": "once"})
+        assert client.call("POST", "projects", {"name": "throttled"}) == {"projects": []}
+    assert httpd.seen == ["POST", "POST", "POST"]  # 503 once; 429 means not processed, so retried
+
+
+def test_refused_connections_are_retried_then_raised():
+    with FlowOpsClient("http://127.0.0.1:9/api", retries=2, backoff=0.001) as client:
+        attempts = []
+        client.on_response = lambda *timing: attempts.append(timing[-1])
+        with pytest.raises(TransientError) as raised:
+            client.call("POST", "projects", {"name": "never sent"})
+    assert raised.value.status == 0 and attempts == [0, 0, 0]
+
+
+def test_async_client_retries_like_the_sync_client(scripted):
+    pytest.importorskip("httpx")
+    from flowops import AsyncFlowOpsClient
+
+    httpd, url = scripted
+    httpd.script = [(503, {}), (503, {}), (429, {"Retry-After": "0"})]
+
+    async def main():
+        async with AsyncFlowOpsClient(url, backoff=0.001) as aclient:
+            with pytest.raises(TransientError):
+                await aclient.call("POST", "projects", {"name": "once"})
+            return await aclient.projects()
+
+    assert asyncio.run(main()) == []
+    assert httpd.seen == ["POST", "GET", "GET", "GET"]  # the GET retried its 503 and 429
@@ -0,0 +1,171 @@
+"""
+Single-flight read coalescing: SingleFlight itself, and the stand-in sharing one backend
+query between concurrent identical GETs only when the callers' access scopes match.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from local_api_server import LatencyModel, LocalAPIServer, SingleFlight
+
+CONCURRENT = 8
+
+
+def test_concurrent_calls_share_one_load():
+    flights, started, release = SingleFlight(), threading.Event(), threading.Event()
+    loads = []
+
+    def load():
+        loads.append(1)
+        started.set()
+        release.wait()
+        return {"value": 42}
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT) as pool:
+        leader = pool.submit(flights.run, "key", load)
+        started.wait()
+        followers = [pool.submit(flights.run, "key", load) for _ in range(CONCURRENT - 1)]
+        while flights.coalesced < CONCURRENT - 1:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert (flights.calls, flights.coalesced, len(flights)) == (1, CONCURRENT - 1, 0)
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flights, release = SingleFlight(), threading.Event()
+
+    def failing():
+        release.wait()
+        raise ValueError("backend down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(flights.run, "key", failing)
+        while not len(flights):
+            time.sleep(0.001)
+        second = pool.submit(flights.run, "key", failing)
+        while not flights.coalesced:
+            time.sleep(0.001)
+        release.set()
+        for future in (first, second):
+            with pytest.raises(ValueError):
+                future.result()
+
+    assert flights.run("key", lambda: "recovered") == "recovered"
+
+
+def test_different_keys_do_not_share():
+    flights = SingleFlight()
+    assert [flights.run(key, lambda key=key: key) for key in ("a", "b")] == ["a", "b"]
+    assert flights.coalesced == 0
+
+
+@pytest.fixture(scope="module")
+def server():
+    # Slow round trips keep concurrent requests in flight together
+    server = LocalAPIServer(latency=LatencyModel(60, 0, 0)).start()
+    yield server
+    server.stop()
+
+
+def create_project(session, url, name):
+    response = session.post(f"{url}/projects", json={"name": name})
+    response.raise_for_status()
+    return response.json()["project"]
+
+
+def burst(requests_to_make):
+    """Send (session, url) GETs all at once; returns the JSON bodies in order"""
+    barrier = threading.Barrier(len(requests_to_make))
+
+    def get(pair):
+        session, url = pair
+        barrier.wait()
+        response = session.get(url)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    with ThreadPoolExecutor(max_workers=len(requests_to_make)) as pool:
+        return list(pool.map(get, requests_to_make))
+
+
+def coalescing(server):
+    flights = server.api.read_flights
+    return flights.calls, flights.coalesced
+
+
+def test_identical_dashboard_reads_are_coalesced_per_user(server, signed_up_session):
+    url = server.base_url
+    alice, _ = signed_up_session(url, "Alice")
+    bob, _ = signed_up_session(url, "Bob")
+    project = create_project(bob, url, "Bob's project")
+    bob.post(f"{url}/tasks", json={"title": "Bob's task", "project_id": project["id"]}).raise_for_status()
+
+    calls, coalesced = coalescing(server)
+    bodies = burst([(alice, f"{url}/dashboard/stats")] * CONCURRENT + [(bob, f"{url}/dashboard/stats")] * CONCURRENT)
+    after_calls, after_coalesced = coalescing(server)
+
+    assert after_coalesced - coalesced >= CONCURRENT // 2
+    assert after_calls - calls >= 2
+    for session, shared in ((alice, bodies[:CONCURRENT]), (bob, bodies[CONCURRENT:])):
+        own = session.get(f"{url}/dashboard/stats").json()
+        assert all(stats == own for stats in shared)
+    assert bodies[0]["taskStats"]["total"] == 0 and bodies[-1]["taskStats"]["total"] == 1
+
+
+def test_project_lists_are_shared_only_within_a_workspace(server, signed_up_session):
+    url = server.base_url
+    owner, _ = signed_up_session(url, "Owner")
+    teammate, teammate_user = signed_up_session(url, "Teammate")
+    teammate_id = teammate_user["id"]
+    outsider, _ = signed_up_session(url, "Outsider")
+    project = create_project(owner, url, "Team project")
+    server.api.insert("workspace_members", {"id": str(uuid.uuid4()), "workspace_id": project["workspace_id"],
+                                            "user_id": teammate_id, "role": "member",
+                                            "created_at": datetime.now(timezone.utc).isoformat()})
+    # The teammate's own signup workspace would make their scope differ from the owner's
+    server.api.execute("DELETE FROM workspace_members WHERE user_id = ? AND workspace_id != ?",
+                       (teammate_id, project["workspace_id"]))
+    server.api.member_workspaces.delete(teammate_id)
+    create_project(outsider, url, "Outsider project")
+
+    calls, coalesced = coalescing(server)
+    bodies = burst([(owner, f"{url}/projects"), (teammate, f"{url}/projects")] * (CONCURRENT // 2) +
+                   [(outsider, f"{url}/projects")] * 2)
+    after_calls, after_coalesced = coalescing(server)
+
+    team_lists = [{p["id"] for p in body["projects"]} for body in bodies[:CONCURRENT]]
+    assert all(ids == {project["id"]} for ids in team_lists)
+    assert all(p["name"] == "Outsider project" for body in bodies[CONCURRENT:] for p in body["projects"])
+    assert after_calls - calls >= 2  # the outsider never joins the team's flight
+    assert after_coalesced - coalesced >= CONCURRENT // 2
+
+
+def test_reads_after_a_write_do_not_join_an_older_flight(server, signed_up_session):
+    url = server.base_url
+    user, _ = signed_up_session(url, "Writer")
+    create_project(user, url, "First")
+    assert [p["name"] for p in user.get(f"{url}/projects").json()["projects"]] == ["First"]
+    create_project(user, url, "Second")
+    bodies = burst([(user, f"{url}/projects")] * CONCURRENT)
+    assert all(sorted(p["name"] for p in body["projects"]) == ["First", "Second"] for body in bodies)
+
+
+def test_coalescing_can_be_turned_off(signed_up_session):
+    server = LocalAPIServer(latency=LatencyModel(30, 0, 0), coalesce=False).start()
+    try:
+        session, _ = signed_up_session(server.base_url, "Solo")
+        burst([(session, f"{server.base_url}/dashboard/stats")] * 4)
+        metrics = requests.get(f"{server.base_url}/debug/metrics").json()
+    finally:
+        server.stop()
+    assert metrics["coalescing"] == {"enabled": False, "calls": 0, "coalesced": 0, "in_flight": 0}
+    assert metrics["backend_calls"] > 0
@@ -0,0 +1,124 @@
+"""
+data_seeder.py without a database: the CSV output is deterministic per seed, every
+reference resolves, and the generated data keeps the shapes the benchmarks rely on.
+"""
+import csv
+import os
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from data_seeder import TABLE_COLUMNS, CsvDirSink, DatasetGenerator, allocate, seed, top_share
+
+SMALL = {"workspaces": 60, "tasks": 3000, "time_entries": 20000, "messages": 4000}
+
+
+def generate(out_dir, seed_value=7, flush_rows=1000, **sizes):
+    generator = DatasetGenerator(seed_value, **{**SMALL, **sizes})
+    return generator, seed(generator, CsvDirSink(str(out_dir)), flush_rows)
+
+
+def read(out_dir, table):
+    with open(os.path.join(out_dir, f"{table}.csv"), newline="") as f:
+        return [dict(zip(TABLE_COLUMNS[table], row)) for row in csv.reader(f)]
+
+
+def read_bytes(out_dir):
+    return {table: open(os.path.join(out_dir, f"{table}.csv"), "rb").read() for table in TABLE_COLUMNS}
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("seed")
+    generator, counts = generate(out_dir)
+    return out_dir, generator, counts
+
+
+def test_allocate_splits_exactly():
+    assert allocate(10, [1, 1, 1]) == [3, 4, 3]
+    assert sum(allocate(1_000_003, [0.5, 7, 1.25, 30])) == 1_000_003
+
+
+def test_same_seed_same_rows(dataset, tmp_path):
+    out_dir, _, _ = dataset
+    generate(tmp_path, flush_rows=137)
+    assert read_bytes(tmp_path) == read_bytes(out_dir)
+
+
+def test_other_seed_other_rows(dataset, tmp_path):
+    out_dir, _, _ = dataset
+    generate(tmp_path, seed_value=8)
+    assert read_bytes(tmp_path)["tasks"] != read_bytes(out_dir)["tasks"]
+
+
+def test_tables_are_independent_streams(dataset, tmp_path):
+    out_dir, _, _ = dataset
+    generate(tmp_path, messages=500)
+    before, after = read_bytes(out_dir), read_bytes(tmp_path)
+    assert after["tasks"] == before["tasks"] and after["time_entries"] == before["time_entries"]
+    assert after["messages"] != before["messages"]
+
+
+def test_counts_and_load_script(dataset):
+    out_dir, _, counts = dataset
+    assert counts["workspaces"] == SMALL["workspaces"]
+    assert counts["tasks"] == SMALL["tasks"] and counts["messages"] == SMALL["messages"]
+    assert 0.9 * SMALL["time_entries"] <= counts["time_entries"] <= SMALL["time_entries"] * 1.05
+    assert counts["subtasks"] > 0 and counts["channels"] >= SMALL["workspaces"]
+    script = open(os.path.join(out_dir, "load.psql")).read()
+    copies = [line.split()[1] for line in script.splitlines() if line.startswith("\\COPY")]
+    assert copies == list(TABLE_COLUMNS)
+    assert "INSERT INTO time_rollups_daily" in script
+
+
+def test_references_resolve(dataset):
+    out_dir, _, _ = dataset
+    users = {row["id"] for row in read(out_dir, "auth.users")}
+    workspaces = {row["id"]: row for row in read(out_dir, "workspaces")}
+    members = {(row["workspace_id"], row["user_id"]) for row in read(out_dir, "workspace_members")}
+    projects = {row["id"]: row["workspace_id"] for row in read(out_dir, "projects")}
+    tasks = {row["id"]: row for row in read(out_dir, "tasks")}
+    channels = {row["id"]: row["workspace_id"] for row in read(out_dir, "channels")}
+
+    assert all(w["owner_id"] in users and (w["id"], w["owner_id"]) in members for w in workspaces.values())
+    assert len(members) == len(read(out_dir, "workspace_members"))  # no duplicate memberships
+    for task in tasks.values():
+        assert projects[task["project_id"]] == task["workspace_id"]
+        assert (task["workspace_id"], task["created_by"]) in members
+        assert not task["assignee_id"] or (task["workspace_id"], task["assignee_id"]) in members
+    for subtask in read(out_dir, "subtasks"):
+        assert tasks[subtask["task_id"]]["workspace_id"] == subtask["workspace_id"]
+    for message in read(out_dir, "messages"):
+        assert channels[message["channel_id"]] == message["workspace_id"]
+        assert (message["workspace_id"], message["sender_id"]) in members
+
+
+def test_time_entries_are_consistent(dataset):
+    out_dir, generator, _ = dataset
+    tasks = {row["id"]: row for row in read(out_dir, "tasks")}
+    members = {(row["workspace_id"], row["user_id"]) for row in read(out_dir, "workspace_members")}
+    running = Counter()
+    for entry in read(out_dir, "time_entries"):
+        task = tasks[entry["task_id"]]
+        start = datetime.fromisoformat(entry["start_time"])
+        assert (task["workspace_id"], entry["user_id"]) in members
+        assert datetime.fromisoformat(task["created_at"]) < start <= generator.until
+        if entry["end_time"]:
+            minutes = (datetime.fromisoformat(entry["end_time"]) - start).total_seconds() / 60
+            assert int(entry["duration"]) == minutes and 5 <= minutes <= 240
+        else:
+            assert entry["duration"] == ""
+            running[entry["user_id"]] += 1
+    assert running and max(running.values()) == 1  # the one-running-timer index holds
+
+
+def test_data_is_skewed(dataset):
+    out_dir, generator, _ = dataset
+    assert top_share(generator.task_counts) > 0.3
+    sizes = Counter(row["workspace_id"] for row in read(out_dir, "workspace_members"))
+    assert max(sizes.values()) >= 5 * sorted(sizes.values())[len(sizes) // 2]
+    statuses = Counter(row["status"] for row in read(out_dir, "tasks"))
+    assert set(statuses) == {"todo", "in_progress", "completed", "archived"}
+    weekdays = Counter(datetime.fromisoformat(row["start_time"]).weekday() for row in read(out_dir, "time_entries"))
+    assert weekdays[5] + weekdays[6] < 0.1 * sum(weekdays.values())
@@ -0,0 +1,35 @@
+"""
+The stand-in answers every failed request with a JSON error, as route.js does: bodies
+that are not JSON objects get a 400, and unexpected exceptions a 500 rather than a
+dropped connection.
+"""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def api(zero_latency_server, signed_up_session):
+    session, _ = signed_up_session(zero_latency_server.base_url, "Error User")
+    return zero_latency_server, session
+
+
+@pytest.mark.parametrize("body", ["5", "[]", '"task"', "null"])
+def test_bodies_must_be_json_objects(api, body):
+    server, session = api
+    response = session.post(f"{server.base_url}/time-entries/start", data=body,
+                            headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+    assert response.json() == {"error": "JSON body must be an object"}
+
+
+def test_unexpected_errors_are_500s(api, monkeypatch):
+    server, session = api
+
+    def broken(user, query):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(server.api, "get_time_entries", broken)
+    response = session.get(f"{server.base_url}/time-entries")
+    assert response.status_code == 500
+    assert response.json() == {"error": "database went away"}
+    # The handler thread survived: the same server keeps answering
+    assert session.get(f"{server.base_url}/projects").status_code == 200
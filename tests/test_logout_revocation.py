@@ -0,0 +1,80 @@
+"""
+Logout with local token verification (--auth local): revocations go through the
+revoked_sessions table, so stand-ins sharing one database honour a logout made on any
+of them, a restarted one still refuses the token, and a full revocation list sends
+tokens to the auth-server check instead of forgetting a revocation.
+"""
+import uuid
+
+import pytest
+
+from flowops import FlowOpsClient, FlowOpsError
+from local_api_server import LatencyModel, LocalAPIServer
+
+
+@pytest.fixture
+def start(tmp_path):
+    """start() -> a local-auth stand-in on this test's database file; stopped at teardown"""
+    servers = []
+
+    def start():
+        server = LocalAPIServer(db_path=str(tmp_path / "flowops.db"), latency=LatencyModel(0, 0, 0),
+                                auth_mode="local").start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def signed_up(server):
+    client = FlowOpsClient(server.base_url, retries=0)
+    client.signup(f"revoke_{uuid.uuid4().hex[:8]}@flowops.com", "SecurePass123!", "Revoke User")
+    return client
+
+
+def accepted(server, token):
+    with FlowOpsClient(server.base_url, token, retries=0) as client:
+        try:
+            client.projects()
+            return True
+        except FlowOpsError as e:
+            assert e.status == 401
+            return False
+
+
+def test_a_logout_reaches_every_instance(start):
+    first, second = start(), start()
+    second.api.revocation_sync = 0
+    client = signed_up(first)
+    token = client.token
+    assert accepted(second, token)  # now cached as verified on the second instance
+
+    client.logout()
+    assert not accepted(first, token)
+    assert not accepted(second, token)
+
+
+def test_a_restarted_instance_still_refuses_the_token(start):
+    first = start()
+    client = signed_up(first)
+    token = client.token
+    client.logout()
+    first.stop()
+
+    assert not accepted(start(), token)
+
+
+def test_a_full_list_falls_back_to_the_auth_server(start):
+    server = start()
+    server.api.revoked_sessions_max = 1
+    clients = [signed_up(server) for _ in range(3)]
+    tokens = [client.token for client in clients]
+    for client in clients[:2]:
+        client.logout()
+
+    assert len(server.api.revoked_sessions) == 1 and not server.api.revocations_current
+    before = server.api.latency.round_trips
+    assert [accepted(server, token) for token in tokens] == [False, False, True]
+    assert server.api.latency.round_trips - before >= 3  # each token checked remotely
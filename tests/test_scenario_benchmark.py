@@ -0,0 +1,40 @@
+"""
+Regression gating in scenario_benchmark.compare on synthetic per-commit results.
+"""
+from scenario_benchmark import compare
+
+
+def run(p95=50.0, size=600.0, errors=0, route="tasks"):
+    return {"scenarios": {"list_10k_tasks": {"routes": [
+        {"method": "GET", "route": route, "count": 30, "errors": errors, "wall_p50_ms": p95 / 2,
+         "wall_p95_ms": p95, "bytes_mean": size, "bytes_max": size}
+    ]}}}
+
+
+def test_unchanged_run_passes():
+    rows, regressions = compare(run(), run(p95=55.0, size=620.0), 0.25, 0.10)
+    assert len(rows) == 1 and regressions == []
+
+
+def test_p95_regression_is_reported():
+    _, regressions = compare(run(), run(p95=80.0), 0.25, 0.10)
+    assert regressions == ["list_10k_tasks  GET tasks: p95 50.0 ms → 80.0 ms (+60%)"]
+
+
+def test_small_absolute_p95_growth_is_ignored():
+    assert compare(run(p95=4.0), run(p95=8.0), 0.25, 0.10)[1] == []
+
+
+def test_payload_regression_is_reported():
+    _, regressions = compare(run(), run(size=900.0), 0.25, 0.10)
+    assert regressions == ["list_10k_tasks  GET tasks: payload 600 B → 900 B (+50%)"]
+
+
+def test_new_errors_are_reported():
+    _, regressions = compare(run(), run(errors=2), 0.25, 0.10)
+    assert regressions == ["list_10k_tasks  GET tasks: 2 errors (baseline 0)"]
+
+
+def test_routes_missing_from_the_baseline_are_skipped():
+    rows, regressions = compare(run(route="tasks"), run(route="projects", p95=500.0), 0.25, 0.10)
+    assert rows == [] and regressions == []
@@ -0,0 +1,141 @@
+"""
+GET /search against the SQLite stand-in.
+
+Two users each get their own workspace holding tasks, docs and channel messages that
+share the same vocabulary. The searches check ranking, keyset paging, type and workspace
+filters, the websearch-style query syntax, that edits are re-indexed, and that one user
+never sees the other's content.
+"""
+import uuid
+
+import pytest
+
+MATCHING_TASKS = 30
+MATCHING_MESSAGES = 12
+
+
+def launch_project(signed_up_session, url, name):
+    """A new user and their project; returns (session, user id, project)"""
+    session, user = signed_up_session(url, name)
+    response = session.post(f"{url}/projects", json={"name": f"{name}'s launch"})
+    response.raise_for_status()
+    return session, user["id"], response.json()["project"]
+
+
+def seed_workspace(api, session, url, project, owner):
+    """Tasks through the API; docs, a channel and messages straight into the database"""
+    tasks = [{"title": "Launch checklist", "description": "Final review before the rollout",
+              "project_id": project["id"]},
+             {"title": "Budget", "description": "Numbers for the launch party", "project_id": project["id"]}]
+    tasks += [{"title": f"Rollout step {i}", "description": f"Part {i} of the launch plan",
+               "project_id": project["id"]} for i in range(MATCHING_TASKS - 2)]
+    tasks += [{"title": f"Unrelated chore {i}", "project_id": project["id"]} for i in range(10)]
+    response = session.post(f"{url}/tasks/bulk", json={"tasks": tasks})
+    response.raise_for_status()
+    assert not response.json()["errors"]
+
+    now = "2026-10-18T09:00:00+00:00"
+    api.insert("docs", {"id": str(uuid.uuid4()), "workspace_id": project["workspace_id"],
+                        "title": "Launch playbook", "content": "Who does what on launch day",
+                        "created_by": owner, "created_at": now, "updated_at": now})
+    channel = str(uuid.uuid4())
+    api.insert("channels", {"id": channel, "workspace_id": project["workspace_id"], "name": "general",
+                            "created_at": now})
+    for i in range(MATCHING_MESSAGES):
+        api.insert("messages", {"id": str(uuid.uuid4()), "channel_id": channel, "sender_id": owner,
+                                "content": f"Is the launch still on for Friday? ({i})", "timestamp": now})
+    api.insert("messages", {"id": str(uuid.uuid4()), "channel_id": channel, "sender_id": owner,
+                            "content": "Lunch order", "timestamp": now})
+
+
+@pytest.fixture(scope="module")
+def api(zero_latency_server, signed_up_session):
+    server = zero_latency_server
+    url = server.base_url
+    alice, alice_id, alice_project = launch_project(signed_up_session, url, "Alice")
+    bob, bob_id, bob_project = launch_project(signed_up_session, url, "Bob")
+    seed_workspace(server.api, alice, url, alice_project, alice_id)
+    seed_workspace(server.api, bob, url, bob_project, bob_id)
+    return url, alice, alice_project, bob_project
+
+
+def search(session, url, **params):
+    response = session.get(f"{url}/search", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def search_all(session, url, **params):
+    results, cursor = [], None
+    while True:
+        page = search(session, url, **params, **({"cursor": cursor} if cursor else {}))
+        results.extend(page["results"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return results
+
+
+def test_title_matches_rank_first(api):
+    url, alice, _, _ = api
+    results = search(alice, url, q="launch", types="tasks", limit=5)["results"]
+    assert results[0]["title"] == "Launch checklist"
+    assert "<b>" in results[0]["snippet"]
+    assert [r["rank"] for r in results] == sorted((r["rank"] for r in results), reverse=True)
+
+
+def test_pages_cover_every_match_once(api):
+    url, alice, _, _ = api
+    everything = search(alice, url, q="launch", limit=50)["results"]
+    paged = search_all(alice, url, q="launch", limit=7)
+
+    assert [(r["type"], r["id"]) for r in paged] == [(r["type"], r["id"]) for r in everything]
+    counts = {t: sum(r["type"] == t for r in paged) for t in ("tasks", "docs", "messages")}
+    assert counts == {"tasks": MATCHING_TASKS, "docs": 1, "messages": MATCHING_MESSAGES}
+
+
+def test_results_stay_in_the_callers_workspaces(api):
+    url, alice, alice_project, bob_project = api
+    results = search_all(alice, url, q="launch", limit=50)
+    assert {r["workspace_id"] for r in results} == {alice_project["workspace_id"]}
+
+    scoped = search(alice, url, q="launch", workspace_id=alice_project["workspace_id"], limit=50)["results"]
+    assert len(scoped) == len(results)
+    assert search(alice, url, q="launch", workspace_id=bob_project["workspace_id"])["results"] == []
+
+
+def test_query_syntax(api):
+    url, alice, _, _ = api
+    messages = search(alice, url, q="launch", types="messages", limit=50)["results"]
+    assert len(messages) == MATCHING_MESSAGES and messages[0]["title"] == "#general"
+
+    assert {r["title"] for r in search(alice, url, q='"launch party"')["results"]} == {"Budget"}
+    assert {r["title"] for r in search(alice, url, q="launch -rollout", types="tasks")["results"]} == {"Budget"}
+    either = search_all(alice, url, q="budget OR playbook", limit=50)
+    assert {r["title"] for r in either} == {"Budget", "Launch playbook"}
+    assert search(alice, url, q="-launch")["results"] == []
+
+
+def test_edits_are_reindexed(api):
+    url, alice, _, _ = api
+    task = search(alice, url, q="budget", types="tasks")["results"][0]
+    response = alice.put(f"{url}/tasks/{task['id']}", json={"title": "Catering quote"})
+    assert response.status_code == 200
+
+    assert search(alice, url, q="budget", types="tasks")["results"] == []
+    assert [r["id"] for r in search(alice, url, q="catering")["results"]] == [task["id"]]
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"q": "   "},
+    {"q": "x" * 201},
+    {"q": "launch", "types": "tasks,files"},
+    {"q": "launch", "workspace_id": "not-a-uuid"},
+    {"q": "launch", "limit": "51"},
+    {"q": "launch", "cursor": "bm9wZQ"}
+])
+def test_rejects_bad_parameters(api, params):
+    url, alice, _, _ = api
+    response = alice.get(f"{url}/search", params=params)
+    assert response.status_code == 400
+    assert "error" in response.json()
@@ -0,0 +1,58 @@
+"""
+Soak-mode drift checks (backend_test.soak_findings) on synthetic samples, and the
+stand-in's GET /debug/metrics that soak mode samples.
+"""
+import requests
+
+from backend_test import soak_findings
+from local_api_server import LatencyModel, LocalAPIServer
+
+
+def samples(count=40, rss=lambda i: 120.0, p95=lambda i: 60.0, lag=lambda i: 2.0, sockets=lambda i: 12):
+    return [{"elapsed_s": i * 30, "rss_mb": rss(i), "p95_ms": p95(i), "lag_p99_ms": lag(i),
+             "open_sockets": sockets(i), "active_handles": 20, "supabase_channels": 0} for i in range(count)]
+
+
+def test_steady_run_has_no_findings():
+    noisy = samples(rss=lambda i: 120.0 + i % 3, p95=lambda i: 60.0 + (i % 5) * 4, sockets=lambda i: 10 + i % 4)
+    assert soak_findings(noisy) == []
+
+
+def test_warm_up_growth_is_ignored():
+    assert soak_findings(samples(rss=lambda i: 60.0 if i < 3 else 120.0)) == []
+
+
+def test_memory_growth_is_flagged():
+    findings = soak_findings(samples(rss=lambda i: 120.0 + i * 2))
+    assert len(findings) == 1 and findings[0].startswith("RSS grew")
+
+
+def test_latency_drift_is_flagged():
+    findings = soak_findings(samples(p95=lambda i: 60.0 + i * 3))
+    assert len(findings) == 1 and "request p95 drifted" in findings[0]
+
+
+def test_small_absolute_drift_is_not_flagged():
+    assert soak_findings(samples(lag=lambda i: 0.5 + i * 0.05)) == []
+
+
+def test_climbing_sockets_are_flagged():
+    findings = soak_findings(samples(sockets=lambda i: 12 + i))
+    assert len(findings) == 1 and findings[0].startswith("open_sockets keeps climbing")
+
+
+def test_too_few_samples_are_not_judged():
+    assert soak_findings(samples(count=3, rss=lambda i: 100.0 * (i + 1))) == []
+
+
+def test_stand_in_serves_process_metrics():
+    server = LocalAPIServer(latency=LatencyModel(0, 0, 0)).start()
+    try:
+        metrics = requests.get(f"{server.base_url}/debug/metrics").json()
+    finally:
+        server.stop()
+    assert metrics["rss_bytes"] > 0
+    assert set(metrics["event_loop_lag_ms"]) == {"mean", "p99", "max"}
+    assert metrics["open_sockets"] >= 1
+    assert set(metrics["caches"]) == {"verified_tokens", "revoked_sessions", "workspace_versions",
+                                      "member_workspaces", "list_cache"}
@@ -0,0 +1,54 @@
+"""
+sync_changes retention on the stand-in: entries older than SYNC_RETENTION_DAYS are pruned as
+a prefix of the log, and a cursor from before the pruned part gets reset: true with the
+head as its new cursor instead of a delta that could be missing changes.
+"""
+import pytest
+
+from local_api_server import SYNC_RETENTION_DAYS
+
+
+@pytest.fixture(scope="module")
+def api(zero_latency_server, signed_up_session):
+    session, _ = signed_up_session(zero_latency_server.base_url, "Sync User")
+    return zero_latency_server, session
+
+
+def sync(api, since):
+    server, session = api
+    response = session.get(f"{server.base_url}/sync", params={"since": since})
+    assert response.status_code == 200
+    return response.json()
+
+
+def age_log(server, days):
+    server.api.execute("UPDATE sync_changes SET changed_at = changed_at - ?", (days,))
+
+
+def test_old_cursors_are_told_to_reload(api):
+    server, session = api
+    project = session.post(f"{server.base_url}/projects", json={"name": "Old news"}).json()["project"]
+    task = session.post(f"{server.base_url}/tasks", json={"title": "Old task", "project_id": project["id"]}).json()["task"]
+    assert {row["id"] for row in sync(api, "0")["tasks"]} == {task["id"]}
+
+    age_log(server, SYNC_RETENTION_DAYS + 1)
+    assert server.api.prune_sync_changes() > 0
+    reset = sync(api, "0")
+    assert reset["reset"] is True and not reset["tasks"] and not reset["has_more"]
+    assert int(reset["cursor"]) == server.api.sync_head() > 0
+
+    # After the full load the client syncs on from the returned cursor
+    assert sync(api, reset["cursor"])["reset"] is False
+    session.put(f"{server.base_url}/tasks/{task['id']}", json={"status": "completed"})
+    delta = sync(api, reset["cursor"])
+    assert delta["reset"] is False and [row["status"] for row in delta["tasks"]] == ["completed"]
+
+
+def test_recent_entries_are_kept(api):
+    server, session = api
+    head = server.api.sync_head()
+    session.post(f"{server.base_url}/projects", json={"name": "Fresh"})
+    age_log(server, SYNC_RETENTION_DAYS - 1)
+
+    assert server.api.prune_sync_changes() == 0
+    assert [row["name"] for row in sync(api, str(head))["projects"]] == ["Fresh"]
@@ -0,0 +1,142 @@
+"""
+Streaming consumer for GET /time-entries/export, run against the SQLite stand-in.
+
+Seeds one user with EXPORT_ENTRIES finished entries spread over two projects and
+EXPORT_DAYS days, then reads the export line by line and checks ordering, filters,
+both formats, and that peak memory (server and client share this process) stays
+far below the size of the whole export.
+"""
+import csv
+import json
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+EXPORT_ENTRIES = 30000
+EXPORT_DAYS = 40
+BULK_CHUNK = 1000
+FIRST_DAY = datetime(2026, 7, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def api(zero_latency_server, signed_up_session):
+    server = zero_latency_server
+    session, _ = signed_up_session(server.base_url, "Export User")
+
+    projects = []
+    for name in ("Payroll A", "Payroll B"):
+        response = session.post(f"{server.base_url}/projects", json={"name": name})
+        response.raise_for_status()
+        projects.append(response.json()["project"]["id"])
+    response = session.post(f"{server.base_url}/tasks/bulk", json={
+        "tasks": [{"title": f"Billing task {i}", "project_id": project_id} for i, project_id in enumerate(projects)]
+    })
+    response.raise_for_status()
+    tasks = [created["id"] for created in response.json()["created"]]
+
+    # Several entries share a start_time so the (start_time, id) tiebreak is exercised
+    entries = []
+    for i in range(EXPORT_ENTRIES):
+        start = FIRST_DAY + timedelta(days=i % EXPORT_DAYS, minutes=(i // EXPORT_DAYS) % 600)
+        entries.append({
+            "task_id": tasks[i % 2],
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(minutes=30)).isoformat(),
+            "billable": i % 3 == 0,
+            "description": f'Entry {i}, "quoted"'
+        })
+    for offset in range(0, EXPORT_ENTRIES, BULK_CHUNK):
+        response = session.post(f"{server.base_url}/time-entries/bulk",
+                                 json={"entries": entries[offset:offset + BULK_CHUNK]})
+        response.raise_for_status()
+        assert not response.json()["errors"]
+
+    return server.base_url, session, projects
+
+
+def stream_ndjson(session, url, params):
+    """Yield export rows one at a time without keeping the body"""
+    with session.get(f"{url}/time-entries/export", params=params, stream=True) as response:
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def check_order(rows):
+    """Consume rows, asserting strict (start_time, id) order; returns how many there were"""
+    count, last = 0, None
+    for row in rows:
+        key = (datetime.fromisoformat(row["start_time"]), row["id"])
+        assert last is None or key > last, f"row {count} out of order: {key} after {last}"
+        last = key
+        count += 1
+    return count
+
+
+def test_export_streams_every_entry_in_order(api):
+    url, session, _ = api
+    assert check_order(stream_ndjson(session, url, {})) == EXPORT_ENTRIES
+
+
+def test_export_memory_stays_bounded(api):
+    url, session, _ = api
+    with session.get(f"{url}/time-entries") as response:
+        full_size = len(response.content)
+
+    tracemalloc.start()
+    try:
+        count = check_order(stream_ndjson(session, url, {}))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count == EXPORT_ENTRIES
+    # One keyset chunk in flight on each side, not the whole export
+    assert peak < full_size / 4, f"peak {peak} B while streaming a {full_size} B data set"
+
+
+def test_export_filters(api):
+    url, session, projects = api
+    first, last = FIRST_DAY.date(), (FIRST_DAY + timedelta(days=9)).date()
+    params = {"from": first.isoformat(), "to": last.isoformat(), "project_id": projects[1], "billable": "true"}
+
+    rows = list(stream_ndjson(session, url, params))
+    expected = sum(1 for i in range(EXPORT_ENTRIES) if i % EXPORT_DAYS < 10 and i % 2 == 1 and i % 3 == 0)
+    assert len(rows) == expected
+    assert check_order(rows) == expected
+    for row in rows:
+        assert first <= datetime.fromisoformat(row["start_time"]).date() <= last
+        assert row["project_id"] == projects[1] and row["project_name"] == "Payroll B"
+        assert row["billable"] is True and row["duration"] == 30
+
+
+def test_export_csv(api):
+    url, session, projects = api
+    params = {"format": "csv", "project_id": projects[0]}
+    with session.get(f"{url}/time-entries/export", params=params, stream=True) as response:
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/csv")
+        reader = csv.DictReader(response.iter_lines(decode_unicode=True))
+        rows = [row for row in reader]
+
+    assert len(rows) == EXPORT_ENTRIES // 2
+    assert {row["project_name"] for row in rows} == {"Payroll A"}
+    assert rows[0]["description"].endswith(', "quoted"')
+    assert {row["billable"] for row in rows} == {"true", "false"}
+    assert check_order(rows) == len(rows)
+
+
+@pytest.mark.parametrize("params", [
+    {"format": "xml"},
+    {"from": "July 1"},
+    {"project_id": "not-a-uuid"},
+    {"billable": "yes"}
+])
+def test_export_rejects_bad_parameters(api, params):
+    url, session, _ = api
+    response = session.get(f"{url}/time-entries/export", params=params)
+    assert response.status_code == 400
+    assert "error" in response.json()
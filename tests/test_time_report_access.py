@@ -0,0 +1,78 @@
+"""
+time_report() on a real Postgres with supabase-schema.sql: it runs as SECURITY DEFINER,
+so it must only answer signed-in callers reporting on themselves, and workspace reports
+only for the workspace's owners and admins.
+
+Needs psycopg 3 and a Postgres role that can create databases (the one from `supabase
+start` works), given as BENCH_DATABASE_URL like rls_benchmark.py; skipped otherwise.
+"""
+import json
+import os
+import uuid
+
+import pytest
+
+psycopg = pytest.importorskip("psycopg")
+
+from rls_benchmark import apply_schema, create_bench_database  # noqa: E402
+
+DSN = os.environ.get("BENCH_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not DSN, reason="set BENCH_DATABASE_URL to a Postgres that can create databases")
+
+OWNER, MEMBER, OUTSIDER = (str(uuid.uuid4()) for _ in range(3))
+
+
+@pytest.fixture(scope="module")
+def db():
+    conn = psycopg.connect(create_bench_database(DSN, "flowops_time_report_test"))
+    apply_schema(conn)
+    workspace, project, task = (str(uuid.uuid4()) for _ in range(3))
+    for user_id in (OWNER, MEMBER, OUTSIDER):
+        conn.execute("INSERT INTO auth.users (id, email) VALUES (%s, %s)", (user_id, f"{user_id}@flowops.com"))
+    conn.execute("INSERT INTO workspaces (id, name, owner_id) VALUES (%s, 'Reports', %s)", (workspace, OWNER))
+    conn.execute("INSERT INTO workspace_members (workspace_id, user_id, role) VALUES (%s, %s, 'owner'), (%s, %s, 'member')",
+                 (workspace, OWNER, workspace, MEMBER))
+    conn.execute("INSERT INTO projects (id, workspace_id, name) VALUES (%s, %s, 'Design')", (project, workspace))
+    conn.execute("INSERT INTO tasks (id, project_id, title, created_by) VALUES (%s, %s, 'Wireframes', %s)",
+                 (task, project, OWNER))
+    for user_id, minutes in ((OWNER, 30), (MEMBER, 45)):
+        conn.execute("""INSERT INTO time_entries (task_id, user_id, start_time, end_time, duration)
+                        VALUES (%s, %s, '2026-03-02 09:00+00', '2026-03-02 09:00+00'::timestamptz + %s * interval '1 minute', %s)""",
+                     (task, user_id, minutes, minutes))
+    conn.commit()
+    yield conn, workspace
+    conn.close()
+
+
+def report(conn, role, caller, user_id, workspace_id=None):
+    """time_report as PostgREST would run it: under the role, with the caller's JWT claims"""
+    with conn.transaction(force_rollback=True):
+        conn.execute(f"SET LOCAL ROLE {role}")
+        if caller:
+            conn.execute("SELECT set_config('request.jwt.claims', %s, true)", (json.dumps({"sub": caller}),))
+        return conn.execute("SELECT time_report(%s, 'user', NULL, NULL, NULL, %s)",
+                            (user_id, workspace_id)).fetchone()[0]
+
+
+def test_callers_get_their_own_report(db):
+    conn, workspace = db
+    assert report(conn, "authenticated", MEMBER, MEMBER)["total"]["minutes"] == 45
+    assert report(conn, "authenticated", OWNER, OWNER, workspace)["total"]["minutes"] == 75
+
+
+def test_members_get_no_workspace_report(db):
+    conn, workspace = db
+    assert report(conn, "authenticated", MEMBER, MEMBER, workspace) is None
+
+
+def test_nobody_reports_as_someone_else(db):
+    conn, workspace = db
+    assert report(conn, "authenticated", OUTSIDER, OWNER) is None
+    assert report(conn, "authenticated", OUTSIDER, OWNER, workspace) is None
+    assert report(conn, "authenticated", None, OWNER, workspace) is None
+
+
+def test_anonymous_callers_cannot_execute_it(db):
+    conn, workspace = db
+    with pytest.raises(psycopg.errors.InsufficientPrivilege):
+        report(conn, "anon", None, OWNER, workspace)
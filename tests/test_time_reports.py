@@ -0,0 +1,165 @@
+"""
+GET /reports/time against the SQLite stand-in.
+
+Seeds a workspace owner and a second member with entries across two projects, a task
+without a project and several weeks, then checks every grouping against totals
+computed in Python, the day/week path served from the daily rollup, the billable and
+date filters, and that only workspace owners and admins get the workspace-wide report.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import requests
+
+FIRST_DAY = date(2026, 3, 2)  # a Monday
+DAYS = 21
+
+
+def create(session, url, endpoint, body, key):
+    response = session.post(f"{url}/{endpoint}", json=body)
+    response.raise_for_status()
+    return response.json()[key]
+
+
+@pytest.fixture(scope="module")
+def api(zero_latency_server, signed_up_session):
+    server = zero_latency_server
+    url = server.base_url
+    (owner, owner_user), (member, member_user) = signed_up_session(url, "Olive"), signed_up_session(url, "Milo")
+    owner_id, member_id = owner_user["id"], member_user["id"]
+
+    design = create(owner, url, "projects", {"name": "Design"}, "project")
+    build = create(owner, url, "projects", {"name": "Build"}, "project")
+    workspace_id = design["workspace_id"]
+    server.api.insert("workspace_members", {"id": str(uuid.uuid4()), "workspace_id": workspace_id,
+                                            "user_id": member_id, "role": "member",
+                                            "created_at": datetime.now(timezone.utc).isoformat()})
+    tasks = [create(owner, url, "tasks", {"title": title, "project_id": project_id}, "task")
+             for title, project_id in (("Wireframes", design["id"]), ("API", build["id"]), ("Deploy", build["id"]))]
+    loose = create(owner, url, "tasks", {"title": "Inbox"}, "task")
+
+    expected = []
+    for user, user_id in ((owner, owner_id), (member, member_id)):
+        entries = []
+        for i in range(DAYS * 3):
+            task = (tasks + [loose])[i % 4] if user is owner else tasks[i % 3]
+            start = datetime.combine(FIRST_DAY + timedelta(days=i % DAYS), datetime.min.time(),
+                                     tzinfo=timezone.utc) + timedelta(hours=8 + i % 5)
+            minutes = 15 + (i * 7) % 50
+            entries.append({"task_id": task["id"], "start_time": start.isoformat(),
+                            "end_time": (start + timedelta(minutes=minutes)).isoformat(), "billable": i % 3 == 0})
+            expected.append({"user_id": user_id, "task": task, "day": start.date(), "minutes": minutes,
+                             "billable": i % 3 == 0})
+        response = user.post(f"{url}/time-entries/bulk", json={"entries": entries})
+        assert response.status_code == 200 and not response.json()["errors"], response.text
+
+    return url, owner, member, owner_id, workspace_id, expected
+
+
+def report(session, url, **params):
+    response = session.get(f"{url}/reports/time", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def totals(entries, key):
+    grouped = defaultdict(lambda: [0, 0, 0])
+    for entry in entries:
+        row = grouped[key(entry)]
+        row[0] += entry["minutes"]
+        row[1] += entry["minutes"] if entry["billable"] else 0
+        row[2] += 1
+    return {group: tuple(row) for group, row in grouped.items()}
+
+
+def as_totals(result):
+    return {row["key"]: (row["minutes"], row["billable_minutes"], row["entries"]) for row in result["rows"]}
+
+
+def week_of(day):
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+KEYS = {
+    "project": lambda e: e["task"]["project_id"],
+    "task": lambda e: e["task"]["id"],
+    "user": lambda e: e["user_id"],
+    "day": lambda e: e["day"].isoformat(),
+    "week": lambda e: week_of(e["day"])
+}
+
+
+@pytest.mark.parametrize("group_by", KEYS)
+def test_own_report_matches_entries(api, group_by):
+    url, owner, _, owner_id, _, expected = api
+    own = [e for e in expected if e["user_id"] == owner_id]
+    result = report(owner, url, group_by=group_by)
+    assert result["group_by"] == group_by
+    assert as_totals(result) == totals(own, KEYS[group_by])
+    assert result["total"]["minutes"] == sum(e["minutes"] for e in own)
+
+
+def test_days_and_weeks_are_in_date_order(api):
+    url, owner, _, _, _, _ = api
+    weeks = report(owner, url, group_by="week")["rows"]
+    assert [row["key"] for row in weeks] == [week_of(FIRST_DAY + timedelta(weeks=w)) for w in range(3)]
+    days = [row["key"] for row in report(owner, url, group_by="day")["rows"]]
+    assert days == sorted(days) and len(days) == DAYS
+
+
+def test_other_groups_are_ordered_by_minutes_and_labelled(api):
+    url, owner, _, _, _, _ = api
+    rows = report(owner, url, group_by="project")["rows"]
+    assert [row["minutes"] for row in rows] == sorted((row["minutes"] for row in rows), reverse=True)
+    assert {row["label"] for row in rows} == {"Design", "Build", "No project"}
+    assert {row["label"] for row in report(owner, url, group_by="task")["rows"]} == {"Wireframes", "API", "Deploy",
+                                                                                     "Inbox"}
+    assert [row["label"] for row in report(owner, url, group_by="user")["rows"]] == ["Olive"]
+
+
+@pytest.mark.parametrize("group_by", ["day", "project"])
+def test_date_and_billable_filters(api, group_by):
+    url, owner, _, owner_id, _, expected = api
+    first, last = FIRST_DAY + timedelta(days=3), FIRST_DAY + timedelta(days=9)
+    chosen = [e for e in expected if e["user_id"] == owner_id and first <= e["day"] <= last and e["billable"]]
+    result = report(owner, url, group_by=group_by, billable="true", **{"from": first.isoformat(), "to": last.isoformat()})
+    assert as_totals(result) == totals(chosen, KEYS[group_by])
+
+
+def test_workspace_report_covers_every_member(api):
+    url, owner, _, _, workspace_id, expected = api
+    in_workspace = [e for e in expected if e["task"]["project_id"]]
+    result = report(owner, url, group_by="user", workspace_id=workspace_id)
+    assert as_totals(result) == totals(in_workspace, KEYS["user"])
+    assert {row["label"] for row in result["rows"]} == {"Olive", "Milo"}
+    weeks = report(owner, url, group_by="week", workspace_id=workspace_id)
+    assert as_totals(weeks) == totals(in_workspace, KEYS["week"])
+
+
+def test_members_cannot_report_on_the_workspace(api):
+    url, _, member, _, workspace_id, _ = api
+    assert member.get(f"{url}/reports/time", params={"group_by": "user", "workspace_id": workspace_id}).status_code == 404
+    assert member.get(f"{url}/reports/time", params={"group_by": "user",
+                                                      "workspace_id": str(uuid.uuid4())}).status_code == 404
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"group_by": "month"},
+    {"group_by": "day", "from": "03/02/2026"},
+    {"group_by": "day", "from": "2026-03-10", "to": "2026-03-01"},
+    {"group_by": "day", "billable": "yes"},
+    {"group_by": "user", "workspace_id": "not-a-uuid"}
+])
+def test_rejects_bad_parameters(api, params):
+    url, owner, _, _, _, _ = api
+    response = owner.get(f"{url}/reports/time", params=params)
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+def test_requires_auth(api):
+    url = api[0]
+    assert requests.get(f"{url}/reports/time", params={"group_by": "day"}).status_code == 401
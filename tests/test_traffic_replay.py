@@ -0,0 +1,119 @@
+"""
+Traffic record/replay: traces are sanitized, replays keep each user's order while
+compressing time, and a replayed journey gets the same statuses as the recording.
+"""
+import gzip
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import backend_test
+from backend_test import FlowOpsAPITester
+from traffic_replay import TraceRecorder, TraceReplayer, UserTimeline, load_trace
+
+SECRET_NAME = "Quarterly board deck"
+
+
+@pytest.fixture
+def recorded(base_url, tmp_path, pinned_clock):
+    """A short recorded session: signup, project, task, timer start/stop, update, dashboard"""
+    path = str(tmp_path / "session.trace.gz")
+    backend_test.RECORDER = TraceRecorder(path)
+    try:
+        noon = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+        tester = FlowOpsAPITester(verbose=False, clock=noon)
+        tester.email = f"recorded_{int(time.time() * 1e6)}@flowops.com"
+        assert tester.test_1_signup() and tester.test_3_create_project()
+        response = tester.make_request("POST", "tasks", {"title": SECRET_NAME, "project_id": tester.project_id,
+                                                         "status": "todo", "priority": "high"})
+        tester.task_id = response.json()["task"]["id"]
+        assert tester.test_8_start_timer() and tester.test_10_stop_timer()
+        assert tester.make_request("PUT", f"tasks/{tester.task_id}", {"status": "completed"}).status_code == 200
+        assert tester.make_request("GET", f"time-entries?task_id={tester.task_id}").status_code == 200
+        assert tester.make_request("GET", "dashboard/stats").status_code == 200
+    finally:
+        backend_test.RECORDER.close()
+        backend_test.RECORDER = None
+    return path, tester
+
+
+def test_trace_is_sanitized(recorded):
+    path, tester = recorded
+    text = gzip.open(path, "rt").read()
+    for secret in (tester.email, tester.password, SECRET_NAME, tester.user_id, tester.workspace_id,
+                   tester.task_id, tester.project_id):
+        assert secret not in text
+    entries = load_trace(path)
+    assert next(e for e in entries if e["m"] == "POST" and e["p"] == "projects")["b"]["workspace_id"] == "@1"
+    create = next(e for e in entries if e["m"] == "POST" and e["p"] == "tasks")
+    assert create["b"] == {"title": f"#{len(SECRET_NAME)}", "project_id": "@2", "status": "todo", "priority": "high"}
+    assert create["bind"] == {"@3": ["task", "id"]}
+    assert next(e for e in entries if e["m"] == "PUT")["p"] == "tasks/@3"
+    assert next(e for e in entries if e["m"] == "GET" and e["p"] == "time-entries")["q"] == [["task_id", "@3"]]
+    start, stop = (next(e for e in entries if e["p"] == f"time-entries/{action}") for action in ("start", "stop"))
+    assert stop["now"] - start["now"] == pytest.approx(backend_test.TIMER_MINUTES * 60)
+
+
+@pytest.mark.parametrize("speed", [1.0, 50.0])
+def test_replay_matches_the_recording(base_url, recorded, speed):
+    path, _ = recorded
+    summary = TraceReplayer(load_trace(path), speed).run()
+    assert summary["status_mismatches"] == [] and summary["unresolved_ids"] == 0
+    assert summary["requests"] == sum(route["count"] for route in summary["routes"])
+
+
+def test_replayed_timer_keeps_its_recorded_length(base_url, recorded):
+    path, _ = recorded
+    replayer = TraceReplayer(load_trace(path), 50.0)
+    replayer.run()
+    tester = next(iter(replayer.users.values()))
+    entries = tester.make_request("GET", "time-entries").json()["entries"]
+    assert [entry["duration"] for entry in entries] == [backend_test.TIMER_MINUTES]
+
+
+def test_users_wait_only_for_requests_that_finished_first():
+    # b overlapped a (two tabs); c started after both had finished
+    a, b, c = {"t": 0.0, "d": 1.0}, {"t": 0.5, "d": 1.0}, {"t": 2.0, "d": 0.1}
+    timeline = UserTimeline([a, b, c])
+    assert [timeline.prerequisites(entry) for entry in (a, b, c)] == [0, 0, 2]
+
+    started = threading.Event()
+
+    def run_c():
+        timeline.wait_for(c)
+        started.set()
+
+    waiter = threading.Thread(target=run_c)
+    waiter.start()
+    timeline.complete(b)
+    assert not started.wait(0.05)  # a is still out
+    timeline.complete(a)
+    assert started.wait(1)
+    waiter.join()
+
+
+def test_compression_keeps_each_users_order(base_url, tmp_path):
+    """Many users' start/stop pairs squeezed 50x still never stop before they start"""
+    path = tmp_path / "timers.trace"
+    lines = [{"trace": 1, "recorded_at": "2026-10-18T12:00:00+00:00"}]
+    for user in range(8):
+        base = user * 0.01
+        project, task, entry = (f"@{user * 3 + k}" for k in range(3))
+        lines += [
+            {"t": base, "d": 0.05, "u": user, "m": "POST", "p": "projects", "b": {"name": "#8"}, "s": 200,
+             "bind": {project: ["project", "id"]}},
+            {"t": base + 0.06, "d": 0.05, "u": user, "m": "POST", "p": "tasks",
+             "b": {"title": "#5", "project_id": project}, "s": 200, "bind": {task: ["task", "id"]}},
+            {"t": base + 0.12, "d": 0.05, "u": user, "m": "POST", "p": "time-entries/start",
+             "b": {"task_id": task}, "s": 200, "bind": {entry: ["entry", "id"]}},
+            {"t": base + 0.18, "d": 0.05, "u": user, "m": "POST", "p": "time-entries/stop",
+             "b": {"entry_id": entry}, "s": 200}
+        ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+
+    summary = TraceReplayer(load_trace(str(path)), 50.0).run()
+    assert summary["status_mismatches"] == []
+    assert summary["users"] == 8 and summary["requests"] == 32
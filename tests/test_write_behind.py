@@ -0,0 +1,189 @@
+"""
+Activity log and notification writes: the write-behind queue batches by size and by age,
+drops rows past its bound, and drains on close; on the stand-in, batched auditing adds no
+round trip to the audited writes and every row is in the database after shutdown.
+"""
+import sqlite3
+import threading
+import time
+import uuid
+
+import pytest
+
+from flowops import FlowOpsClient
+from local_api_server import APIError, LatencyModel, LocalAPIServer, WriteBehindQueue
+
+
+def recording_queue(**options):
+    batches = []
+    return batches, WriteBehindQueue(lambda rows: batches.append(list(rows)), **options)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_full_batches_are_written_without_waiting():
+    batches, queue = recording_queue(max_batch=500, max_delay=60)
+    for i in range(1200):
+        queue.push(i)
+    wait_until(lambda: len(batches) == 2)
+    assert queue.stats()["depth"] == 200
+
+    queue.flush()
+    assert [len(batch) for batch in batches] == [500, 500, 200]
+    assert [row for batch in batches for row in batch] == list(range(1200))
+    queue.close()
+
+
+def test_a_partial_batch_is_written_once_it_is_old_enough():
+    batches, queue = recording_queue(max_batch=500, max_delay=0.05)
+    queue.push("a")
+    queue.push("b")
+    assert batches == []
+    wait_until(lambda: batches == [["a", "b"]])
+    queue.close()
+
+
+def test_rows_past_the_bound_are_dropped_and_counted():
+    release = threading.Event()
+    written = []
+
+    def slow_write(rows):
+        release.wait()
+        written.extend(rows)
+
+    queue = WriteBehindQueue(slow_write, max_batch=5, max_delay=60, max_queue=10)
+    for i in range(5):
+        queue.push(i)
+    wait_until(lambda: queue.stats()["depth"] == 0)  # the first batch is in flight
+    accepted = [queue.push(i) for i in range(5, 17)]
+    assert accepted == [True] * 10 + [False] * 2
+
+    release.set()
+    queue.close()
+    assert written == list(range(15))
+    assert queue.stats() == {"depth": 0, "enqueued": 15, "written": 15, "dropped": 2, "failed": 0, "batches": 3}
+
+
+def test_failed_batches_are_counted_and_later_ones_still_written():
+    written = []
+
+    def write(rows):
+        if "bad" in rows:
+            raise APIError("FOREIGN KEY constraint failed")
+        written.extend(rows)
+
+    queue = WriteBehindQueue(write, max_batch=2, max_delay=60)
+    for row in ("bad", "x", "y", "z"):
+        queue.push(row)
+    queue.close()
+    assert written == ["y", "z"]
+    assert queue.stats()["failed"] == 2 and queue.stats()["written"] == 2
+
+
+def test_unexpected_errors_do_not_stop_the_writer():
+    written = []
+
+    def write(rows):
+        if "bad" in rows:
+            raise sqlite3.OperationalError("database is locked")
+        written.extend(rows)
+
+    queue = WriteBehindQueue(write, max_batch=1, max_delay=60)
+    queue.push("bad")
+    queue.flush()
+    queue.push("good")
+    queue.close()
+    assert written == ["good"] and queue.stats()["failed"] == 1
+
+
+def test_close_drains_and_refuses_new_rows():
+    batches, queue = recording_queue(max_batch=500, max_delay=60)
+    queue.push("queued")
+    queue.close()
+    assert batches == [["queued"]]
+    assert queue.push("late") is False and queue.stats()["dropped"] == 1
+
+
+# -- the stand-in --------------------------------------------------------------
+
+def signed_up(server):
+    client = FlowOpsClient(server.base_url)
+    user = client.signup(f"audit_{uuid.uuid4().hex[:8]}@flowops.com", "SecurePass123!", "Audit User")["user"]
+    return client, user
+
+
+@pytest.fixture
+def audited():
+    """A stand-in of the given audit mode with one user and a task; stopped at teardown"""
+    servers = []
+
+    def start(audit):
+        server = LocalAPIServer(latency=LatencyModel(0, 0, 0), audit=audit).start()
+        servers.append(server)
+        client, user = signed_up(server)
+        project = client.create_project("Audited")
+        task = client.create_task("Audited task", project["id"])
+        return server, client, user, task
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def rows(server, table):
+    return server.api.query(f"SELECT * FROM {table} ORDER BY rowid")
+
+
+def test_audited_writes_log_activity_and_notify(audited):
+    server, client, user, task = audited("batched")
+    other_client, other = signed_up(server)
+
+    client.update_task(task["id"], assignee_id=other["id"])
+    entry = other_client.start_timer(task["id"])
+    other_client.stop_timer(entry["id"])
+    other_client.update_task(task["id"], status="completed")
+    server.api.activity_log.flush()
+    server.api.notification_log.flush()
+
+    activity = [(row["user_id"], row["action"], row["entity_type"], row["entity_id"])
+                for row in rows(server, "activity_logs")]
+    assert activity == [
+        (user["id"], "task.created", "task", task["id"]),
+        (user["id"], "task.updated", "task", task["id"]),
+        (other["id"], "timer.stopped", "time_entry", entry["id"]),
+        (other["id"], "task.updated", "task", task["id"])
+    ]
+    notifications = [(row["user_id"], row["type"]) for row in rows(server, "notifications")]
+    assert notifications == [(other["id"], "task_assigned"), (user["id"], "task_completed")]
+
+
+@pytest.mark.parametrize("audit, extra_round_trips", [("off", 0), ("batched", 0), ("sync", 1)])
+def test_only_synchronous_auditing_adds_a_round_trip(audited, audit, extra_round_trips):
+    server, client, _, task = audited(audit)
+    server.api.activity_log.flush()
+    before = server.api.latency.round_trips
+    for i in range(20):
+        client.update_task(task["id"], title=f"Renamed {i}")
+    # remote auth (1) + UPDATE (1) + bump_versions' member lookup, cached after the first
+    per_update = (server.api.latency.round_trips - before) / 20
+    assert 2 <= per_update - extra_round_trips <= 2.1
+
+    before = server.api.latency.round_trips
+    server.api.activity_log.flush()
+    assert server.api.latency.round_trips - before == (1 if audit == "batched" else 0)
+
+
+def test_stopping_the_server_writes_queued_rows(audited):
+    server, client, _, task = audited("batched")
+    for i in range(30):
+        client.update_task(task["id"], title=f"Renamed {i}")
+    server.stop()
+
+    stats = server.api.activity_log.stats()
+    assert stats["depth"] == 0 and stats["dropped"] == 0 and stats["written"] == stats["enqueued"] == 31
+    assert len(rows(server, "activity_logs")) == 31
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+FlowOps Traffic Record/Replay
+Records the requests made through FlowOpsAPITester.make_request (backend_test.py --record)
+into a compact, sanitized trace, and replays a trace against a server at 1x, 10x or 50x
+speed, so capacity tests run the real mix of timer churn and dashboard reads instead of a
+synthetic journey.
+
+A trace is JSON lines (gzipped when the name ends in .gz). The first line is a header,
+{"trace": 1, "recorded_at": ...}, and every other line is one request:
+
+    t      start, seconds after the recording began
+    d      how long it took (0 when unknown, e.g. from an access log)
+    u      pseudonymous user number
+    m, p   method and path; ids are aliases ("tasks/@12")
+    q      query parameters as [key, value] pairs
+    b      body shape: ids become aliases, timestamps "@t+<seconds>" and days "@d+<days>"
+           relative to the recording, free text "#<length>"; numbers, booleans and enum
+           fields (status, priority, ...) are kept
+    a      0 for a request sent without the session token
+    s      status the request got when recorded (0: no response)
+    bind   {alias: path} where a new id first appeared in the response, e.g. ["task", "id"]
+    now    the pinned clock (X-FlowOps-Now), seconds after the recording began
+    inm    1 when it sent If-None-Match with the user's last ETag for the same URL
+
+Sanitized production access logs can be converted to the same lines; only t, u, m and p
+are required.
+
+Replay gives every trace user a fresh account and sends each request at t / speed. A
+user's request waits for every one of their requests that had finished before it started
+in the recording, so a timer start is always answered before its stop while requests that
+overlapped (parallel tabs) still overlap. Aliases resolve to the ids the replayed
+responses returned; pinned clocks and timestamps keep their recorded offsets from the
+replay's start, so a 25-minute timer is still 25 minutes long at 50x.
+
+    python backend_test.py --target local --mode load --record perf_results/load.trace.gz
+    python traffic_replay.py perf_results/load.trace.gz --speed 1 --speed 10 --speed 50
+    python traffic_replay.py trace.jsonl.gz --target remote --base-url http://localhost:3000/api
+
+Exits non-zero when a replay got server errors or dropped connections that the
+recording did not have.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlencode
+
+import backend_test
+from backend_test import CLOCK_HEADER, FlowOpsAPITester, RequestMetrics, percentile, start_local_target
+from local_api_server import add_server_arguments
+
+TRACE_VERSION = 1
+SPEEDS = [1.0]
+REPLAY_WORKERS = 256  # requests in flight at once; more and the schedule lags
+
+UUID_VALUE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+TIME_VALUE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+DAY_VALUE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+PLAIN_VALUE = re.compile(r"^(-?\d+(\.\d+)?|true|false)$")
+# Fields whose text is an enum or a setting rather than user content
+KEEP_KEYS = {"status", "priority", "role", "group_by", "format", "types", "billable", "done", "limit"}
+# Query parameters that echo a cursor from the previous response, and the field it came from
+CURSOR_FIELDS = {"cursor": "next_cursor", "before": "next_cursor", "since": "cursor"}
+AUTH_ENDPOINTS = {"auth/signup", "auth/login"}
+FILLER = "lorem ipsum dolor sit amet "
+
+
+def log(message):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
+
+
+def open_trace(path, mode):
+    return gzip.open(path, mode) if path.endswith(".gz") else open(path, mode)
+
+
+def is_server_error(status):
+    return status == 0 or status >= 500
+
+
+def remember_cursors(state, body):
+    if isinstance(body, dict):
+        for field in set(CURSOR_FIELDS.values()):
+            if body.get(field):
+                state[field] = str(body[field])
+
+
+# -- recording -------------------------------------------------------------------
+
+class TraceRecorder:
+    """
+    Thread-safe sink for backend_test.py's make_request: set backend_test.RECORDER to one
+    and every request is appended to the trace as it completes. close() when done.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.epoch = datetime.now(timezone.utc)
+        self.users = {}  # tester -> user number
+        self.cursors = {}  # user number -> last cursor fields seen
+        self.aliases = {}  # real id -> alias
+        self.count = 0
+        self.file = open_trace(path, "wt")
+        self.file.write(json.dumps({"trace": TRACE_VERSION, "recorded_at": self.epoch.isoformat()}) + "\n")
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+    def alias(self, value):
+        if value not in self.aliases:
+            self.aliases[value] = f"@{len(self.aliases)}"
+        return self.aliases[value]
+
+    def offset(self, moment):
+        return (moment - self.epoch).total_seconds()
+
+    def sanitize(self, key, value):
+        if isinstance(value, dict):
+            return {k: self.sanitize(k, v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.sanitize(key, v) for v in value]
+        if not isinstance(value, str):
+            return value
+        if UUID_VALUE.match(value):
+            return self.alias(value.lower())
+        if DAY_VALUE.match(value):
+            return f"@d{(datetime.fromisoformat(value).date() - self.epoch.date()).days:+d}"
+        if TIME_VALUE.match(value):
+            try:
+                moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return f"#{len(value)}"
+            moment = moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+            return f"@t{self.offset(moment):+.3f}"
+        if key in KEEP_KEYS or PLAIN_VALUE.match(value):
+            return value
+        return f"#{len(value)}"
+
+    def bind_new_ids(self, value, path, binds):
+        """Alias ids this response introduced, remembering where they were so replay can find them"""
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if (key == "id" or key.endswith("_id")) and isinstance(item, str) and UUID_VALUE.match(item) \
+                        and item.lower() not in self.aliases:
+                    binds[self.alias(item.lower())] = path + [key]
+                else:
+                    self.bind_new_ids(item, path + [key], binds)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                self.bind_new_ids(item, path + [index], binds)
+
+    def record(self, tester, method, endpoint, data, auth_required, headers, response, started):
+        finished = time.perf_counter()
+        path, _, query = endpoint.partition("?")
+        body = None
+        if response is not None and response.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                body = response.json()
+            except ValueError:
+                pass
+
+        with self.lock:
+            user = self.users.setdefault(tester, len(self.users))
+            cursors = self.cursors.setdefault(user, {})
+            entry = {"t": round(started - self.started, 4), "d": round(finished - started, 4), "u": user,
+                     "m": method,
+                     "p": "/".join(self.alias(part.lower()) if UUID_VALUE.match(part) else part
+                                   for part in path.split("/"))}
+            params = []
+            for key, value in parse_qsl(query, keep_blank_values=True):
+                echoed = key in CURSOR_FIELDS and value == cursors.get(CURSOR_FIELDS[key])
+                params.append([key, "@next" if echoed else self.sanitize(key, value)])
+            if params:
+                entry["q"] = params
+            if data is not None:
+                entry["b"] = self.sanitize(None, data)
+            if not auth_required:
+                entry["a"] = 0
+            entry["s"] = response.status_code if response is not None else 0
+            if CLOCK_HEADER in headers:
+                entry["now"] = round(self.offset(datetime.fromisoformat(headers[CLOCK_HEADER])), 3)
+            if "If-None-Match" in headers:
+                entry["inm"] = 1
+            if body is not None and response.status_code < 400:
+                binds = {}
+                self.bind_new_ids(body, [], binds)
+                if binds:
+                    entry["bind"] = binds
+                remember_cursors(cursors, body)
+            if not self.file.closed:
+                self.file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                self.count += 1
+
+
+# -- replaying -------------------------------------------------------------------
+
+def load_trace(path):
+    """The trace's requests in start order"""
+    with open_trace(path, "rt") as f:
+        header = json.loads(f.readline())
+        if header.get("trace") != TRACE_VERSION:
+            raise SystemExit(f"{path} is not a version {TRACE_VERSION} trace")
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+class UserTimeline:
+    """
+    One trace user's ordering. Their requests sorted by recorded end time form a sequence;
+    a request may start once every request that ended before it started has completed,
+    i.e. once that prefix of the sequence is done.
+    """
+
+    def __init__(self, entries):
+        by_end = sorted(range(len(entries)), key=lambda i: entries[i]["t"] + entries[i].get("d", 0))
+        self.ends = [entries[i]["t"] + entries[i].get("d", 0) for i in by_end]
+        self.position = {id(entries[i]): p for p, i in enumerate(by_end)}
+        self.done = [False] * len(by_end)
+        self.prefix = 0
+        self.condition = threading.Condition()
+        self.cursors = {}
+        self.etags = {}
+
+    def prerequisites(self, entry):
+        """How many requests (in end order) must be done before entry may start"""
+        return bisect_right(self.ends, entry["t"])
+
+    def wait_for(self, entry):
+        needed = self.prerequisites(entry)
+        with self.condition:
+            self.condition.wait_for(lambda: self.prefix >= needed)
+
+    def complete(self, entry):
+        with self.condition:
+            self.done[self.position[id(entry)]] = True
+            while self.prefix < len(self.done) and self.done[self.prefix]:
+                self.prefix += 1
+            self.condition.notify_all()
+
+
+class TraceReplayer:
+    """Replays a loaded trace once at the given speed; run() returns the summary"""
+
+    def __init__(self, entries, speed=1.0, workers=REPLAY_WORKERS):
+        self.entries = entries
+        self.speed = speed
+        self.workers = workers
+        self.metrics = RequestMetrics()
+        self.epoch = datetime.now(timezone.utc)
+        self.lock = threading.Lock()
+        self.ids = {}  # alias -> id from a replayed response (or a made-up one if never bound)
+        self.lags = []
+        self.mismatches = {}  # (method, route, recorded, replayed) -> count
+        self.unresolved = set()
+        self.elapsed = 0.0
+
+        by_user = {}
+        for entry in entries:
+            by_user.setdefault(entry["u"], []).append(entry)
+        self.timelines = {user: UserTimeline(user_entries) for user, user_entries in by_user.items()}
+        tag = uuid.uuid4().hex[:8]
+        self.users = {user: FlowOpsAPITester(email=f"replay_{tag}_{user}@flowops.com", name=f"Replay User {user}",
+                                             verbose=False, metrics=self.metrics)
+                      for user in by_user}
+        self.first = {user: user_entries[0] for user, user_entries in by_user.items()}
+
+    def prepare(self):
+        """Sign up (untimed) every user whose trace does not start with a signup"""
+        for user, tester in self.users.items():
+            if self.first[user]["p"] == "auth/signup":
+                continue
+            tester.metrics = RequestMetrics()
+            if not tester.test_1_signup():
+                raise SystemExit(f"Could not create replay user {user}")
+            tester.metrics = self.metrics
+
+    def real_id(self, alias):
+        with self.lock:
+            if alias not in self.ids:
+                self.unresolved.add(alias)
+                self.ids[alias] = str(uuid.uuid4())
+            return self.ids[alias]
+
+    def resolve(self, value):
+        if isinstance(value, dict):
+            return {k: self.resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(v) for v in value]
+        if not isinstance(value, str) or len(value) < 2:
+            return value
+        if value[0] == "@" and value[1:].isdigit():
+            return self.real_id(value)
+        if value.startswith("@t"):
+            return (self.epoch + timedelta(seconds=float(value[2:]))).isoformat()
+        if value.startswith("@d"):
+            return (self.epoch.date() + timedelta(days=int(value[2:]))).isoformat()
+        if value[0] == "#" and value[1:].isdigit():
+            length = int(value[1:])
+            return (FILLER * (length // len(FILLER) + 1))[:length]
+        return value
+
+    def request_for(self, entry, tester, timeline):
+        """(endpoint, body, headers) for one trace entry as this replay's user"""
+        path = "/".join(self.resolve(part) for part in entry["p"].split("/"))
+        params = []
+        for key, value in entry.get("q", []):
+            if value == "@next":
+                value = timeline.cursors.get(CURSOR_FIELDS.get(key))
+                if value is None:
+                    continue
+            params.append((key, self.resolve(value)))
+        endpoint = path + (f"?{urlencode(params)}" if params else "")
+
+        body = self.resolve(entry["b"]) if "b" in entry else None
+        if entry["p"] in AUTH_ENDPOINTS:
+            body = {"email": tester.email, "password": tester.password}
+            if entry["p"] == "auth/signup":
+                body["name"] = tester.name
+
+        headers = {}
+        if "now" in entry:
+            headers[CLOCK_HEADER] = (self.epoch + timedelta(seconds=entry["now"])).isoformat()
+        if entry.get("inm") and timeline.etags.get(endpoint):
+            headers["If-None-Match"] = timeline.etags[endpoint]
+        return endpoint, body, headers
+
+    def bind(self, entry, body):
+        for alias, path in entry.get("bind", {}).items():
+            value = body
+            for step in path:
+                try:
+                    value = value[step]
+                except (KeyError, IndexError, TypeError):
+                    value = None
+                    break
+            if isinstance(value, str):
+                with self.lock:
+                    self.ids.setdefault(alias, value)
+
+    def send(self, entry, scheduled):
+        tester, timeline = self.users[entry["u"]], self.timelines[entry["u"]]
+        try:
+            timeline.wait_for(entry)
+            with self.lock:
+                self.lags.append(max(0.0, time.perf_counter() - scheduled))
+            endpoint, body, headers = self.request_for(entry, tester, timeline)
+            response = tester.make_request(entry["m"], endpoint, body, auth_required=entry.get("a", 1) != 0,
+                                           headers=headers)
+            status = response.status_code if response is not None else 0
+            if "s" in entry and status != entry["s"]:
+                key = (entry["m"], backend_test.route_key(entry["p"]), entry["s"], status)
+                with self.lock:
+                    self.mismatches[key] = self.mismatches.get(key, 0) + 1
+            if response is None or status >= 400:
+                return
+            if entry["m"] == "GET" and response.headers.get("ETag"):
+                timeline.etags[endpoint] = response.headers["ETag"]
+            if not response.headers.get("Content-Type", "").startswith("application/json"):
+                return
+            data = response.json()
+            if entry["p"] in AUTH_ENDPOINTS and data.get("session"):
+                tester.user_id = data["user"]["id"]
+                tester.session_token = data["session"]["access_token"]
+            self.bind(entry, data)
+            remember_cursors(timeline.cursors, data)
+        finally:
+            timeline.complete(entry)
+
+    def run(self):
+        self.prepare()
+        self.epoch = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = []
+            for entry in self.entries:
+                scheduled = started + entry["t"] / self.speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(self.send, entry, scheduled))
+            for future in futures:
+                future.result()
+        self.elapsed = time.perf_counter() - started
+        return self.summary()
+
+    def summary(self):
+        lags = sorted(self.lags)
+        recorded_span = self.entries[-1]["t"] if self.entries else 0.0
+        new_errors = sum(count for (_, _, recorded, replayed), count in self.mismatches.items()
+                         if is_server_error(replayed) and not is_server_error(recorded))
+        return {
+            "speed": self.speed,
+            "users": len(self.users),
+            "requests": len(self.entries),
+            "recorded_span_s": round(recorded_span, 3),
+            "elapsed_s": round(self.elapsed, 3),
+            "requests_per_s": round(len(self.entries) / (self.elapsed or 1.0), 2),
+            "lag_p50_ms": round(percentile(lags, 50) * 1000, 1),
+            "lag_p95_ms": round(percentile(lags, 95) * 1000, 1),
+            "lag_max_ms": round(lags[-1] * 1000, 1) if lags else 0.0,
+            "status_mismatches": [{"method": m, "route": r, "recorded": a, "replayed": b, "count": n}
+                                  for (m, r, a, b), n in sorted(self.mismatches.items())],
+            "new_server_errors": new_errors,
+            "unresolved_ids": len(self.unresolved),
+            "routes": self.metrics.summary(self.elapsed)
+        }
+
+
+def write_summary(summary, results_dir):
+    """Write one replay's summary as replay_<speed>x_<timestamp>.json"""
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(results_dir, f"replay_{summary['speed']:g}x_{stamp}.json")
+    with open(path, "w") as f:
+        json.dump({"base_url": backend_test.BASE_URL, "generated_at": datetime.now().isoformat(), **summary}, f,
+                  indent=2)
+    return path
+
+
+def print_replay(summary):
+    log(f"▶️  {summary['speed']:g}x: {summary['requests']} requests from {summary['users']} users, "
+        f"{summary['recorded_span_s']:.1f}s of traffic in {summary['elapsed_s']:.1f}s "
+        f"({summary['requests_per_s']:.1f} req/s)")
+    log(f"   Schedule lag p50 {summary['lag_p50_ms']:.1f} ms, p95 {summary['lag_p95_ms']:.1f} ms, "
+        f"max {summary['lag_max_ms']:.1f} ms; {summary['unresolved_ids']} ids never seen in a replayed response")
+    print(f"{'route':<28}{'count':>7}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for stats in summary["routes"]:
+        key = f"{stats['method']} {stats['route']}"
+        print(f"{key:<28}{stats['count']:>7}{stats['errors']:>6}"
+              f"{stats['wall_p50_ms']:>9.1f}{stats['wall_p95_ms']:>9.1f}{stats['wall_p99_ms']:>9.1f}")
+    for mismatch in summary["status_mismatches"]:
+        log(f"   ⚠️  {mismatch['method']} {mismatch['route']}: recorded {mismatch['recorded']}, "
+            f"replayed {mismatch['replayed']} ({mismatch['count']}x)")
+
+
+def print_speeds(summaries):
+    """p95 per route at each speed, side by side"""
+    headers = [f"p95 {summary['speed']:g}x" for summary in summaries]
+    print(f"\n{'route':<28}" + "".join(f"{header:>12}" for header in headers))
+    routes = {}
+    for index, summary in enumerate(summaries):
+        for stats in summary["routes"]:
+            routes.setdefault((stats["method"], stats["route"]), [None] * len(summaries))[index] = stats["wall_p95_ms"]
+    for (method, route), values in sorted(routes.items()):
+        key = f"{method} {route}"
+        print(f"{key:<28}" + "".join(f"{v:>12.1f}" if v is not None else f"{'-':>12}" for v in values))
+    print(f"{'requests/s':<28}" + "".join(f"{s['requests_per_s']:>12.1f}" for s in summaries))
+    print(f"{'new server errors':<28}" + "".join(f"{s['new_server_errors']:>12}" for s in summaries))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a recorded FlowOps traffic trace, time-compressed")
+    parser.add_argument("trace", help="trace file written by backend_test.py --record")
+    parser.add_argument("--speed", type=float, action="append",
+                        help="time compression, e.g. 10 replays 10 minutes of traffic in one; repeat to "
+                             "replay at several speeds (each on a fresh stand-in with --target local)")
+    parser.add_argument("--target", choices=["local", "remote"], default="local",
+                        help="local: in-process SQLite stand-in; remote: --base-url")
+    parser.add_argument("--base-url", default=backend_test.REMOTE_BASE_URL, help="remote target: API base URL")
+    parser.add_argument("--workers", type=int, default=REPLAY_WORKERS, help="requests in flight at most")
+    parser.add_argument("--results-dir", default=backend_test.RESULTS_DIR,
+                        help="directory for per-route latency JSON/CSV (empty string disables)")
+    add_server_arguments(parser.add_argument_group("local target latency model"))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    entries = load_trace(args.trace)
+    log(f"📼 {len(entries)} requests from {len({entry['u'] for entry in entries})} users in {args.trace}")
+    backend_test.BASE_URL = args.base_url
+    summaries = []
+    for speed in args.speed or SPEEDS:
+        server = start_local_target(args, clock_override=True) if args.target == "local" else None
+        try:
+            summary = TraceReplayer(entries, speed, args.workers).run()
+        finally:
+            if server:
+                server.stop()
+        print_replay(summary)
+        if args.results_dir:
+            log(f"📁 Replay results written to {write_summary(summary, args.results_dir)}")
+        summaries.append(summary)
+    if len(summaries) > 1:
+        print_speeds(summaries)
+    if any(summary["new_server_errors"] for summary in summaries):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()